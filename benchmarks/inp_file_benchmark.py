@@ -0,0 +1,79 @@
+"""
+Benchmark reading and writing a large synthetic EPANET INP file.
+
+Usage::
+
+    python inp_file_benchmark.py [num_x num_y]
+
+A num_x by num_y grid of junctions is written to a temporary directory (the
+default 200 x 250 grid has 50,000 junctions and about 100,000 pipes), then
+the time to read it into a WaterNetworkModel and to write it back is
+reported. Nothing is saved.
+"""
+from __future__ import print_function
+import sys
+import io
+import shutil
+import tempfile
+from os.path import join
+from timeit import default_timer
+
+
+def write_grid_inp(filename, num_x, num_y):
+    """Write a synthetic num_x by num_y grid network fed by one reservoir."""
+    with open(filename, 'w') as f:
+        f.write('[TITLE]\nSynthetic grid network\n\n')
+        f.write('[JUNCTIONS]\n;ID\tElev\tDemand\tPattern\n')
+        for i in range(num_x):
+            for j in range(num_y):
+                f.write(' J{0}_{1}\t{2:.1f}\t{3:.2f}\t1\t;\n'.format(i, j, 100 + (i+j) % 17, (i*j) % 5))
+        f.write('\n[RESERVOIRS]\n R1\t300\t;\n\n')
+        f.write('[PIPES]\n;ID\tNode1\tNode2\tLength\tDiameter\tRoughness\tMinorLoss\tStatus\n')
+        f.write(' P0\tR1\tJ0_0\t100\t12\t100\t0\tCV\t;\n')
+        for i in range(num_x):
+            for j in range(num_y):
+                if i+1 < num_x:
+                    f.write(' PH{0}_{1}\tJ{0}_{1}\tJ{2}_{1}\t{3}\t8\t100\t0\tOpen\t;\n'.format(i, j, i+1, 100+j))
+                if j+1 < num_y:
+                    f.write(' PV{0}_{1}\tJ{0}_{1}\tJ{0}_{2}\t{3}\t6\t120\t0\tOpen\t;\n'.format(i, j, j+1, 100+i))
+        f.write('\n[PATTERNS]\n 1\t1.0\t1.2\t0.8\n\n')
+        f.write('[OPTIONS]\n Units\tGPM\n Headloss\tH-W\n\n[TIMES]\n Duration\t0\n\n')
+        f.write('[COORDINATES]\n')
+        for i in range(num_x):
+            for j in range(num_y):
+                f.write(' J{0}_{1}\t{2}\t{3}\n'.format(i, j, i*100, j*100))
+        f.write(' R1\t-100\t-100\n\n[END]\n')
+
+
+def main(num_x=200, num_y=250):
+    import wntr
+
+    tempdir = tempfile.mkdtemp()
+    try:
+        inp_file = join(tempdir, 'grid.inp')
+        write_grid_inp(inp_file, num_x, num_y)
+
+        start = default_timer()
+        wn = wntr.network.WaterNetworkModel(inp_file)
+        print('Read {0} nodes and {1} links: {2:.3f} s'.format(wn.num_nodes, wn.num_links,
+                                                               default_timer() - start))
+
+        start = default_timer()
+        wn.write_inpfile(join(tempdir, 'grid_rewrite.inp'))
+        print('Write: {0:.3f} s'.format(default_timer() - start))
+
+        # a scenario that changes one element
+        wn.get_link('P0').diameter *= 1.1
+        start = default_timer()
+        wn.write_inpfile(join(tempdir, 'grid_scenario.inp'))
+        print('Write after changing one pipe: {0:.3f} s'.format(default_timer() - start))
+
+        start = default_timer()
+        wn.write_inpfile(io.BytesIO())
+        print('Write unchanged model to memory: {0:.3f} s'.format(default_timer() - start))
+    finally:
+        shutil.rmtree(tempdir)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
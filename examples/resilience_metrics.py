@@ -54,16 +54,16 @@ def topographic_metrics(wn):
     print("   " + str(nodes))
 
     # Compute eccentricity, diameter, and average shortest path length
-    # These all use an undirected graph
-    uG = G.to_undirected() # undirected graph
-    if nx.is_connected(uG):
-        ecc = nx.eccentricity(uG)
+    # These all use an undirected graph, computed on the compact CSR graph
+    csr_graph = wn.get_csr_graph()
+    if csr_graph.is_connected():
+        ecc = csr_graph.eccentricity()
         wntr.graphics.plot_network(wn, node_attribute=ecc, title='Eccentricity',
                               node_size=40, node_range=[15, 30])
 
-        print("Diameter: " + str(nx.diameter(uG)))
+        print("Diameter: " + str(csr_graph.diameter()))
 
-        ASPL = nx.average_shortest_path_length(uG)
+        ASPL = csr_graph.average_shortest_path_length()
         print("Average shortest path length: " + str(ASPL))
 
     # Compute cluster coefficient
@@ -80,9 +80,8 @@ def topographic_metrics(wn):
     print("Central point dominance: " + str(central_pt_dom))
 
     # Compute articulation points
-    Nap = list(nx.articulation_points(uG))
-    Nap = list(set(Nap)) # get the unique nodes in Nap
-    Nap_density = float(len(Nap))/uG.number_of_nodes()
+    Nap = csr_graph.articulation_points()
+    Nap_density = float(len(Nap))/csr_graph.num_nodes
     print("Density of articulation points: " + str(Nap_density))
     wntr.graphics.plot_network(wn, node_attribute=Nap, title='Articulation Point',
                           node_size=40, node_range=[0,1])
@@ -149,8 +148,7 @@ def hydraulic_metrics(wn):
     # Create a weighted graph for flowrate at time 36 hours
     t = 36*3600
     attr = results.link.loc['flowrate',t,:]
-    G_flowrate_36hrs = wn.get_graph()
-    G_flowrate_36hrs.weight_graph(link_attribute=attr)
+    G_flowrate_36hrs = wn.get_graph(copy=False).oriented_graph(attr)
 
     # Compute betweenness-centrality at time 36 hours
     bet_cen = nx.betweenness_centrality(G_flowrate_36hrs)
@@ -170,10 +168,8 @@ def hydraulic_metrics(wn):
 
     # Calculate entropy for 1 day, all nodes
     shat = []
-    G_flowrate_t = wn.get_graph()
-    for t in np.arange(0, 24*3600+1,3600):
-        attr = results.link.loc['flowrate',t,:]
-        G_flowrate_t.weight_graph(link_attribute=attr)
+    flowrate = results.link['flowrate'].loc[np.arange(0, 24*3600+1, 3600)]
+    for t, G_flowrate_t in wn.get_graph(copy=False).oriented_graphs(flowrate):
         entropy = wntr.metrics.entropy(G_flowrate_t)
         shat.append(entropy[1])
     plt.figure()
@@ -1,8 +1,8 @@
 from __future__ import print_function
 import wntr
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
-import pickle
 
 # Create a water network model
 inp_file = 'networks/Net3.inp'
@@ -25,9 +25,7 @@ for name, node in wn.junctions():
 pipe_diameters = wn.query_link_attribute('diameter', np.less_equal,
                                          0.9144,  # 36 inches = 0.9144 m
                                          link_type=wntr.network.Pipe)
-failure_probability = {}
-for k,v in pipe_diameters.items():
-    failure_probability[k] = v/sum(list(pipe_diameters.values()))
+failure_probability = (pipe_diameters/pipe_diameters.sum()).to_dict()
 
 # Define maximum iterations
 Imax = 5
@@ -38,9 +36,8 @@ results = {}
 # Set random seed
 np.random.seed(67823)
 
-f=open('wn.pickle','wb')
-pickle.dump(wn,f)
-f.close()
+# Save the model, to reset it between simulations
+wn.write_npzfile('wn.npz')
 
 for i in range(Imax):
 
@@ -79,29 +76,37 @@ for i in range(Imax):
     print(sim_name)
     results[sim_name] = sim.run_sim()
 
-    f=open('wn.pickle','rb')
-    wn = pickle.load(f)
-    f.close()
+    wn = wntr.network.WaterNetworkModel()
+    wn.read_npzfile('wn.npz')
 
 ### ANALYSIS ###
 nzd_junctions = [j_name for j_name, j in wn.junctions() if sum(d.base_value for d in j.demand_timeseries_list) != 0]
 
-result_names = results.keys()
-for name in result_names:
+result_names = list(results.keys())
+
+# Stack the node results at consumer nodes (scenario x time x node) to
+# compute the metrics of all scenarios at once
+ensemble = {}
+for attribute in ['expected_demand', 'demand']:
+    ensemble[attribute] = np.stack([results[name].node[attribute].loc[:,nzd_junctions].values
+                                    for name in result_names])
+times = results[result_names[0]].node.major_axis/3600.0
+
+# FDV, scenario k, time t
+FDV_kt = wntr.metrics.fdv(ensemble, average_nodes=True)
+
+# FDV, scenario k, node n, time t
+FDV_knt = wntr.metrics.fdv(ensemble)
+
+for k, name in enumerate(result_names):
 
     # Print power outage description for each iteration
     print(name)
 
     results[name].node.major_axis = results[name].node.major_axis/3600.0
 
-    # Isolate node results at consumer nodes
-    node_results = results[name].node.loc[:,:,nzd_junctions]
-
-    # FDV, scenario k, time t
-    FDV_kt = wntr.metrics.fdv(node_results, average_nodes=True)
-
-    # FDV, scenario k, node n, time t
-    FDV_knt = wntr.metrics.fdv(node_results)
+    FDV_t = pd.Series(FDV_kt[k], index=times)
+    FDV_nt = pd.DataFrame(FDV_knt[k], index=times, columns=nzd_junctions)
 
     # Plot
     plt.figure()
@@ -109,11 +114,11 @@ for name in result_names:
     plt.title(str(name))
 
     for node_name in nzd_junctions:
-        pressure = FDV_knt.loc[:,node_name]
+        pressure = FDV_nt.loc[:,node_name]
         pressure.plot()
 
-    FDV_knt.plot(ax=plt.gca(), legend=False)
-    FDV_kt.plot(ax=plt.gca(), label='Average', color='k', linewidth=3.0, legend=False)
+    FDV_nt.plot(ax=plt.gca(), legend=False)
+    FDV_t.plot(ax=plt.gca(), label='Average', color='k', linewidth=3.0, legend=False)
     plt.ylim( (-0.05, 1.05) )
     plt.ylabel('FDV')
 
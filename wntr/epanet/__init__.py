@@ -1,7 +1,7 @@
 """
 The wntr.epanet package provides EPANET2 compatibility functions for WNTR.
 """
-from .io import InpFile  #, BinFile, HydFile, RptFile
+from .io import InpFile, HydFile  #, BinFile, RptFile
 from .util import FlowUnits, MassUnits, HydParam, QualParam, EN
 import wntr.epanet.toolkit
 
@@ -7,6 +7,7 @@ The wntr.epanet.io module contains methods for reading/writing EPANET input and
 
     InpFile
     BinFile
+    HydFile
 
 ----
 
@@ -89,6 +90,17 @@ def _split_line(line):
         _cmnt = _vc[1]
     return _vals, _cmnt
 
+def _float_column(rows, i, default=None):
+    """Convert column i of a list of split lines to a float array.
+
+    Rows shorter than i+1 words use the default; if there is no default,
+    an IndexError is raised, as with the per-line parsers.
+    """
+    if default is None:
+        return np.array([row[i] for row in rows], dtype=float)
+    return np.array([row[i] if len(row) > i else default for row in rows], dtype=float)
+
+
 def _is_number(s):
     """
     Checks if input is a number
@@ -230,6 +242,7 @@ class InpFile(object):
         self.flow_units = None
         self.top_comments = []
         self.curves = OrderedDict()
+        self._section_cache = {}
 
     def read(self, inp_files, wn=None):
         """
@@ -262,114 +275,80 @@ class InpFile(object):
         self.flow_units = None
 
         for filename in inp_files:
-          section = None
-          lnum = 0
-          edata = {'fname': filename}
-          with io.open(filename, 'r', encoding='utf-8') as f:
-            for line in f:
-                lnum += 1
-                edata['lnum'] = lnum
-                line = line.strip()
-                nwords = len(line.split())
-                if len(line) == 0 or nwords == 0:
-                    # Blank line
-                    continue
-                elif line.startswith('['):
-                    vals = line.split(None, 1)
-                    sec = vals[0].upper()
-                    edata['sec'] = sec
-                    if sec in _INP_SECTIONS:
-                        section = sec
-                        #logger.info('%(fname)s:%(lnum)-6d %(sec)13s section found' % edata)
-                        continue
-                    elif sec == '[END]':
-                        #logger.info('%(fname)s:%(lnum)-6d %(sec)13s end of file found' % edata)
-                        section = None
-                        break
-                    else:
-                        raise RuntimeError('%(fname)s:%(lnum)d: Invalid section "%(sec)s"' % edata)
-                elif section is None and line.startswith(';'):
-                    self.top_comments.append(line[1:])
+            with io.open(filename, 'r', encoding='utf-8') as f:
+                self._read_lines(f, filename)
+        return self._read_sections()
+
+    def _read_lines(self, f, filename):
+        """Sort the lines of an open INP file into self.sections."""
+        section = None
+        lnum = 0
+        edata = {'fname': filename}
+        for line in f:
+            lnum += 1
+            edata['lnum'] = lnum
+            line = line.strip()
+            if not line:
+                # Blank line
+                continue
+            elif line.startswith('['):
+                vals = line.split(None, 1)
+                sec = vals[0].upper()
+                edata['sec'] = sec
+                if sec in _INP_SECTIONS:
+                    section = sec
+                    #logger.info('%(fname)s:%(lnum)-6d %(sec)13s section found' % edata)
                     continue
-                elif section is None:
-                    logger.debug('Found confusing line: %s', repr(line))
-                    raise RuntimeError('%(fname)s:%(lnum)d: Non-comment outside of valid section!' % edata)
-                # We have text, and we are in a section
-                self.sections[section].append((lnum, line))
+                elif sec == '[END]':
+                    #logger.info('%(fname)s:%(lnum)-6d %(sec)13s end of file found' % edata)
+                    section = None
+                    break
+                else:
+                    raise RuntimeError('%(fname)s:%(lnum)d: Invalid section "%(sec)s"' % edata)
+            elif section is None and line.startswith(';'):
+                self.top_comments.append(line[1:])
+                continue
+            elif section is None:
+                logger.debug('Found confusing line: %s', repr(line))
+                raise RuntimeError('%(fname)s:%(lnum)d: Non-comment outside of valid section!' % edata)
+            # We have text, and we are in a section
+            self.sections[section].append((lnum, line))
+
+    def _read_sections(self, sections=None):
+        """Parse self.sections (all by default) into the water network model self.wn."""
+        wn = self.wn
 
         # Parse each of the sections
         # The order of operations is important as certain things require prior knowledge
-
-        ### OPTIONS
-        self._read_options()
-
-        ### TIMES
-        self._read_times()
-
-        ### CURVES
-        self._read_curves()
-
-        ### PATTERNS
-        self._read_patterns()
-
-        ### JUNCTIONS
-        self._read_junctions()
-
-        ### RESERVOIRS
-        self._read_reservoirs()
-
-        ### TANKS
-        self._read_tanks()
-
-        ### PIPES
-        self._read_pipes()
-
-        ### PUMPS
-        self._read_pumps()
-
-        ### VALVES
-        self._read_valves()
-
-        ### COORDINATES
-        self._read_coordinates()
-
-        ### SOURCES
-        self._read_sources()
-
-        ### STATUS
-        self._read_status()
-
-        ### CONTROLS
-        self._read_controls()
-
-        ### RULES
-        self._read_rules()
-
-        ### REACTIONS
-        self._read_reactions()
-
-        ### TITLE
-        self._read_title()
-
-        ### ENERGY
-        self._read_energy()
-
-        ### DEMANDS
-        self._read_demands()
-
-        ### EMITTERS
-        self._read_emitters()
-
-        self._read_mixing()
-        self._read_report()
-        self._read_vertices()
-        self._read_labels()
-
-        ### Parse Backdrop
-        self._read_backdrop()
-
-        ### TAGS
-        self._read_tags()
+        readers = [('[OPTIONS]', self._read_options),
+                   ('[TIMES]', self._read_times),
+                   ('[CURVES]', self._read_curves),
+                   ('[PATTERNS]', self._read_patterns),
+                   ('[JUNCTIONS]', self._read_junctions),
+                   ('[RESERVOIRS]', self._read_reservoirs),
+                   ('[TANKS]', self._read_tanks),
+                   ('[PIPES]', self._read_pipes),
+                   ('[PUMPS]', self._read_pumps),
+                   ('[VALVES]', self._read_valves),
+                   ('[COORDINATES]', self._read_coordinates),
+                   ('[SOURCES]', self._read_sources),
+                   ('[STATUS]', self._read_status),
+                   ('[CONTROLS]', self._read_controls),
+                   ('[RULES]', self._read_rules),
+                   ('[REACTIONS]', self._read_reactions),
+                   ('[TITLE]', self._read_title),
+                   ('[ENERGY]', self._read_energy),
+                   ('[DEMANDS]', self._read_demands),
+                   ('[EMITTERS]', self._read_emitters),
+                   ('[MIXING]', self._read_mixing),
+                   ('[REPORT]', self._read_report),
+                   ('[VERTICES]', self._read_vertices),
+                   ('[LABELS]', self._read_labels),
+                   ('[BACKDROP]', self._read_backdrop),
+                   ('[TAGS]', self._read_tags)]
+        for sec, reader in readers:
+            if sections is None or sec in sections:
+                reader()
 
         # Set the _inpfile io data inside the water network, so it is saved somewhere
         wn._inpfile = self
@@ -383,10 +362,26 @@ class InpFile(object):
         """
         Write a water network model into an EPANET INP file.
 
+        The text of the sections that have a line per junction or pipe
+        (junctions, pipes, demands, coordinates, vertices and tags) is kept
+        after writing. When the same InpFile writes the same model again with
+        the same units, each of these sections is copied from the kept text,
+        without reading the elements, unless the model reports a change that
+        the section depends on: the
+        :attr:`~wntr.network.base.ColumnStore.data_version` of the node or
+        link column store (set by element properties such as elevation,
+        diameter, tag, coordinates and vertices, and by adding or removing
+        elements) or the
+        :attr:`~wntr.network.model.PatternRegistry.version` (set by changes
+        to patterns and junction demands). Changing an element through its
+        properties is therefore always written. The other sections are
+        formatted on every write.
+
         Parameters
         ----------
-        filename : str
-            Name of the EPANET INP file.
+        filename : str or file-like
+            Name of the EPANET INP file, or a binary file-like object
+            (such as io.BytesIO) to write to.
         units : str, int or FlowUnits
             Name of the units being written to the EPANET INP file.
         
@@ -394,6 +389,15 @@ class InpFile(object):
 
         if not isinstance(wn, WaterNetworkModel):
             raise ValueError('Must pass a WaterNetworkModel object')
+        self._set_write_units(wn, units)
+        if hasattr(filename, 'write'):
+            self._write_sections(filename, wn)
+        else:
+            with io.open(filename, 'wb') as f:
+                self._write_sections(f, wn)
+
+    def _set_write_units(self, wn, units):
+        """Set the flow and mass units used by the writer."""
         if units is not None and isinstance(units, str):
             units=units.upper()
             self.flow_units = FlowUnits[units]
@@ -410,40 +414,68 @@ class InpFile(object):
             self.flow_units = FlowUnits.GPM
         if self.mass_units is None:
             self.mass_units = MassUnits.mg
-        with io.open(filename, 'wb') as f:
-            self._write_title(f, wn)
-            self._write_junctions(f, wn)
-            self._write_reservoirs(f, wn)
-            self._write_tanks(f, wn)
-            self._write_pipes(f, wn)
-            self._write_pumps(f, wn)
-            self._write_valves(f, wn)
-
-            self._write_tags(f, wn)
-            self._write_demands(f, wn)
-            self._write_status(f, wn)
-            self._write_patterns(f, wn)
-            self._write_curves(f, wn)
-            self._write_controls(f, wn)
-            self._write_rules(f, wn)
-            self._write_energy(f, wn)
-            self._write_emitters(f, wn)
-
-            self._write_quality(f, wn)
-            self._write_sources(f, wn)
-            self._write_reactions(f, wn)
-            self._write_mixing(f, wn)
-
-            self._write_times(f, wn)
-            self._write_report(f, wn)
-            self._write_options(f, wn)
-
-            self._write_coordinates(f, wn)
-            self._write_vertices(f, wn)
-            self._write_labels(f, wn)
-            self._write_backdrop(f, wn)
-
-            self._write_end(f, wn)
+
+    def _write_sections(self, f, wn, sections=None):
+        """Write the INP sections (all by default) to an open binary file."""
+        writers = [('[TITLE]', self._write_title),
+                   ('[JUNCTIONS]', self._write_junctions),
+                   ('[RESERVOIRS]', self._write_reservoirs),
+                   ('[TANKS]', self._write_tanks),
+                   ('[PIPES]', self._write_pipes),
+                   ('[PUMPS]', self._write_pumps),
+                   ('[VALVES]', self._write_valves),
+
+                   ('[TAGS]', self._write_tags),
+                   ('[DEMANDS]', self._write_demands),
+                   ('[STATUS]', self._write_status),
+                   ('[PATTERNS]', self._write_patterns),
+                   ('[CURVES]', self._write_curves),
+                   ('[CONTROLS]', self._write_controls),
+                   ('[RULES]', self._write_rules),
+                   ('[ENERGY]', self._write_energy),
+                   ('[EMITTERS]', self._write_emitters),
+
+                   ('[QUALITY]', self._write_quality),
+                   ('[SOURCES]', self._write_sources),
+                   ('[REACTIONS]', self._write_reactions),
+                   ('[MIXING]', self._write_mixing),
+
+                   ('[TIMES]', self._write_times),
+                   ('[REPORT]', self._write_report),
+                   ('[OPTIONS]', self._write_options),
+
+                   ('[COORDINATES]', self._write_coordinates),
+                   ('[VERTICES]', self._write_vertices),
+                   ('[LABELS]', self._write_labels),
+                   ('[BACKDROP]', self._write_backdrop),
+
+                   ('[END]', self._write_end)]
+        for sec, writer in writers:
+            if sections is None or sec in sections:
+                writer(f, wn)
+
+    def _write_cached(self, f, wn, section, key, records, render):
+        """
+        Write a section that is reused while the model is unchanged.
+
+        key is a tuple of the column stores of wn that the section depends
+        on, followed by their version counters. If the key and the units are
+        equal to those of the previous write, the previous text is written.
+        Otherwise render(records(wn)) returns the section text.
+        """
+        key = (self.flow_units, self.mass_units) + key
+        cached = self._section_cache.get(section)
+        if cached is not None and cached[0] == key:
+            text = cached[1]
+        else:
+            text = render(records(wn)).encode('ascii')
+            self._section_cache[section] = (key, text)
+        f.write(text)
+
+    @staticmethod
+    def _demand_key(wn):
+        return (wn._node_columns, wn._node_columns.data_version,
+                wn._pattern_reg.version, wn.options.hydraulic.pattern)
 
     ### Network Components
 
@@ -467,64 +499,59 @@ class InpFile(object):
                 f.write('{}\n'.format(line).encode('ascii'))
         f.write('\n'.encode('ascii'))
 
+    def _tokenize_section(self, section):
+        """Split the lines of a section into lists of words, removing comments and blank lines."""
+        rows = [line.split(';', 1)[0].split() for lnum, line in self.sections[section]]
+        return [row for row in rows if row]
+
     def _read_junctions(self):
-#        try:
-            for lnum, line in self.sections['[JUNCTIONS]']:
-                line = line.split(';')[0]
-                current = line.split()
-                if current == []:
-                    continue
-                if len(current) > 3:
-                    pat = current[3]
-                elif self.wn.options.hydraulic.pattern:
-                    pat = self.wn.options.hydraulic.pattern
-                else:
-                    pat = self.wn.patterns.default_pattern
-                base_demand = 0.0
-                if len(current) > 2:
-                    base_demand = to_si(self.flow_units, float(current[2]), HydParam.Demand)
-                self.wn.add_junction(current[0],
-                                base_demand,
-                                pat,
-                                to_si(self.flow_units, float(current[1]), HydParam.Elevation),
-                                demand_category='EN2 base')
-#        except Exception as e:
-#            print(line)
-#            raise e
+        rows = self._tokenize_section('[JUNCTIONS]')
+        if len(rows) == 0:
+            return
+        names = [row[0] for row in rows]
+        elevations = _float_column(rows, 1)
+        base_demands = _float_column(rows, 2, 0.0)
+        patterns = [row[3] if len(row) > 3 else None for row in rows]
+        if None in patterns:
+            # each junction without a pattern gets its own default pattern object
+            default_pat = self.wn.options.hydraulic.pattern
+            patterns = [pat if pat is not None else (default_pat or self.wn.patterns.default_pattern)
+                        for pat in patterns]
+        elevations = to_si(self.flow_units, elevations, HydParam.Elevation).tolist()
+        base_demands = to_si(self.flow_units, base_demands, HydParam.Demand).tolist()
+        self.wn._add_junctions(names, base_demands, patterns, elevations,
+                               demand_category='EN2 base')
 
     def _write_junctions(self, f, wn):
-        f.write('[JUNCTIONS]\n'.encode('ascii'))
-        f.write(_JUNC_LABEL.format(';ID', 'Elevation', 'Demand', 'Pattern').encode('ascii'))
-        nnames = list(wn.junction_name_list)
-        # nnames.sort()
-        for junction_name in nnames:
-            junction = wn.nodes[junction_name]
-            if junction.demand_timeseries_list:
-                base_demands = junction.demand_timeseries_list.base_demand_list(category='EN2 base')
-                demand_patterns = junction.demand_timeseries_list.pattern_list(category='EN2 base')
-                if base_demands:
-                    base_demand = base_demands[0]
-                else:
-                    base_demand = 0.0
-                if demand_patterns:
-                    if demand_patterns[0] == wn.options.hydraulic.pattern:
-                        demand_pattern = None
-                    else:
-                        demand_pattern = demand_patterns[0]
-                else:
-                    demand_pattern = None
-            else:
-                base_demand = 0.0
-                demand_pattern = None
-            E = {'name': junction_name,
-                 'elev': from_si(self.flow_units, junction.elevation, HydParam.Elevation),
-                 'dem': from_si(self.flow_units, base_demand, HydParam.Demand),
-                 'pat': '',
-                 'com': ';'}
-            if demand_pattern is not None:
-                E['pat'] = str(demand_pattern)
-            f.write(_JUNC_ENTRY.format(**E).encode('ascii'))
-        f.write('\n'.encode('ascii'))
+        self._write_cached(f, wn, '[JUNCTIONS]', self._demand_key(wn),
+                           self._junction_records, self._render_junctions)
+
+    def _junction_records(self, wn):
+        default_pattern = wn.options.hydraulic.pattern
+        records = []
+        for junction_name, junction in wn.junctions():
+            base_demand = 0.0
+            demand_pattern = ''
+            for demand in junction.demand_timeseries_list:
+                if demand.category == 'EN2 base':
+                    base_demand = demand.base_value
+                    pattern = demand.pattern
+                    if pattern is not None and pattern != default_pattern:
+                        demand_pattern = str(pattern)
+                    break
+            records.append((junction_name, junction.elevation, base_demand, demand_pattern))
+        return records
+
+    def _render_junctions(self, records):
+        lines = ['[JUNCTIONS]\n', _JUNC_LABEL.format(';ID', 'Elevation', 'Demand', 'Pattern')]
+        if records:
+            names, elevations, base_demands, patterns = zip(*records)
+            elevations = from_si(self.flow_units, np.array(elevations), HydParam.Elevation).tolist()
+            base_demands = from_si(self.flow_units, np.array(base_demands), HydParam.Demand).tolist()
+            for name, elev, dem, pat in zip(names, elevations, base_demands, patterns):
+                lines.append(_JUNC_ENTRY.format(name=name, elev=elev, dem=dem, pat=pat, com=';'))
+        lines.append('\n')
+        return ''.join(lines)
 
     def _read_reservoirs(self):
         for lnum, line in self.sections['[RESERVOIRS]']:
@@ -608,52 +635,54 @@ class InpFile(object):
         f.write('\n'.encode('ascii'))
 
     def _read_pipes(self):
-        for lnum, line in self.sections['[PIPES]']:
-            line = line.split(';')[0]
-            current = line.split()
-            if current == []:
-                continue
-            if current[7].upper() == 'CV':
-                self.wn.add_pipe(current[0],
-                            current[1],
-                            current[2],
-                            to_si(self.flow_units, float(current[3]), HydParam.Length),
-                            to_si(self.flow_units, float(current[4]), HydParam.PipeDiameter),
-                            float(current[5]),
-                            float(current[6]),
-                            LinkStatus.Open,
-                            True)
+        rows = self._tokenize_section('[PIPES]')
+        if len(rows) == 0:
+            return
+        names = [row[0] for row in rows]
+        start_nodes = [row[1] for row in rows]
+        end_nodes = [row[2] for row in rows]
+        lengths = to_si(self.flow_units, _float_column(rows, 3), HydParam.Length).tolist()
+        diameters = to_si(self.flow_units, _float_column(rows, 4), HydParam.PipeDiameter).tolist()
+        roughnesses = _float_column(rows, 5).tolist()
+        minor_losses = _float_column(rows, 6, 0.0).tolist()
+        statuses = []
+        check_valves = []
+        for row in rows:
+            status = row[7].upper() if len(row) > 7 else 'OPEN'
+            if status == 'CV':
+                statuses.append(LinkStatus.Open)
+                check_valves.append(True)
             else:
-                self.wn.add_pipe(current[0],
-                            current[1],
-                            current[2],
-                            to_si(self.flow_units, float(current[3]), HydParam.Length),
-                            to_si(self.flow_units, float(current[4]), HydParam.PipeDiameter),
-                            float(current[5]),
-                            float(current[6]),
-                            LinkStatus[current[7].upper()])
+                statuses.append(LinkStatus[status])
+                check_valves.append(False)
+        self.wn._add_pipes(names, start_nodes, end_nodes, lengths, diameters,
+                           roughnesses, minor_losses, statuses, check_valves)
 
     def _write_pipes(self, f, wn):
-        f.write('[PIPES]\n'.encode('ascii'))
-        f.write(_PIPE_LABEL.format(';ID', 'Node1', 'Node2', 'Length', 'Diameter',
-                                   'Roughness', 'Minor Loss', 'Status').encode('ascii'))
-        lnames = list(wn.pipe_name_list)
-        # lnames.sort()
-        for pipe_name in lnames:
-            pipe = wn.links[pipe_name]
-            E = {'name': pipe_name,
-                 'node1': pipe.start_node_name,
-                 'node2': pipe.end_node_name,
-                 'len': from_si(self.flow_units, pipe.length, HydParam.Length),
-                 'diam': from_si(self.flow_units, pipe.diameter, HydParam.PipeDiameter),
-                 'rough': pipe.roughness,
-                 'mloss': pipe.minor_loss,
-                 'status': str(pipe.initial_status),
-                 'com': ';'}
-            if pipe.cv:
-                E['status'] = 'CV'
-            f.write(_PIPE_ENTRY.format(**E).encode('ascii'))
-        f.write('\n'.encode('ascii'))
+        self._write_cached(f, wn, '[PIPES]', (wn._link_columns, wn._link_columns.data_version),
+                           self._pipe_records, self._render_pipes)
+
+    def _pipe_records(self, wn):
+        records = []
+        for pipe_name, pipe in wn.pipes():
+            records.append((pipe_name, pipe.start_node_name, pipe.end_node_name, pipe.length,
+                            pipe.diameter, pipe.roughness, pipe.minor_loss,
+                            'CV' if pipe.cv else str(pipe.initial_status)))
+        return records
+
+    def _render_pipes(self, records):
+        lines = ['[PIPES]\n', _PIPE_LABEL.format(';ID', 'Node1', 'Node2', 'Length', 'Diameter',
+                                                  'Roughness', 'Minor Loss', 'Status')]
+        if records:
+            names, node1s, node2s, lengths, diameters, roughnesses, minor_losses, statuses = zip(*records)
+            lengths = from_si(self.flow_units, np.array(lengths), HydParam.Length).tolist()
+            diameters = from_si(self.flow_units, np.array(diameters), HydParam.PipeDiameter).tolist()
+            for name, node1, node2, length, diam, rough, mloss, status in zip(
+                    names, node1s, node2s, lengths, diameters, roughnesses, minor_losses, statuses):
+                lines.append(_PIPE_ENTRY.format(name=name, node1=node1, node2=node2, len=length, diam=diam,
+                                                rough=rough, mloss=mloss, status=status, com=';'))
+        lines.append('\n')
+        return ''.join(lines)
 
     def _read_pumps(self):
         def create_curve(curve_name):
@@ -1329,23 +1358,28 @@ class InpFile(object):
                                          pattern, category))
 
     def _write_demands(self, f, wn):
-        f.write('[DEMANDS]\n'.encode('ascii'))
+        self._write_cached(f, wn, '[DEMANDS]', self._demand_key(wn),
+                           self._demand_records, self._render_demands)
+
+    def _demand_records(self, wn):
+        pattern_names = set(wn.pattern_name_list)
+        records = []
+        for node, junction in wn.junctions():
+            for demand in junction.demand_timeseries_list:
+                if demand.category == 'EN2 base': continue
+                pattern_name = demand.pattern_name
+                records.append((node, demand.base_value, pattern_name if pattern_name in pattern_names else ''))
+        return records
+
+    def _render_demands(self, records):
         entry = '{:10s} {:10s} {:10s}\n'
         label = '{:10s} {:10s} {:10s}\n'
-        f.write(label.format(';ID', 'Demand', 'Pattern').encode('ascii'))
-        nodes = list(wn.junction_name_list)
-        # nodes.sort()
-        for node in nodes:
-            demands = wn.get_node(node).demand_timeseries_list
-            for ct, demand in enumerate(demands):
-                if demand.category == 'EN2 base': continue
-                E = {'node': node,
-                     'base': from_si(self.flow_units, demand.base_value, HydParam.Demand),
-                     'pat': ''}
-                if demand.pattern_name in wn.pattern_name_list:
-                    E['pat'] = demand.pattern_name
-                f.write(entry.format(E['node'], str(E['base']), E['pat']).encode('ascii'))
-        f.write('\n'.encode('ascii'))
+        lines = ['[DEMANDS]\n', label.format(';ID', 'Demand', 'Pattern')]
+        for node, base, pat in records:
+            base = from_si(self.flow_units, base, HydParam.Demand)
+            lines.append(entry.format(node, str(base), pat))
+        lines.append('\n')
+        return ''.join(lines)
 
     ### Water Quality
 
@@ -1902,24 +1936,30 @@ class InpFile(object):
     ### Network Map/Tags
 
     def _read_coordinates(self):
-        for lnum, line in self.sections['[COORDINATES]']:
-            line = line.split(';')[0]
-            current = line.split()
-            if current == []:
-                continue
-#            assert(len(current) == 3), ("Error reading node coordinates. Check format.")
-            node = self.wn.get_node(current[0])
-            node.coordinates = (float(current[1]), float(current[2]))
+        rows = self._tokenize_section('[COORDINATES]')
+        if len(rows) == 0:
+            return
+        x = _float_column(rows, 1).tolist()
+        y = _float_column(rows, 2).tolist()
+        get_node = self.wn.get_node
+        for row, xi, yi in zip(rows, x, y):
+            get_node(row[0]).coordinates = (xi, yi)
 
     def _write_coordinates(self, f, wn):
-        f.write('[COORDINATES]\n'.encode('ascii'))
+        self._write_cached(f, wn, '[COORDINATES]', (wn._node_columns, wn._node_columns.data_version),
+                           self._coordinate_records, self._render_coordinates)
+
+    def _coordinate_records(self, wn):
+        return [(name, node.coordinates) for name, node in wn.nodes()]
+
+    def _render_coordinates(self, records):
         entry = '{:10s} {:20.9f} {:20.9f}\n'
         label = '{:10s} {:10s} {:10s}\n'
-        f.write(label.format(';Node', 'X-Coord', 'Y-Coord').encode('ascii'))
-        for name, node in wn.nodes():
-            val = node.coordinates
-            f.write(entry.format(name, val[0], val[1]).encode('ascii'))
-        f.write('\n'.encode('ascii'))
+        lines = ['[COORDINATES]\n', label.format(';Node', 'X-Coord', 'Y-Coord')]
+        for name, val in records:
+            lines.append(entry.format(name, val[0], val[1]))
+        lines.append('\n')
+        return ''.join(lines)
 
     def _read_vertices(self):
         for lnum, line in self.sections['[VERTICES]']:
@@ -1932,20 +1972,27 @@ class InpFile(object):
                 continue
             link_name = current[0]
             link = self.wn.get_link(link_name)
-            link._vertices.append((float(current[1]), float(current[2])))
+            link.vertices.append((float(current[1]), float(current[2])))
 
     def _write_vertices(self, f, wn):
-        f.write('[VERTICES]\n'.encode('ascii'))
+        self._write_cached(f, wn, '[VERTICES]', (wn._link_columns, wn._link_columns.data_version),
+                           self._vertex_records, self._render_vertices)
+
+    def _vertex_records(self, wn):
+        records = []
+        for pipe_name, pipe in wn.pipes():
+            for vert in pipe._vertices:
+                records.append((pipe_name, vert[0], vert[1]))
+        return records
+
+    def _render_vertices(self, records):
         entry = '{:10s} {:20.9f} {:20.9f}\n'
         label = '{:10s} {:10s} {:10s}\n'
-        f.write(label.format(';Link', 'X-Coord', 'Y-Coord').encode('ascii'))
-        lnames = list(wn.pipe_name_list)
-        # lnames.sort()
-        for pipe_name in lnames:
-            pipe = wn.links[pipe_name]
-            for vert in pipe._vertices:
-                f.write(entry.format(pipe_name, vert[0], vert[1]).encode('ascii'))
-        f.write('\n'.encode('ascii'))
+        lines = ['[VERTICES]\n', label.format(';Link', 'X-Coord', 'Y-Coord')]
+        for record in records:
+            lines.append(entry.format(*record))
+        lines.append('\n')
+        return ''.join(lines)
 
     def _read_labels(self):
         labels = []
@@ -2002,23 +2049,28 @@ class InpFile(object):
                 continue
 
     def _write_tags(self, f, wn):
-        f.write('[TAGS]\n'.encode('ascii'))
+        key = (wn._node_columns, wn._node_columns.data_version,
+               wn._link_columns, wn._link_columns.data_version)
+        self._write_cached(f, wn, '[TAGS]', key, self._tag_records, self._render_tags)
+
+    def _tag_records(self, wn):
+        records = []
+        for node_name, node in wn.nodes():
+            if node.tag:
+                records.append(('NODE', node_name, node.tag))
+        link_tags = [(link_name, link.tag) for link_name, link in wn.links() if link.tag]
+        for link_name, tag in sorted(link_tags):
+            records.append(('LINK', link_name, tag))
+        return records
+
+    def _render_tags(self, records):
         entry = '{:10s} {:10s} {:10s}\n'
         label = '{:10s} {:10s} {:10s}\n'
-        f.write(label.format(';type', 'name', 'tag').encode('ascii'))
-        nnodes = list(wn.node_name_list)
-        # nnodes.sort()
-        for node_name in nnodes:
-            node = wn.nodes[node_name]
-            if node.tag:
-                f.write(entry.format('NODE', node_name, node.tag).encode('ascii'))
-        nlinks = list(wn.link_name_list)
-        nlinks.sort()
-        for link_name in nlinks:
-            link = wn.links[link_name]
-            if link.tag:
-                f.write(entry.format('LINK', link_name, link.tag).encode('ascii'))
-        f.write('\n'.encode('ascii'))
+        lines = ['[TAGS]\n', label.format(';type', 'name', 'tag')]
+        for record in records:
+            lines.append(entry.format(*record))
+        lines.append('\n')
+        return ''.join(lines)
 
     ### End of File
 
@@ -2525,8 +2577,279 @@ class BinFile(object):
         """
         pass
 
+    def _read_prolog(self, fin):
+        """Read the prolog, the network description and the energy usage.
+
+        Sets the attributes describing the simulation (number of elements,
+        units, report times, etc.), saves the network description through
+        :func:`~save_network_desc_line` and leaves the file positioned at the
+        start of the extended period results.
+
+        Parameters
+        ----------
+        fin : file
+            Binary output file, opened at the start of the file
+
+        """
+        dt_str = '|S{}'.format(self.idlen)
+        ftype = self.ftype
+        idlen = self.idlen
+        logger.debug('... read prolog information ...')
+        prolog = np.fromfile(fin, dtype=np.int32, count=15)
+        magic1 = prolog[0]
+        version = prolog[1]
+        nnodes = prolog[2]
+        ntanks = prolog[3]
+        nlinks = prolog[4]
+        npumps = prolog[5]
+        nvalve = prolog[6]
+        wqopt = QualType(prolog[7])
+        srctrace = prolog[8]
+        flowunits = FlowUnits(prolog[9])
+        presunits = PressureUnits(prolog[10])
+        statsflag = StatisticsType(prolog[11])
+        reportstart = prolog[12]
+        reportstep = prolog[13]
+        duration = prolog[14]
+        logger.debug('EPANET/Toolkit version %d',version)
+        logger.debug('Nodes: %d; Tanks/Resrv: %d Links: %d; Pumps: %d; Valves: %d',
+                     nnodes, ntanks, nlinks, npumps, nvalve)
+        logger.debug('WQ opt: %s; Trace Node: %s; Flow Units %s; Pressure Units %s',
+                     wqopt, srctrace, flowunits, presunits)
+        logger.debug('Statistics: %s; Report Start %d, step %d; Duration=%d sec',
+                     statsflag, reportstart, reportstep, duration)
+
+        # Ignore the title lines
+        np.fromfile(fin, dtype=np.uint8, count=240)
+        inpfile = np.fromfile(fin, dtype=np.uint8, count=260)
+        rptfile = np.fromfile(fin, dtype=np.uint8, count=260)
+        chemical = str(np.fromfile(fin, dtype=dt_str, count=1)[0])
+#            wqunits = ''.join([chr(f) for f in np.fromfile(fin, dtype=np.uint8, count=idlen) if f!=0 ])
+        wqunits = str(np.fromfile(fin, dtype=dt_str, count=1)[0])
+        mass = wqunits.split('/',1)[0]
+        if mass in ['mg', 'ug', u'mg', u'ug']:
+            massunits = MassUnits[mass]
+        else:
+            massunits = MassUnits.mg            
+        self.flow_units = flowunits
+        self.pres_units = presunits
+        self.quality_type = wqopt
+        self.mass_units = massunits
+        self.num_nodes = int(nnodes)
+        self.num_tanks = int(ntanks)
+        self.num_links = int(nlinks)
+        self.num_pumps = int(npumps)
+        self.num_valves = int(nvalve)
+        self.report_start = reportstart
+        self.report_step = reportstep
+        self.duration = duration
+        self.chemical = chemical
+        self.chem_units = wqunits
+        self.inp_file = inpfile
+        self.rpt_file = rptfile
+        nodenames = []
+        linknames = []
+        nodenames = np.array(np.fromfile(fin, dtype=dt_str, count=nnodes), dtype=str).tolist()
+        linknames = np.array(np.fromfile(fin, dtype=dt_str, count=nlinks), dtype=str).tolist()
+        self.node_names = nodenames
+        self.link_names = linknames
+        linkstart = np.array(np.fromfile(fin, dtype=np.int32, count=nlinks), dtype=int)
+        linkend = np.array(np.fromfile(fin, dtype=np.int32, count=nlinks), dtype=int)
+        linktype = np.fromfile(fin, dtype=np.int32, count=nlinks)
+        tankidxs = np.fromfile(fin, dtype=np.int32, count=ntanks)
+        tankarea = np.fromfile(fin, dtype=np.dtype(ftype), count=ntanks)
+        elevation = np.fromfile(fin, dtype=np.dtype(ftype), count=nnodes)
+        linklen = np.fromfile(fin, dtype=np.dtype(ftype), count=nlinks)
+        diameter = np.fromfile(fin, dtype=np.dtype(ftype), count=nlinks)
+        self.save_network_desc_line('link_start', linkstart)
+        self.save_network_desc_line('link_end', linkend)
+        self.save_network_desc_line('link_type', linktype)
+        self.save_network_desc_line('tank_node_index', tankidxs)
+        self.save_network_desc_line('tank_area', tankarea)
+        self.save_network_desc_line('node_elevation', elevation)
+        self.save_network_desc_line('link_length', linklen)
+        self.save_network_desc_line('link_diameter', diameter)
+
+        logger.debug('... read energy data ...')
+        for i in range(npumps):
+            pidx = int(np.fromfile(fin,dtype=np.int32, count=1))
+            energy = np.fromfile(fin, dtype=np.dtype(ftype), count=6)
+            self.save_energy_line(pidx, linknames[pidx-1], energy)
+        peakenergy = np.fromfile(fin, dtype=np.dtype(ftype), count=1)
+        self.peak_energy = peakenergy
+
+        logger.debug('... read EP simulation data ...')
+        reporttimes = np.arange(reportstart, duration+reportstep, reportstep)
+        nrptsteps = len(reporttimes)
+        statsN = nrptsteps
+        if statsflag in [StatisticsType.Maximum, StatisticsType.Minimum, StatisticsType.Range]:
+            nrptsteps = 1
+            reporttimes = [reportstart + reportstep]
+        self.num_periods = nrptsteps
+        self.report_times = reporttimes
+        self.magic = magic1
+        self.link_type_codes = linktype
+
+        # set up results metadata dictionary
+        if wqopt == QualType.Age:
+            self.results.meta['quality_mode'] = 'AGE'
+            self.results.meta['quality_units'] = 's'
+        elif wqopt == QualType.Trace:
+            self.results.meta['quality_mode'] = 'TRACE'
+            self.results.meta['quality_units'] = '%'
+            self.results.meta['quality_trace'] = srctrace
+        elif wqopt == QualType.Chem:
+            self.results.meta['quality_mode'] = 'CHEMICAL'
+            self.results.meta['quality_units'] = wqunits
+            self.results.meta['quality_chem'] = chemical
+        self.results.time = reporttimes
+        self.save_network_desc_line('report_times', reporttimes)
+        self.save_network_desc_line('node_elevation', pd.Series(data=elevation, index=nodenames))
+        self.save_network_desc_line('link_length', pd.Series(data=linklen, index=linknames))
+        self.save_network_desc_line('link_diameter', pd.Series(data=diameter, index=linknames))
+        self.save_network_desc_line('stats_mode', statsflag)
+        self.save_network_desc_line('stats_N', statsN)
+        nodetypes = np.array(['Junction']*self.num_nodes, dtype='|S10')
+        nodetypes[tankidxs-1] = 'Tank'
+        nodetypes[tankidxs[tankarea==0]-1] = 'Reservoir'
+        linktypes = np.array(['Pipe']*self.num_links)
+        linktypes[ linktype == EN.PUMP ] = 'Pump'
+        linktypes[ linktype > EN.PUMP ] = 'Valve'
+        self.save_network_desc_line('link_type', pd.Series(data=linktypes, index=linknames, copy=True))
+        linktypes[ linktype == EN.CVPIPE ] = 'CV'
+        linktypes[ linktype == EN.FCV ] = 'FCV'
+        linktypes[ linktype == EN.PRV ] = 'PRV'
+        linktypes[ linktype == EN.PSV ] = 'PSV'
+        linktypes[ linktype == EN.PBV ] = 'PBV'
+        linktypes[ linktype == EN.TCV ] = 'TCV'
+        linktypes[ linktype == EN.GPV ] = 'GPV'
+        self.save_network_desc_line('link_subtype', pd.Series(data=linktypes, index=linknames, copy=True))
+        self.save_network_desc_line('node_type', pd.Series(data=nodetypes, index=nodenames, copy=True))
+        self.save_network_desc_line('node_names', np.array(nodenames, dtype=str))
+        self.save_network_desc_line('link_names', np.array(linknames, dtype=str))
+        names = np.array(nodenames, dtype=str)
+        self.save_network_desc_line('link_start', pd.Series(data=names[linkstart-1], index=linknames, copy=True))
+        self.save_network_desc_line('link_end', pd.Series(data=names[linkend-1], index=linknames, copy=True))
+
+    def _select(self, names, selection, kind):
+        """Return the indices of the selected names (all if selection is None)"""
+        if selection is None:
+            return slice(None), names
+        position = dict((name, i) for i, name in enumerate(names))
+        try:
+            index = np.array([position[name] for name in selection], dtype=int)
+        except KeyError as e:
+            raise KeyError('{} {} is not in the binary output file'.format(kind, e))
+        return index, list(selection)
+
+    def _memmap_records(self, filename, offset):
+        """Memory map the extended period records, one row per report period.
+
+        Returns None if the file does not contain any report period.
+        """
+        record = 4*self.num_nodes + 8*self.num_links
+        itemsize = np.dtype(self.ftype).itemsize
+        nperiods = self.num_periods
+        available = (os.path.getsize(filename) - offset) // (record*itemsize)
+        if available < nperiods:
+            logger.warning('Binary output file has %d of %d report periods', available, nperiods)
+            nperiods = max(int(available), 0)
+        if nperiods == 0:
+            return None
+        return np.memmap(filename, dtype=np.dtype(self.ftype), mode='r', offset=offset,
+                         shape=(nperiods, record))
+
+    def iter_periods(self, filename):
+        """Iterate over the report periods of a binary file.
+
+        The results are memory mapped and each report period is yielded as
+        views into the file, so the whole simulation is never held in memory.
+        The values are in the EPANET units of the simulation (see
+        :attr:`~flow_units`) and the link status is not converted. The prolog
+        is read first, so the names, units and other attributes are available
+        once iteration starts.
+
+        Parameters
+        ----------
+        filename : str
+            An EPANET BIN output file
+
+        Yields
+        ------
+        tuple
+            The report time (in seconds), the node results, an array of shape
+            (4, number of nodes) with rows demand, head, pressure and quality,
+            and the link results, an array of shape (8, number of links) with
+            rows flowrate, velocity, headloss, linkquality, status, setting,
+            rxnrate and frictionfact. Nodes and links are in the order of
+            :attr:`~node_names` and :attr:`~link_names`.
+
+        """
+        with open(filename, 'rb') as fin:
+            self._read_prolog(fin)
+            offset = fin.tell()
+        data = self._memmap_records(filename, offset)
+        if data is None:
+            return
+        nnodes = self.num_nodes
+        nlinks = self.num_links
+        for period in range(data.shape[0]):
+            record = data[period]
+            yield (self.report_times[period], record[:4*nnodes].reshape(4, nnodes),
+                   record[4*nnodes:].reshape(8, nlinks))
+
+    def _read_ep_results(self, filename, offset, nodes=None, links=None,
+                         start_time=None, end_time=None):
+        """Read the requested extended period results through a memory map.
+
+        The results for each report period are stored as one record of
+        4 node result types and 8 link result types. Only the columns of the
+        requested result types and elements and the rows of the requested
+        report periods are copied out of the file, once, into a
+        (periods, node result types, nodes) and a (periods, link result
+        types, links) array.
+
+        Returns
+        -------
+        tuple
+            the report times read, the node result type names, names and
+            array, and the link result type names, names, array and indices
+            (raw EPANET units)
+
+        """
+        nnodes = self.num_nodes
+        nlinks = self.num_links
+        data = self._memmap_records(filename, offset)
+        nperiods = 0 if data is None else data.shape[0]
+        reporttimes = np.asarray(self.report_times)[:nperiods]
+
+        # report times are sorted, so the time window is a slice
+        first = 0 if start_time is None else np.searchsorted(reporttimes, start_time, side='left')
+        last = nperiods if end_time is None else np.searchsorted(reporttimes, end_time, side='right')
+        rows = slice(first, max(first, last))
+        node_index, node_names = self._select(self.node_names, nodes, 'Node')
+        link_index, link_names = self._select(self.link_names, links, 'Link')
+
+        # result types are sorted by name, like the items of the results panels
+        node_types = sorted([item for item in self.items if item.is_node], key=lambda item: item.name)
+        link_types = sorted([item for item in self.items if item.is_link], key=lambda item: item.name)
+        times = reporttimes[rows]
+        node_values = np.empty((len(times), len(node_types), len(node_names)), dtype=np.dtype(self.ftype))
+        link_values = np.empty((len(times), len(link_types), len(link_names)), dtype=np.dtype(self.ftype))
+        if data is not None:
+            for i, result_type in enumerate(node_types):
+                block = (result_type.value - 1)*nnodes
+                node_values[:, i, :] = data[rows, block:block+nnodes][:, node_index]
+            for i, result_type in enumerate(link_types):
+                block = 4*nnodes + (result_type.value - 5)*nlinks
+                link_values[:, i, :] = data[rows, block:block+nlinks][:, link_index]
+            del data
+        return (times, [item.name for item in node_types], node_names, node_values,
+                [item.name for item in link_types], link_names, link_values, link_index)
+
 #    @run_lineprofile()
-    def read(self, filename, custom_handlers=False):
+    def read(self, filename, custom_handlers=False, nodes=None, links=None,
+             start_time=None, end_time=None):
         """Read a binary file and create a results object.
 
         Parameters
@@ -2536,7 +2859,18 @@ class BinFile(object):
         custom_handlers : bool, optional
             If true, then the the custom, by-line handlers will be used. (:func:`~save_ep_line`, 
             :func:`~setup_ep_results`, :func:`~finalize_save`, etc.) Otherwise read will use
-            a faster, all-at-once reader that reads all results.
+            a faster, memory mapped reader that only reads the result types specified
+            when the object was created, and the elements and times specified below.
+        nodes : list of str, optional
+            Node names to read results for, default is all nodes (ignored if `custom_handlers` is True)
+        links : list of str, optional
+            Link names to read results for, default is all links (ignored if `custom_handlers` is True)
+        start_time : int, optional
+            First report time (in seconds) to read, default is the report start
+            (ignored if `custom_handlers` is True)
+        end_time : int, optional
+            Last report time (in seconds) to read, default is the end of the simulation
+            (ignored if `custom_handlers` is True)
 
         Returns
         -------
@@ -2551,258 +2885,252 @@ class BinFile(object):
             
         """
         logger.debug('Read binary EPANET data from %s',filename)
-        dt_str = '|S{}'.format(self.idlen)
         with open(filename, 'rb') as fin:
             ftype = self.ftype
-            idlen = self.idlen
-            logger.debug('... read prolog information ...')
-            prolog = np.fromfile(fin, dtype=np.int32, count=15)
-            magic1 = prolog[0]
-            version = prolog[1]
-            nnodes = prolog[2]
-            ntanks = prolog[3]
-            nlinks = prolog[4]
-            npumps = prolog[5]
-            nvalve = prolog[6]
-            wqopt = QualType(prolog[7])
-            srctrace = prolog[8]
-            flowunits = FlowUnits(prolog[9])
-            presunits = PressureUnits(prolog[10])
-            statsflag = StatisticsType(prolog[11])
-            reportstart = prolog[12]
-            reportstep = prolog[13]
-            duration = prolog[14]
-            logger.debug('EPANET/Toolkit version %d',version)
-            logger.debug('Nodes: %d; Tanks/Resrv: %d Links: %d; Pumps: %d; Valves: %d',
-                         nnodes, ntanks, nlinks, npumps, nvalve)
-            logger.debug('WQ opt: %s; Trace Node: %s; Flow Units %s; Pressure Units %s',
-                         wqopt, srctrace, flowunits, presunits)
-            logger.debug('Statistics: %s; Report Start %d, step %d; Duration=%d sec',
-                         statsflag, reportstart, reportstep, duration)
-
-            # Ignore the title lines
-            np.fromfile(fin, dtype=np.uint8, count=240)
-            inpfile = np.fromfile(fin, dtype=np.uint8, count=260)
-            rptfile = np.fromfile(fin, dtype=np.uint8, count=260)
-            chemical = str(np.fromfile(fin, dtype=dt_str, count=1)[0])
-#            wqunits = ''.join([chr(f) for f in np.fromfile(fin, dtype=np.uint8, count=idlen) if f!=0 ])
-            wqunits = str(np.fromfile(fin, dtype=dt_str, count=1)[0])
-            mass = wqunits.split('/',1)[0]
-            if mass in ['mg', 'ug', u'mg', u'ug']:
-                massunits = MassUnits[mass]
-            else:
-                massunits = MassUnits.mg            
-            self.flow_units = flowunits
-            self.pres_units = presunits
-            self.quality_type = wqopt
-            self.mass_units = massunits
-            self.num_nodes = nnodes
-            self.num_tanks = ntanks
-            self.num_links = nlinks
-            self.num_pumps = npumps
-            self.num_valves = nvalve
-            self.report_start = reportstart
-            self.report_step = reportstep
-            self.duration = duration
-            self.chemical = chemical
-            self.chem_units = wqunits
-            self.inp_file = inpfile
-            self.rpt_file = rptfile
-            nodenames = []
-            linknames = []
-            nodenames = np.array(np.fromfile(fin, dtype=dt_str, count=nnodes), dtype=str).tolist()
-            linknames = np.array(np.fromfile(fin, dtype=dt_str, count=nlinks), dtype=str).tolist()
-            self.node_names = nodenames
-            self.link_names = linknames
-            linkstart = np.array(np.fromfile(fin, dtype=np.int32, count=nlinks), dtype=int)
-            linkend = np.array(np.fromfile(fin, dtype=np.int32, count=nlinks), dtype=int)
-            linktype = np.fromfile(fin, dtype=np.int32, count=nlinks)
-            tankidxs = np.fromfile(fin, dtype=np.int32, count=ntanks)
-            tankarea = np.fromfile(fin, dtype=np.dtype(ftype), count=ntanks)
-            elevation = np.fromfile(fin, dtype=np.dtype(ftype), count=nnodes)
-            linklen = np.fromfile(fin, dtype=np.dtype(ftype), count=nlinks)
-            diameter = np.fromfile(fin, dtype=np.dtype(ftype), count=nlinks)
-            self.save_network_desc_line('link_start', linkstart)
-            self.save_network_desc_line('link_end', linkend)
-            self.save_network_desc_line('link_type', linktype)
-            self.save_network_desc_line('tank_node_index', tankidxs)
-            self.save_network_desc_line('tank_area', tankarea)
-            self.save_network_desc_line('node_elevation', elevation)
-            self.save_network_desc_line('link_length', linklen)
-            self.save_network_desc_line('link_diameter', diameter)
-
-            logger.debug('... read energy data ...')
-            for i in range(npumps):
-                pidx = int(np.fromfile(fin,dtype=np.int32, count=1))
-                energy = np.fromfile(fin, dtype=np.dtype(ftype), count=6)
-                self.save_energy_line(pidx, linknames[pidx-1], energy)
-            peakenergy = np.fromfile(fin, dtype=np.dtype(ftype), count=1)
-            self.peak_energy = peakenergy
-
-            logger.debug('... read EP simulation data ...')
-            reporttimes = np.arange(reportstart, duration+reportstep, reportstep)
-            nrptsteps = len(reporttimes)
-            statsN = nrptsteps
-            if statsflag in [StatisticsType.Maximum, StatisticsType.Minimum, StatisticsType.Range]:
-                nrptsteps = 1
-                reporttimes = [reportstart + reportstep]
-            self.num_periods = nrptsteps
-            self.report_times = reporttimes
-
-            # set up results metadata dictionary
-            if wqopt == QualType.Age:
-                self.results.meta['quality_mode'] = 'AGE'
-                self.results.meta['quality_units'] = 's'
-            elif wqopt == QualType.Trace:
-                self.results.meta['quality_mode'] = 'TRACE'
-                self.results.meta['quality_units'] = '%'
-                self.results.meta['quality_trace'] = srctrace
-            elif wqopt == QualType.Chem:
-                self.results.meta['quality_mode'] = 'CHEMICAL'
-                self.results.meta['quality_units'] = wqunits
-                self.results.meta['quality_chem'] = chemical
-            self.results.time = reporttimes
-            self.save_network_desc_line('report_times', reporttimes)
-            self.save_network_desc_line('node_elevation', pd.Series(data=elevation, index=nodenames))
-            self.save_network_desc_line('link_length', pd.Series(data=linklen, index=linknames))
-            self.save_network_desc_line('link_diameter', pd.Series(data=diameter, index=linknames))
-            self.save_network_desc_line('stats_mode', statsflag)
-            self.save_network_desc_line('stats_N', statsN)
-            nodetypes = np.array(['Junction']*self.num_nodes, dtype='|S10')
-            nodetypes[tankidxs-1] = 'Tank'
-            nodetypes[tankidxs[tankarea==0]-1] = 'Reservoir'
-            linktypes = np.array(['Pipe']*self.num_links)
-            linktypes[ linktype == EN.PUMP ] = 'Pump'
-            linktypes[ linktype > EN.PUMP ] = 'Valve'
-            self.save_network_desc_line('link_type', pd.Series(data=linktypes, index=linknames, copy=True))
-            linktypes[ linktype == EN.CVPIPE ] = 'CV'
-            linktypes[ linktype == EN.FCV ] = 'FCV'
-            linktypes[ linktype == EN.PRV ] = 'PRV'
-            linktypes[ linktype == EN.PSV ] = 'PSV'
-            linktypes[ linktype == EN.PBV ] = 'PBV'
-            linktypes[ linktype == EN.TCV ] = 'TCV'
-            linktypes[ linktype == EN.GPV ] = 'GPV'
-            self.save_network_desc_line('link_subtype', pd.Series(data=linktypes, index=linknames, copy=True))
-            self.save_network_desc_line('node_type', pd.Series(data=nodetypes, index=nodenames, copy=True))
-            self.save_network_desc_line('node_names', np.array(nodenames, dtype=str))
-            self.save_network_desc_line('link_names', np.array(linknames, dtype=str))
-            names = np.array(nodenames, dtype=str)
-            self.save_network_desc_line('link_start', pd.Series(data=names[linkstart-1], index=linknames, copy=True))
-            self.save_network_desc_line('link_end', pd.Series(data=names[linkend-1], index=linknames, copy=True))
+            self._read_prolog(fin)
+            ep_offset = fin.tell()
+            nnodes = self.num_nodes
+            nlinks = self.num_links
+            nrptsteps = self.num_periods
+            reporttimes = self.report_times
+            nodenames = self.node_names
+            linknames = self.link_names
+            linktype = self.link_type_codes
 
             if custom_handlers is True:
                 logger.debug('... set up results object ...')
                 self.setup_ep_results(reporttimes, nodenames, linknames)
     
-                for ts in range(nrptsteps):
+                data = self._memmap_records(filename, ep_offset)
+                node_types = [ResultType.demand, ResultType.head, ResultType.pressure, ResultType.quality]
+                link_types = [ResultType.flowrate, ResultType.velocity, ResultType.headloss,
+                              ResultType.linkquality, ResultType.status, ResultType.setting,
+                              ResultType.rxnrate, ResultType.frictionfact]
+                for ts in range(0 if data is None else data.shape[0]):
                     try:
-                        demand = np.fromfile(fin, dtype=np.dtype(ftype), count=nnodes)
-                        head = np.fromfile(fin, dtype=np.dtype(ftype), count=nnodes)
-                        pressure = np.fromfile(fin, dtype=np.dtype(ftype), count=nnodes)
-                        quality = np.fromfile(fin, dtype=np.dtype(ftype), count=nnodes)
-                        flow = np.fromfile(fin, dtype=np.dtype(ftype), count=nlinks)
-                        velocity = np.fromfile(fin, dtype=np.dtype(ftype), count=nlinks)
-                        headloss = np.fromfile(fin, dtype=np.dtype(ftype), count=nlinks)
-                        linkquality = np.fromfile(fin, dtype=np.dtype(ftype), count=nlinks)
-                        linkstatus = np.fromfile(fin, dtype=np.dtype(ftype), count=nlinks)
-                        linksetting = np.fromfile(fin, dtype=np.dtype(ftype), count=nlinks)
-                        reactionrate = np.fromfile(fin, dtype=np.dtype(ftype), count=nlinks)
-                        frictionfactor = np.fromfile(fin, dtype=np.dtype(ftype), count=nlinks)
-                        self.save_ep_line(ts, ResultType.demand, demand)
-                        self.save_ep_line(ts, ResultType.head, head)
-                        self.save_ep_line(ts, ResultType.pressure, pressure)
-                        self.save_ep_line(ts, ResultType.quality, quality)
-                        self.save_ep_line(ts, ResultType.flowrate, flow)
-                        self.save_ep_line(ts, ResultType.velocity, velocity)
-                        self.save_ep_line(ts, ResultType.headloss, headloss)
-                        self.save_ep_line(ts, ResultType.linkquality, linkquality)
-                        self.save_ep_line(ts, ResultType.status, linkstatus)
-                        self.save_ep_line(ts, ResultType.setting, linksetting)
-                        self.save_ep_line(ts, ResultType.rxnrate, reactionrate)
-                        self.save_ep_line(ts, ResultType.frictionfact, frictionfactor)
+                        record = data[ts]
+                        node_block = record[:4*nnodes].reshape(4, nnodes)
+                        link_block = record[4*nnodes:].reshape(8, nlinks)
+                        for result_type, values in zip(node_types, node_block):
+                            self.save_ep_line(ts, result_type, values)
+                        for result_type, values in zip(link_types, link_block):
+                            self.save_ep_line(ts, result_type, values)
                     except Exception as e:
                         logger.exception('Error reading or writing EP line: %s', e)
                         logger.warning('Missing results from report period %d',ts)
+                del data
             else:
-#                type_list = 4*nnodes*['node'] + 8*nlinks*['link']
-                name_list = nodenames*4 + linknames*8
-                valuetype = nnodes*['demand']+nnodes*['head']+nnodes*['pressure']+nnodes*['quality'] + nlinks*['flow']+nlinks*['velocity']+nlinks*['headloss']+nlinks*['linkquality']+nlinks*['linkstatus']+nlinks*['linksetting']+nlinks*['reactionrate']+nlinks*['frictionfactor']
-                
-#                tuples = zip(type_list, valuetype, name_list)
-                tuples = list(zip(valuetype, name_list))
-#                tuples = [(valuetype[i], v) for i, v in enumerate(name_list)]
-                index = pd.MultiIndex.from_tuples(tuples, names=['value','name'])          
-                try:
-                    data = np.fromfile(fin, dtype = np.dtype(ftype), count = (4*nnodes+8*nlinks)*nrptsteps)
-                    data = np.reshape(data, (nrptsteps, (4*nnodes+8*nlinks)))
-                except Exception as e:
-                    logger.exception('Failed to process file: %s', e)
-                    
-                df = pd.DataFrame(data.transpose(), index =index, columns = reporttimes)
-                df = df.transpose()
-                self.results.node = {}
-                self.results.link = {}
-                
-                # Node Results
-                self.results.node['demand'] = HydParam.Demand._to_si(self.flow_units, df['demand'])
-                self.results.node['head'] = HydParam.HydraulicHead._to_si(self.flow_units, df['head'])
-                self.results.node['pressure'] = HydParam.Pressure._to_si(self.flow_units, df['pressure'])
-
-                # Water Quality Results (node and link)
+                (reporttimes, node_items, nodenames, node_values,
+                 link_items, linknames, link_values, link_index) = \
+                    self._read_ep_results(filename, ep_offset, nodes, links, start_time, end_time)
+                linktype = linktype[link_index]
+                self.results.time = reporttimes
+
+                # Unit conversions, in place (all conversions are linear)
+                node_params = {'demand': HydParam.Demand, 'head': HydParam.HydraulicHead,
+                               'pressure': HydParam.Pressure}
+                link_params = {'flowrate': HydParam.Flow, 'velocity': HydParam.Velocity}
+                # headloss unit is per 1000
                 if self.quality_type is QualType.Chem:
-                    self.results.node['quality'] = QualParam.Concentration._to_si(self.flow_units, df['quality'], mass_units=self.mass_units)
-                    self.results.link['linkquality'] = QualParam.Concentration._to_si(self.flow_units, df['linkquality'], mass_units=self.mass_units)
+                    quality_factor = QualParam.Concentration._to_si(self.flow_units, 1.0, mass_units=self.mass_units)
                 elif self.quality_type is QualType.Age:
-                    self.results.node['quality'] = QualParam.WaterAge._to_si(self.flow_units, df['quality'], mass_units=self.mass_units)
-                    self.results.link['linkquality'] = QualParam.WaterAge._to_si(self.flow_units, df['linkquality'], mass_units=self.mass_units)
+                    quality_factor = QualParam.WaterAge._to_si(self.flow_units, 1.0, mass_units=self.mass_units)
                 else:
-                    self.results.node['quality'] = df['quality']
-                    self.results.link['linkquality'] = df['linkquality']
-
-                # Link Results
-                self.results.link['flowrate'] = HydParam.Flow._to_si(self.flow_units, df['flow'])
-                self.results.link['headloss'] = df['headloss']  # Unit is per 1000
-                self.results.link['velocity'] = HydParam.Velocity._to_si(self.flow_units, df['velocity'])
-                
-#                self.results.link['status'] = df['linkstatus']
-                status = np.array(df['linkstatus'])
-                if self.convert_status:
-                    status[status <= 2] = 0
-                    status[status == 3] = 1
-                    status[status >= 5] = 1
-                    status[status == 4] = 2
-                self.results.link['status'] = pd.DataFrame(data=status, columns=linknames, index=reporttimes)
-                
-                settings = np.array(df['linksetting'])
-                settings[:, linktype == EN.PRV] = to_si(self.flow_units, settings[:, linktype == EN.PRV], HydParam.Pressure)
-                settings[:, linktype == EN.PSV] = to_si(self.flow_units, settings[:, linktype == EN.PSV], HydParam.Pressure)
-                settings[:, linktype == EN.PBV] = to_si(self.flow_units, settings[:, linktype == EN.PBV], HydParam.Pressure)
-                settings[:, linktype == EN.FCV] = to_si(self.flow_units, settings[:, linktype == EN.FCV], HydParam.Flow)
-                self.results.link['setting'] = pd.DataFrame(data=settings, columns=linknames, index=reporttimes)
-                self.results.link['frictionfact'] = df['frictionfactor']
-                self.results.link['rxnrate'] = df['reactionrate']
-                
-                # Convert to panels
-                self.results.link = pd.Panel.from_dict(self.results.link)
-                self.results.node = pd.Panel.from_dict(self.results.node)
-                
+                    quality_factor = None
+                for i, name in enumerate(node_items):
+                    values = node_values[:, i, :]
+                    if name in node_params:
+                        values *= node_params[name]._to_si(self.flow_units, 1.0)
+                    elif name == 'quality' and quality_factor is not None:
+                        values *= quality_factor
+                for i, name in enumerate(link_items):
+                    values = link_values[:, i, :]
+                    if name in link_params:
+                        values *= link_params[name]._to_si(self.flow_units, 1.0)
+                    elif name == 'linkquality' and quality_factor is not None:
+                        values *= quality_factor
+                    elif name == 'status' and self.convert_status:
+                        values[values <= 2] = 0
+                        values[values == 3] = 1
+                        values[values >= 5] = 1
+                        values[values == 4] = 2
+                    elif name == 'setting':
+                        for valve_type, param in [(EN.PRV, HydParam.Pressure), (EN.PSV, HydParam.Pressure),
+                                                  (EN.PBV, HydParam.Pressure), (EN.FCV, HydParam.Flow)]:
+                            mask = linktype == valve_type
+                            if mask.any():
+                                values[:, mask] *= to_si(self.flow_units, 1.0, param)
+
+                # Panels share memory with the (item, time, element) views of the arrays
+                self.results.node = pd.Panel(node_values.transpose(1, 0, 2), items=node_items,
+                                             major_axis=reporttimes, minor_axis=nodenames)
+                self.results.link = pd.Panel(link_values.transpose(1, 0, 2), items=link_items,
+                                             major_axis=reporttimes, minor_axis=linknames)
+
             logger.debug('... read epilog ...')
             # Read the averages and then the number of periods for checks
+            fin.seek(ep_offset + (4*nnodes + 8*nlinks)*nrptsteps*np.dtype(ftype).itemsize)
             averages = np.fromfile(fin, dtype=np.dtype(ftype), count=4)
             self.averages = averages
             np.fromfile(fin, dtype=np.int32, count=1)
             warnflag = np.fromfile(fin, dtype=np.int32, count=1)
             magic2 = np.fromfile(fin, dtype=np.int32, count=1)
-            if magic1 != magic2:
+            if self.magic != magic2:
                 logger.critical('The magic number did not match -- binary incomplete or incorrectly read. If you believe this file IS complete, please try a different float type. Current type is "%s"',ftype)
             #print numperiods, warnflag, magic
             if warnflag != 0:
                 logger.warning('Warnings were issued during simulation')
-        self.finalize_save(magic1==magic2, warnflag)
+        self.finalize_save(self.magic==magic2, warnflag)
         
         return self.results
 
 
+class HydFile(object):
+    """
+    EPANET binary hydraulics file reader class.
+
+    This class reads the hydraulics file saved by EPANET (see the `save_hyd`
+    option of :meth:`~wntr.sim.epanet.EpanetSimulator.run_sim`). The file
+    holds the demand and head at each node and the flow, status and setting
+    of each link at every hydraulic timestep (including intermediate
+    timesteps caused by controls and tank events), in EPANET internal units.
+
+    The hydraulics file does not contain element names. Nodes are stored in
+    the order junctions, reservoirs, tanks and links in the order pipes,
+    pumps, valves, which is the order used when the model is written to an
+    INP file by WNTR.
+
+    Parameters
+    ----------
+    wn : :class:`~wntr.network.model.WaterNetworkModel`, optional
+        Water network model used to create the hydraulics file, used to get
+        the node and link names and the valve types. If None, nodes and links
+        are named by their EPANET index (starting at 1) and valve settings
+        are not converted.
+    convert_status : bool, default=True
+        Convert the EPANET link status (8 values) to simpler WNTR status (3 values).
+
+    """
+    def __init__(self, wn=None, convert_status=True):
+        self.wn = wn
+        self.convert_status = convert_status
+        self.magic = None
+        self.version = None
+        self.num_nodes = None
+        self.num_links = None
+        self.num_tanks = None
+        self.num_pumps = None
+        self.num_valves = None
+        self.duration = None
+        self.time = None
+        self.hydraulic_steps = None
+        self.results = None
+
+    def read_arrays(self, filename):
+        """Read the hydraulics file into a structured array, in EPANET internal units.
+
+        Parameters
+        ----------
+        filename : str
+            An EPANET hydraulics file
+
+        Returns
+        -------
+        numpy.ndarray
+            Structured array (memory mapped, read only) with one record per
+            hydraulic timestep and the fields time, demand (cfs), head (ft),
+            flow (cfs), status, setting and hydstep (the time to the next step)
+
+        """
+        header = np.fromfile(filename, dtype=np.int32, count=8)
+        if len(header) < 8:
+            raise ValueError('{} is not an EPANET hydraulics file'.format(filename))
+        self.magic = header[0]
+        self.version = header[1]
+        self.num_nodes = nnodes = int(header[2])
+        self.num_links = nlinks = int(header[3])
+        self.num_tanks = int(header[4])
+        self.num_pumps = int(header[5])
+        self.num_valves = int(header[6])
+        self.duration = int(header[7])
+        if self.wn is not None and (nnodes != self.wn.num_nodes or nlinks != self.wn.num_links):
+            raise ValueError('The hydraulics file has {} nodes and {} links, the network model has {} nodes and {} links'.format(
+                             nnodes, nlinks, self.wn.num_nodes, self.wn.num_links))
+        dtype = np.dtype([('time', '<i4'), ('demand', '<f4', (nnodes,)), ('head', '<f4', (nnodes,)),
+                          ('flow', '<f4', (nlinks,)), ('status', '<f4', (nlinks,)),
+                          ('setting', '<f4', (nlinks,)), ('hydstep', '<i4')])
+        nsteps = (os.path.getsize(filename) - header.nbytes) // dtype.itemsize
+        if nsteps == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(filename, dtype=dtype, mode='r', offset=header.nbytes, shape=(nsteps,))
+
+    def read(self, filename):
+        """Read a hydraulics file and create a results object.
+
+        Parameters
+        ----------
+        filename : str
+            An EPANET hydraulics file
+
+        Returns
+        -------
+        :class:`~wntr.sim.results.NetResults`
+            Results, in SI units, at each hydraulic timestep: node demand and
+            head and link flowrate, status and setting
+
+        """
+        logger.debug('Read EPANET hydraulics from %s', filename)
+        data = self.read_arrays(filename)
+        self.time = np.array(data['time'], dtype=int)
+        self.hydraulic_steps = np.array(data['hydstep'], dtype=int)
+
+        if self.wn is not None:
+            node_names = self.wn.junction_name_list + self.wn.reservoir_name_list + self.wn.tank_name_list
+            link_names = self.wn.pipe_name_list + self.wn.pump_name_list + self.wn.valve_name_list
+        else:
+            node_names = [str(i) for i in range(1, self.num_nodes+1)]
+            link_names = [str(i) for i in range(1, self.num_links+1)]
+
+        ft = 0.3048
+        cfs = ft**3
+        node_values = np.empty((2, len(self.time), self.num_nodes), dtype=np.float32)
+        node_values[0] = data['demand']
+        node_values[0] *= cfs
+        node_values[1] = data['head']
+        node_values[1] *= ft
+        link_values = np.empty((3, len(self.time), self.num_links), dtype=np.float32)
+        link_values[0] = data['flow']
+        link_values[0] *= cfs
+        status = link_values[2]
+        status[:] = data['status']
+        if self.convert_status:
+            status[status <= 2] = 0
+            status[status == 3] = 1
+            status[status >= 5] = 1
+            status[status == 4] = 2
+        settings = link_values[1]
+        settings[:] = data['setting']
+        del data
+        if self.wn is not None:
+            # pressure valve settings are stored as head (ft), FCV settings as flow (cfs)
+            valve_types = np.array([self.wn.get_link(name).valve_type for name in self.wn.valve_name_list])
+            offset = self.wn.num_pipes + self.wn.num_pumps
+            for valve_type, factor in [('PRV', ft), ('PSV', ft), ('PBV', ft), ('FCV', cfs)]:
+                columns = offset + np.nonzero(valve_types == valve_type)[0]
+                settings[:, columns] *= factor
+
+        self.results = wntr.sim.NetResults()
+        self.results.time = self.time
+        self.results.node = pd.Panel(node_values, items=['demand', 'head'],
+                                     major_axis=self.time, minor_axis=node_names)
+        self.results.link = pd.Panel(link_values, items=['flowrate', 'setting', 'status'],
+                                     major_axis=self.time, minor_axis=link_names)
+        self.results.meta['node_names'] = np.array(node_names, dtype=str)
+        self.results.meta['link_names'] = np.array(link_names, dtype=str)
+        self.results.meta['report_times'] = self.time
+        return self.results
+
+
 class NoSectionError(Exception):
     pass
 
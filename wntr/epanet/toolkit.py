@@ -7,6 +7,7 @@ Programmers Toolkit DLLs.
 .. autosummary::
 
     runepanet
+    load_library
     ENepanet
     EpanetException
     ENgetwarning
@@ -18,6 +19,8 @@ from ctypes import byref
 import os.path
 from pkg_resources import resource_filename
 import platform
+import numpy as np
+from wntr.epanet.util import EN
 epanet_toolkit = 'wntr.epanet.toolkit'
 
 if os.name in ['nt','dos']:
@@ -32,10 +35,58 @@ logger = logging.getLogger(__name__)
 
 # import warnings
 
+_ENlib = None
+"""The EPANET library, loaded once per process by :func:`load_library`"""
+
+
 class EpanetException(Exception):
     pass
 
 
+def load_library():
+    """Load the EPANET toolkit library (once per process) and return it.
+
+    The library is searched for under the platform specific name(s) that
+    are distributed with WNTR. The first call loads the library and declares
+    the argument and return types of the functions used by the bulk value
+    getters; later calls return the same library object.
+
+    Returns
+    -------
+    ctypes library object
+
+    """
+    global _ENlib
+    if _ENlib is not None:
+        return _ENlib
+    libnames = ['epanet2_x86','epanet2','epanet']
+    if '64' in platform.machine():
+        libnames.insert(0, 'epanet2_amd64')
+    for lib in libnames:
+        try:
+            if os.name in ['nt','dos']:
+                libepanet = resource_filename(epanet_toolkit,'Windows/%s.dll' % lib)
+                ENlib = ctypes.windll.LoadLibrary(libepanet)
+            elif sys.platform in ['darwin']:
+                libepanet = resource_filename(epanet_toolkit,'Darwin/lib%s.dylib' % lib)
+                ENlib = ctypes.cdll.LoadLibrary(libepanet)
+            else:
+                libepanet = resource_filename(epanet_toolkit,'Linux/lib%s.so' % lib)
+                ENlib = ctypes.cdll.LoadLibrary(libepanet)
+            break # OK!
+        except Exception as E1:
+            if lib == libnames[-1]:
+                raise E1
+            pass
+    for func in [ENlib.ENgetnodevalue, ENlib.ENgetlinkvalue]:
+        func.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.POINTER(ctypes.c_float)]
+        func.restype = ctypes.c_int
+    ENlib.ENgetcount.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_int)]
+    ENlib.ENgetcount.restype = ctypes.c_int
+    _ENlib = ENlib
+    return _ENlib
+
+
 def ENgetwarning(code, sec=-1):
     if sec >= 0:
         hours = int(sec/3600.)
@@ -120,25 +171,17 @@ class ENepanet():
         self.rptfile = rptfile
         self.binfile = binfile
 
-        libnames = ['epanet2_x86','epanet2','epanet']
-        if '64' in platform.machine():
-            libnames.insert(0, 'epanet2_amd64')
-        for lib in libnames:
-            try:
-                if os.name in ['nt','dos']:
-                    libepanet = resource_filename(epanet_toolkit,'Windows/%s.dll' % lib)
-                    self.ENlib = ctypes.windll.LoadLibrary(libepanet)
-                elif sys.platform in ['darwin']:
-                    libepanet = resource_filename(epanet_toolkit,'Darwin/lib%s.dylib' % lib)
-                    self.ENlib = ctypes.cdll.LoadLibrary(libepanet)
-                else:
-                    libepanet = resource_filename(epanet_toolkit,'Linux/lib%s.so' % lib)
-                    self.ENlib = ctypes.cdll.LoadLibrary(libepanet)
-                return # OK!
-            except Exception as E1:
-                if lib == libnames[-1]:
-                    raise E1
-                pass
+        self.ENlib = load_library()
+        # Separate function pointers for the bulk getters. Their arguments are
+        # prebuilt (int index, byref(c_float)) pairs that already match the
+        # declared argtypes, so argument conversion is skipped; it would
+        # otherwise double the cost of each call.
+        self._ENgetnodevalue = self.ENlib['ENgetnodevalue']
+        self._ENgetnodevalue.restype = ctypes.c_int
+        self._ENgetlinkvalue = self.ENlib['ENgetlinkvalue']
+        self._ENgetlinkvalue.restype = ctypes.c_int
+        self._node_buffer = None
+        self._link_buffer = None
         return
 
     def isOpen(self):
@@ -187,6 +230,8 @@ class ENepanet():
         self._error()
         if self.errcode < 100:
             self.fileLoaded = True
+        self._node_buffer = None
+        self._link_buffer = None
         return
 
     def ENclose(self):
@@ -405,6 +450,39 @@ class ENepanet():
         self._error()
         return iCode.value
 
+    def ENgettimeparam(self, iCode):
+        """Retrieves the value of a specific analysis time parameter
+
+        Parameters
+        -------------
+        iCode : int
+            Time parameter code (see :class:`~wntr.epanet.util.EN` time parameters)
+
+        Returns
+        ---------
+        Value of the time parameter (seconds)
+
+        """
+        lValue = ctypes.c_long()
+        self.errcode = self.ENlib.ENgettimeparam(iCode, byref(lValue))
+        self._error()
+        return lValue.value
+
+    def ENgetqualtype(self):
+        """Retrieves the type of water quality analysis called for
+
+        Returns
+        ---------
+        Tuple of the quality analysis code (see :class:`~wntr.epanet.util.EN`
+        quality types) and the index of the node traced in a source trace analysis
+
+        """
+        iQualcode = ctypes.c_int()
+        iTracenode = ctypes.c_int()
+        self.errcode = self.ENlib.ENgetqualtype(byref(iQualcode), byref(iTracenode))
+        self._error()
+        return iQualcode.value, iTracenode.value
+
     def ENgetnodeindex(self, sId):
         """Retrieves index of a node with specific ID
 
@@ -423,6 +501,42 @@ class ENepanet():
         self._error()
         return iIndex.value
 
+    def ENgetnodeid(self, iIndex):
+        """Retrieves the ID label of a node with a specified index
+
+        Parameters
+        -------------
+        iIndex : int
+            Node index
+
+        Returns
+        ---------
+        ID label of node
+
+        """
+        sId = ctypes.create_string_buffer(32)
+        self.errcode = self.ENlib.ENgetnodeid(iIndex, byref(sId))
+        self._error()
+        return sId.value.decode('ascii')
+
+    def ENgetnodetype(self, iIndex):
+        """Retrieves the node-type code for a node
+
+        Parameters
+        -------------
+        iIndex : int
+            Node index
+
+        Returns
+        ---------
+        Node type code (see :class:`~wntr.epanet.util.EN` node types)
+
+        """
+        iCode = ctypes.c_int()
+        self.errcode = self.ENlib.ENgetnodetype(iIndex, byref(iCode))
+        self._error()
+        return iCode.value
+
     def ENgetnodevalue(self, iIndex, iCode):
         """Retrieves parameter value for a node
 
@@ -461,6 +575,61 @@ class ENepanet():
         self._error()
         return iIndex.value
 
+    def ENgetlinkid(self, iIndex):
+        """Retrieves the ID label of a link with a specified index
+
+        Parameters
+        -------------
+        iIndex : int
+            Link index
+
+        Returns
+        ---------
+        ID label of link
+
+        """
+        sId = ctypes.create_string_buffer(32)
+        self.errcode = self.ENlib.ENgetlinkid(iIndex, byref(sId))
+        self._error()
+        return sId.value.decode('ascii')
+
+    def ENgetlinktype(self, iIndex):
+        """Retrieves the link-type code for a link
+
+        Parameters
+        -------------
+        iIndex : int
+            Link index
+
+        Returns
+        ---------
+        Link type code (see :class:`~wntr.epanet.util.EN` link types)
+
+        """
+        iCode = ctypes.c_int()
+        self.errcode = self.ENlib.ENgetlinktype(iIndex, byref(iCode))
+        self._error()
+        return iCode.value
+
+    def ENgetlinknodes(self, iIndex):
+        """Retrieves the indexes of the end nodes of a link
+
+        Parameters
+        -------------
+        iIndex : int
+            Link index
+
+        Returns
+        ---------
+        Tuple of the start node index and the end node index
+
+        """
+        iFrom = ctypes.c_int()
+        iTo = ctypes.c_int()
+        self.errcode = self.ENlib.ENgetlinknodes(iIndex, byref(iFrom), byref(iTo))
+        self._error()
+        return iFrom.value, iTo.value
+
     def ENgetlinkvalue(self, iIndex, iCode):
         """Retrieves parameter value for a link
 
@@ -482,6 +651,72 @@ class ENepanet():
         return fValue.value
 
 
+    def _value_buffer(self, count):
+        """Create a float32 array and a byref pointer to each of its elements"""
+        values = np.zeros(count, dtype=np.float32)
+        refs = [byref(ctypes.c_float.from_buffer(values, 4*i)) for i in range(count)]
+        return values, list(zip(range(1, count+1), refs))
+
+    def get_node_values(self, iCode, out=None):
+        """Retrieves a parameter value for all nodes
+
+        The pointers passed to the library are created once, when first
+        needed after the file is opened, and reused on every call.
+
+        Parameters
+        -------------
+        iCode : int
+            Node parameter code (see toolkit.optNodeParams)
+        out : numpy.ndarray, optional
+            Array (of length equal to the number of nodes) to store the values in
+
+        Returns
+        ---------
+        numpy.ndarray of the nodes' parameter values, in node index order
+
+        """
+        if self._node_buffer is None:
+            self._node_buffer = self._value_buffer(self.ENgetcount(EN.NODECOUNT))
+        values, refs = self._node_buffer
+        func = self._ENgetnodevalue
+        for i, ref in refs:
+            self.errcode = func(i, iCode, ref)
+            self._error()
+        if out is None:
+            return values.astype(np.float64)
+        out[:] = values
+        return out
+
+    def get_link_values(self, iCode, out=None):
+        """Retrieves a parameter value for all links
+
+        The pointers passed to the library are created once, when first
+        needed after the file is opened, and reused on every call.
+
+        Parameters
+        -------------
+        iCode : int
+            Link parameter code (see toolkit.optLinkParams)
+        out : numpy.ndarray, optional
+            Array (of length equal to the number of links) to store the values in
+
+        Returns
+        ---------
+        numpy.ndarray of the links' parameter values, in link index order
+
+        """
+        if self._link_buffer is None:
+            self._link_buffer = self._value_buffer(self.ENgetcount(EN.LINKCOUNT))
+        values, refs = self._link_buffer
+        func = self._ENgetlinkvalue
+        for i, ref in refs:
+            self.errcode = func(i, iCode, ref)
+            self._error()
+        if out is None:
+            return values.astype(np.float64)
+        out[:] = values
+        return out
+
     def ENsaveinpfile(self, inpfile):
         """Saves EPANET input file
 
@@ -116,7 +116,7 @@ def plot_network(wn, node_attribute=None, link_attribute=None, title=None,
         ax = plt.gca()
         
     # Graph
-    G = wn.get_graph()
+    G = wn.get_graph(copy=False)
     if not directed:
         G = G.to_undirected()
 
@@ -289,7 +289,7 @@ def plot_interactive_network(wn, node_attribute=None, title=None,
         raise ImportError('plotly is required')
         
     # Graph
-    G = wn.get_graph()
+    G = wn.get_graph(copy=False)
     
     # Node attribute
     if isinstance(node_attribute, str):
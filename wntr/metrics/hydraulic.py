@@ -20,6 +20,8 @@ from wntr.network.graph import _all_simple_paths
 import numpy as np
 import pandas as pd
 import networkx as nx
+import scipy.sparse as sparse
+import scipy.sparse.linalg
 import math
 from collections import Counter
 import sys
@@ -107,17 +109,20 @@ def _lcm(x,y):
 def _lcml(*list):
   return reduce(_lcm, *list)
 
-def fdv(node_results, average_times=False, average_nodes=False):
+def fdv(node_results, average_times=False, average_nodes=False, dtype=None):
     """
     Compute fraction delivered volume (FDV), equations modified from [1].
     The metric can be averaged over times and/or nodes.
 
     Parameters
     ----------
-    node_results : pd.Panel
+    node_results : pd.Panel or dict
         A pandas Panel containing node results.
         Items axis = attributes, Major axis = times, Minor axis = node names
         FDV uses 'expected demand' and 'demand' attrbutes.
+        Results of many scenarios can be given as a dictionary of NumPy
+        arrays with keys 'expected_demand' and 'demand', each of shape
+        (scenarios, times, nodes).
 
     average_times : bool (default = False)
         Flag to determine if calculations are to be averaged over each time
@@ -129,16 +134,34 @@ def fdv(node_results, average_times=False, average_nodes=False):
         If false, FDV calculations will be performed for each node. If true, FDV
         calculations will be averaged over all nodes.
 
+    dtype : NumPy dtype (optional)
+        Data type used to accumulate arrays of many scenarios, e.g.
+        np.float32 to halve the memory used. Default is the data type of
+        the arrays.
+
     Returns
     -------
     fdv : pd.DataFrame, pd.Series, or scalar (depending on node and time averaging)
-        Fraction of delivered volume
+        Fraction of delivered volume. For a dictionary of arrays, a NumPy
+        array of shape (scenarios, times, nodes), (scenarios, nodes),
+        (scenarios, times) or (scenarios,) (depending on node and time
+        averaging)
 
     References
     ----------
     [1] Ostfeld A, Kogan D, Shamir U. (2002). Reliability simulation of water
     distribution systems - single and multiquality, Urban Water, 4, 53-61
     """
+    if isinstance(node_results, dict):
+        exp_demand = _average_array(node_results['expected_demand'], average_times, average_nodes, dtype)
+        act_received = _average_array(node_results['demand'], average_times, average_nodes, dtype)
+
+        # Calculate FDV, replace NaNs (generated by nodes with 0 demand)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fdv = act_received / exp_demand
+        fdv = np.where(np.isnan(fdv), 1, fdv)
+
+        return fdv
 
     exp_demand = _average_attribute(node_results['expected_demand'], average_times, average_nodes)
     act_received = _average_attribute(node_results['demand'], average_times, average_nodes)
@@ -155,17 +178,19 @@ def fdv(node_results, average_times=False, average_nodes=False):
 
     return fdv
 
-def fdd(node_results, Dstar, average_times=False, average_nodes=False):
+def fdd(node_results, Dstar, average_times=False, average_nodes=False, dtype=None):
     """
     Compute fraction delivered demand (FDD), equations modified from [1].
     The metric can be averaged over times and/or nodes.
 
     Parameters
     ----------
-    node_results : pd.Panel
+    node_results : pd.Panel or dict
         A pandas Panel containing node results.
         Items axis = attributes, Major axis = times, Minor axis = node names
         FDD uses 'expected demand' and 'demand' attrbutes.
+        Results of many scenarios can be given as a dictionary of NumPy
+        arrays, see :func:`fdv`.
 
     Dstar : float
         Threshold demand factor
@@ -180,10 +205,14 @@ def fdd(node_results, Dstar, average_times=False, average_nodes=False):
         If false, FDV calculations will be performed for each node. If true, FDV
         calculations will be averaged over all nodes.
 
+    dtype : NumPy dtype (optional)
+        Data type used to accumulate arrays of many scenarios, see :func:`fdv`
+
     Returns
     -------
     fdd : pd.DataFrame, pd.Series, or scalar (depending on node and time averaging)
-        Fraction of delivered demand
+        Fraction of delivered demand. For a dictionary of arrays, a NumPy
+        array with a leading scenario axis.
 
     References
     ----------
@@ -191,7 +220,7 @@ def fdd(node_results, Dstar, average_times=False, average_nodes=False):
     distribution systems - single and multiquality, Urban Water, 4, 53-61
     """
 
-    fdv_metric = fdv(node_results, average_times, average_nodes)
+    fdv_metric = fdv(node_results, average_times, average_nodes, dtype)
 
     # Calculate FDD
     fdd = (fdv_metric >= Dstar)+0
@@ -217,6 +246,21 @@ def _average_attribute(attribute, average_times, average_nodes):
 
     return attribute
 
+def _average_array(attribute, average_times, average_nodes, dtype=None):
+    # _average_attribute for arrays of shape (scenarios, times, nodes), the
+    # sums are accumulated in dtype
+    attribute = np.asarray(attribute)
+
+    if average_times and average_nodes:
+        return attribute.sum(axis=(-2, -1), dtype=dtype)
+    if average_times:
+        return attribute.sum(axis=-2, dtype=dtype)
+    if average_nodes:
+        return attribute.sum(axis=-1, dtype=dtype)
+    if dtype is not None:
+        attribute = attribute.astype(dtype, copy=False)
+    return attribute
+
 def todini(node_results, link_results, wn, Pstar):
     """
     Compute Todini index, equations from [1].
@@ -228,15 +272,21 @@ def todini(node_results, link_results, wn, Pstar):
 
     Parameters
     ----------
-    node_results : pd.Panel
+    node_results : pd.Panel or dict
         A pandas Panel containing node results.
         Items axis = attributes, Major axis = times, Minor axis = node names
         todini index uses 'head', 'pressure', and 'demand' attrbutes.
+        Results of many scenarios can be given as a dictionary of NumPy
+        arrays (in SI units) with keys 'head', 'pressure' and 'demand', each
+        of shape (scenarios, times, nodes), and 'node_names', the node name
+        of each column.
 
-    link_results : pd.Panel
+    link_results : pd.Panel or dict
         A pandas Panel containing link results.
         Items axis = attributes, Major axis = times, Minor axis = link names
         todini index uses the 'flowrate' attrbute.
+        For many scenarios, a dictionary with key 'flowrate', an array of
+        shape (scenarios, times, links), and 'link_names'.
 
     wn : Water Network Model
         A water network model.  The water network model is needed to find the start and end node to each pump.
@@ -247,43 +297,60 @@ def todini(node_results, link_results, wn, Pstar):
     Returns
     -------
     todini_index : pd.Series
-        Time-series of Todini indexes
+        Time-series of Todini indexes, or a NumPy array of shape
+        (scenarios, times) if the results are dictionaries of arrays
 
     References
     -----------
     [1] Todini E. (2000). Looped water distribution networks design using a
     resilience index based heuristic approach. Urban Water, 2(2), 115-122.
     """
-
-    POut = {}
-    PExp = {}
-    PInRes = {}
-    PInPump = {}
-
-    for name, node in wn.nodes(wntr.network.Junction):
-        h = np.array(node_results['head'].loc[:,name]) # m
-        p = np.array(node_results['pressure'].loc[:,name])
-        e = h - p # m
-        q = np.array(node_results['demand'].loc[:,name]) # m3/s
-        POut[name] = q*h
-        PExp[name] = q*(Pstar+e)
-
-    for name, node in wn.nodes(wntr.network.Reservoir):
-        H = np.array(node_results['head'].loc[:,name]) # m
-        Q = np.array(node_results['demand'].loc[:,name]) # m3/s
-        PInRes[name] = -Q*H # switch sign on Q.
-
-    for name, link in wn.links(wntr.network.Pump):
-        start_node = link.start_node_name
-        end_node = link.end_node_name
-        h_start = np.array(node_results['head'].loc[:,start_node]) # (m)
-        h_end = np.array(node_results['head'].loc[:,end_node]) # (m)
-        h = h_start - h_end # (m)
-        q = np.array(link_results['flowrate'].loc[:,name]) # (m^3/s)
-        PInPump[name] = q*(abs(h)) # assumes that pumps always add energy to the system
-
-    todini_index = (sum(POut.values()) - sum(PExp.values()))/  \
-        (sum(PInRes.values()) + sum(PInPump.values()) - sum(PExp.values()))
+    if isinstance(node_results, dict):
+        node_names = node_results['node_names']
+        head = np.asarray(node_results['head'])
+        pressure = np.asarray(node_results['pressure'])
+        demand = np.asarray(node_results['demand'])
+    else:
+        node_names = node_results['head'].columns
+        head = node_results['head'].values
+        pressure = node_results['pressure'].loc[:,node_names].values
+        demand = node_results['demand'].loc[:,node_names].values
+    if isinstance(link_results, dict):
+        link_names = link_results['link_names']
+        flowrate = np.asarray(link_results['flowrate'])
+    else:
+        link_names = link_results['flowrate'].columns
+        flowrate = link_results['flowrate'].values
+
+    # Columns of the junctions, reservoirs and pumps (and their start and
+    # end nodes) in the result arrays
+    node_index = pd.Index(node_names)
+    junctions = node_index.get_indexer(wn.junction_name_list)
+    reservoirs = node_index.get_indexer(wn.reservoir_name_list)
+    pump_links = [link for name, link in wn.links(wntr.network.Pump)]
+    pumps = pd.Index(link_names).get_indexer([link.name for link in pump_links])
+    pump_start = node_index.get_indexer([link.start_node_name for link in pump_links])
+    pump_end = node_index.get_indexer([link.end_node_name for link in pump_links])
+    if (junctions < 0).any() or (reservoirs < 0).any() or (pumps < 0).any() or \
+            (pump_start < 0).any() or (pump_end < 0).any():
+        raise ValueError('The results do not include every junction, reservoir and pump of the water network model')
+
+    h = head[..., junctions] # m
+    e = h - pressure[..., junctions] # m
+    q = demand[..., junctions] # m3/s
+    POut = (q*h).sum(axis=-1)
+    PExp = (q*(Pstar+e)).sum(axis=-1)
+
+    PInRes = (-demand[..., reservoirs]*head[..., reservoirs]).sum(axis=-1) # switch sign on Q.
+
+    h = head[..., pump_start] - head[..., pump_end] # (m)
+    q = flowrate[..., pumps] # (m^3/s)
+    PInPump = (q*np.abs(h)).sum(axis=-1) # assumes that pumps always add energy to the system
+
+    todini_index = (POut - PExp)/(PInRes + PInPump - PExp)
+
+    if isinstance(node_results, dict):
+        return todini_index
 
     todini_index = pd.Series(data = todini_index.tolist(), index = node_results['head'].index)
 
@@ -319,6 +386,16 @@ def entropy(G, sources=None, sinks=None):
     S_ave : float
         System entropy
 
+    Notes
+    -----
+    The number of flow paths through each link into a node, and the degree of
+    the links on those paths, are needed for every node. When the flow
+    directions form a directed acyclic graph (no directed loops, which is the
+    case for a converged flow solution without zero flow loops), the path
+    counts are computed with sparse triangular solves over the graph, in
+    polynomial time. Otherwise all simple paths are enumerated, which is
+    exponential in the number of loops.
+
     References
     -----------
     [1] Awumah K, Goulter I, Bhatt SK. (1990). Assessment of reliability in
@@ -335,6 +412,11 @@ def entropy(G, sources=None, sinks=None):
     if sinks is None:
         sinks = G.nodes()
 
+    if nx.is_directed_acyclic_graph(G):
+        link_paths = _DagPathCounts(G, sources).link_paths
+    else:
+        link_paths = lambda nodej: _link_paths_enumerated(G, sources, nodej)
+
     S = {}
     Q = {}
     for nodej in sinks:
@@ -342,53 +424,24 @@ def entropy(G, sources=None, sinks=None):
             S[nodej] = 0 # nodej is the source
             continue
 
-        sp = [] # simple path
+        paths = [] # (nodei, NDij, aij) for each link into nodej on a path
         if G.node[nodej]['type']  == 'Junction':
-            for source in sources:
-                if nx.has_path(G, source, nodej):
-                    simple_paths = _all_simple_paths(G,source,target=nodej)
-                    sp = sp + ([p for p in simple_paths])
-                    # all_simple_paths was modified to check 'has_path' in the
-                    # loop, but this is still slow for large networks
-                    # what if the network was skeletonized based on series pipes
-                    # that have the same flow direction?
-                    # what about duplicating paths that have pipes in series?
-                #print j, nodeid, len(sp)
-
-        if len(sp) == 0:
+            paths = link_paths(nodej)
+
+        if len(paths) == 0:
             S[nodej] = np.nan # nodej is not connected to any sources
             continue
 
-        sp = np.array(sp)
-
-        # Uj = set of nodes on the upstream ends of links incident on node j
-        Uj = G.predecessors(nodej)
         # qij = flow in link from node i to node j
         qij = []
         # aij = number of equivalnet independent paths through the link from node i to node j
         aij = []
-        for nodei in Uj:
-            mask = np.array([nodei in path for path in sp])
-            # NDij = number of paths through the link from node i to node j
-            NDij = sum(mask)
-            if NDij == 0:
-                continue
-            temp = sp[mask]
-            # MDij = links in the NDij path
-            MDij = [(t[idx],t[idx+1]) for t in temp for idx in range(len(t)-1)]
-
+        for nodei, NDij, a in paths:
             flow = 0
             for link in G[nodei][nodej].keys():
                 flow = flow + G[nodei][nodej][link]['weight']
             qij.append(flow)
-
-            # dk = degree of link k in MDij
-            dk = Counter()
-            for elem in MDij:
-                # divide by the numnber of links between two nodes
-                dk[elem] += 1/len(G[elem[0]][elem[1]].keys())
-            V = np.array(list(dk.values()))
-            aij.append(NDij*(1-float(sum(V - 1))/sum(V)))
+            aij.append(a)
 
         Q[nodej] = sum(qij) # Total flow into node j
 
@@ -413,3 +466,134 @@ def entropy(G, sources=None, sinks=None):
                         Q[nodej]/Q0*math.log(Q[nodej]/Q0)
 
     return [S, S_ave]
+
+
+def _link_paths_enumerated(G, sources, nodej):
+    """
+    Path counts for the links into nodej, from all simple paths between the
+    sources and nodej, see :func:`entropy`.
+
+    Returns
+    -------
+    list of (nodei, NDij, aij) for each upstream node i with NDij > 0
+    """
+    sp = [] # simple path
+    for source in sources:
+        if nx.has_path(G, source, nodej):
+            simple_paths = _all_simple_paths(G,source,target=nodej)
+            sp = sp + ([p for p in simple_paths])
+            # all_simple_paths was modified to check 'has_path' in the
+            # loop, but this is still slow for large networks
+            # what if the network was skeletonized based on series pipes
+            # that have the same flow direction?
+            # what about duplicating paths that have pipes in series?
+        #print j, nodeid, len(sp)
+
+    if len(sp) == 0:
+        return []
+
+    sp = np.array(sp)
+
+    paths = []
+    # Uj = set of nodes on the upstream ends of links incident on node j
+    Uj = G.predecessors(nodej)
+    for nodei in Uj:
+        mask = np.array([nodei in path for path in sp])
+        # NDij = number of paths through the link from node i to node j
+        NDij = sum(mask)
+        if NDij == 0:
+            continue
+        temp = sp[mask]
+        # MDij = links in the NDij path
+        MDij = [(t[idx],t[idx+1]) for t in temp for idx in range(len(t)-1)]
+
+        # dk = degree of link k in MDij
+        dk = Counter()
+        for elem in MDij:
+            # divide by the numnber of links between two nodes
+            dk[elem] += 1/len(G[elem[0]][elem[1]].keys())
+        V = np.array(list(dk.values()))
+        paths.append((nodei, NDij, NDij*(1-float(sum(V - 1))/sum(V))))
+
+    return paths
+
+
+class _DagPathCounts(object):
+    """
+    Path counts for :func:`entropy` on a directed acyclic graph.
+
+    With A the adjacency matrix (the number of parallel links from u to v)
+    and N = (I - A)^-1, N[u,v] is the number of paths from u to v. For a
+    link from node i into node j, the paths from the sources to j through i
+    number NDij = S(i) N[i,j], where S = sum of the rows of N for the
+    sources. The degree of node pair (u,v) over these paths (divided by the
+    number of parallel links, as in the path enumeration) is
+    S(u) N[v,i] N[i,j] if the pair is upstream of i and S(i) N[i,u] N[v,j]
+    if it is downstream. The sums of these degrees and the number of pairs
+    with a nonzero degree give aij = NDij * number of pairs / sum of degrees.
+
+    Nodes are numbered in topological order, so that I - A is upper
+    triangular and is factorized without fill in.
+    """
+    def __init__(self, G, sources):
+        nodes = list(nx.topological_sort(G))
+        self._index = dict((node, i) for i, node in enumerate(nodes))
+        n = len(nodes)
+        index = self._index
+        links = [(index[u], index[v]) for u, v in G.edges()]
+        pairs = np.array(sorted(set(links)), dtype=int).reshape(-1, 2)
+        self._pair_u = pairs[:, 0]
+        self._pair_v = pairs[:, 1]
+        links = np.array(links, dtype=int).reshape(-1, 2)
+        A = sparse.csc_matrix((np.ones(len(links)), (links[:, 0], links[:, 1])), shape=(n, n))
+        self._B = sparse.csc_matrix((np.ones(len(pairs)), (self._pair_u, self._pair_v)), shape=(n, n))
+        self._lu = scipy.sparse.linalg.splu(sparse.identity(n, format='csc') - A, permc_spec='NATURAL',
+                             diag_pivot_thresh=0)
+        self._n = n
+        self._G = G
+
+        source_vector = np.zeros(n)
+        for source in sources:
+            source_vector[index[source]] = 1
+        # S(x), number of paths from the sources to x
+        self._S = self._lu.solve(source_vector, trans='T')
+        # W(i) = sum over pairs of S(u) N[v,i], the summed degrees upstream of i
+        self._W = self._lu.solve(self._B.T.dot(self._S), trans='T')
+        # number of pairs upstream of i, computed when needed
+        self._num_upstream_pairs = {}
+
+    def _unit(self, i):
+        e = np.zeros(self._n)
+        e[i] = 1
+        return e
+
+    def _upstream_pairs(self, i):
+        count = self._num_upstream_pairs.get(i)
+        if count is None:
+            to_i = self._lu.solve(self._unit(i)) # N[:,i]
+            count = np.count_nonzero((self._S[self._pair_u] > 0) & (to_i[self._pair_v] > 0))
+            self._num_upstream_pairs[i] = count
+        return count
+
+    def link_paths(self, nodej):
+        """
+        Returns
+        -------
+        list of (nodei, NDij, aij) for each upstream node i with NDij > 0
+        """
+        j = self._index[nodej]
+        to_j = self._lu.solve(self._unit(j)) # N[:,j]
+        # L(i) = sum over pairs of N[i,u] N[v,j], the summed degrees downstream of i
+        L = self._lu.solve(self._B.dot(to_j))
+        paths = []
+        for nodei in self._G.predecessors(nodej):
+            i = self._index[nodei]
+            NDij = self._S[i]*to_j[i]
+            if NDij == 0:
+                continue
+            from_i = self._lu.solve(self._unit(i), trans='T') # N[i,:]
+            num_pairs = self._upstream_pairs(i) + \
+                np.count_nonzero((from_i[self._pair_u] > 0) & (to_j[self._pair_v] > 0))
+            sum_degrees = to_j[i]*self._W[i] + self._S[i]*L[i]
+            paths.append((nodei, NDij, NDij*num_pairs/sum_degrees))
+        return paths
@@ -9,22 +9,24 @@ The wntr.metrics.water_quality module contains water quality metrics.
 
 
 """
-from wntr.metrics.hydraulic import _average_attribute
+from wntr.metrics.hydraulic import _average_attribute, _average_array
 import logging
 
 logger = logging.getLogger(__name__)
 
-def fdq(node_results, Qstar, average_times=False, average_nodes=False):
+def fdq(node_results, Qstar, average_times=False, average_nodes=False, dtype=None):
     """
     Compute fraction delivered quality (FDQ), equations modified from [1]. 
     The metric can be averaged over times and/or nodes.
     
     Parameters
     ----------
-    node_results : pd.Panel
+    node_results : pd.Panel or dict
         A pandas Panel containing node results. 
         Items axis = attributes, Major axis = times, Minor axis = node names
         FDQ uses 'quality' attrbute.
+        Results of many scenarios can be given as a dictionary with key
+        'quality', a NumPy array of shape (scenarios, times, nodes).
         
     Qstar : float
         Water quality threshold.
@@ -39,10 +41,15 @@ def fdq(node_results, Qstar, average_times=False, average_nodes=False):
         If false, FDV calculations will be performed for each node. If true, FDV
         calculations will be averaged over all nodes.
 
+    dtype : NumPy dtype (optional)
+        Data type used to accumulate arrays of many scenarios, e.g.
+        np.float32 to halve the memory used.
+
     Returns 
     -------    
     fdq : pd.DataFrame, pd.Series, or scalar (depending on node and time averaging)
-        Fraction of delivered quality
+        Fraction of delivered quality. For a dictionary of arrays, a NumPy
+        array with a leading scenario axis.
         
     References
     ----------
@@ -50,7 +57,10 @@ def fdq(node_results, Qstar, average_times=False, average_nodes=False):
     distribution systems - single and multiquality, Urban Water, 4, 53-61
     """
 
-    quality = _average_attribute(node_results['quality'], average_times, average_nodes)
+    if isinstance(node_results, dict):
+        quality = _average_array(node_results['quality'], average_times, average_nodes, dtype)
+    else:
+        quality = _average_attribute(node_results['quality'], average_times, average_nodes)
     
     fdq = (quality >= Qstar)+0 
             
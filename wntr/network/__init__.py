@@ -8,4 +8,5 @@ from .model import WaterNetworkModel
 from .options import WaterNetworkOptions
 from .controls import Comparison, ControlPriority, TimeOfDayCondition, SimTimeCondition, ValueCondition, \
     TankLevelCondition, RelativeCondition, OrCondition, AndCondition, ControlAction, Control, ControlManager, Rule
-from .graph import WntrMultiDiGraph
+from .graph import WntrMultiDiGraph, CSRGraph
+from . import npz
@@ -12,15 +12,18 @@ the network model.
     Node
     Link
     Registry
+    ColumnStore
     NodeType
     LinkType
     LinkStatus
 
 """
 import logging
+import numpy as np
 import six
 from six import string_types
 import types
+import weakref
 from wntr.utils.ordered_set import OrderedSet
 
 import enum
@@ -107,6 +110,9 @@ class Node(six.with_metaclass(abc.ABCMeta, object)):
         self._curve_reg = wn._curve_reg
         self._coordinates = [0,0]
         self._source = None
+        # Row of the node in the node column store
+        self._node_columns = wn._node_columns
+        self._row = self._node_columns.add_row(self, type=NodeType[self.node_type])
 
     def _compare(self, other):
         if not type(self) == type(other):
@@ -188,6 +194,7 @@ class Node(six.with_metaclass(abc.ABCMeta, object)):
     @tag.setter
     def tag(self, tag):
         self._tag = tag
+        self._node_columns.data_version += 1
 
     @property
     def initial_quality(self):
@@ -209,6 +216,8 @@ class Node(six.with_metaclass(abc.ABCMeta, object)):
     def coordinates(self, coordinates):
         if isinstance(coordinates, (list, tuple)) and len(coordinates) == 2:
             self._coordinates = tuple(coordinates)
+            self._node_columns.version += 1
+            self._node_columns.data_version += 1
         else:
             raise ValueError('coordinates must be a 2-tuple or len-2 list')
 
@@ -254,13 +263,21 @@ class Link(six.with_metaclass(abc.ABCMeta, object)):
         # Set the link name
         self._link_name = link_name
         # Set and register the starting node
+        link_type = self.link_type
         self._start_node = self._node_reg[start_node_name]
-        self._node_reg.add_usage(start_node_name, (link_name, self.link_type))
+        self._node_reg.add_usage(start_node_name, (link_name, link_type))
+        self._node_reg.add_link_end(start_node_name, link_name, True)
         # Set and register the ending node
         self._end_node = self._node_reg[end_node_name]
-        self._node_reg.add_usage(end_node_name, (link_name, self.link_type))
+        self._node_reg.add_usage(end_node_name, (link_name, link_type))
+        self._node_reg.add_link_end(end_node_name, link_name, False)
+        # Row of the link in the link column store
+        self._link_columns = wn._link_columns
+        self._row = self._link_columns.add_row(self, type=LinkType[link_type],
+                                               start_node=self._start_node._row,
+                                               end_node=self._end_node._row)
         # Set up other metadata fields
-        self._initial_status = LinkStatus.opened
+        self.initial_status = LinkStatus.opened
         self._initial_setting = None
         self._vertices = []
         self._tag = None
@@ -311,12 +328,13 @@ class Link(six.with_metaclass(abc.ABCMeta, object)):
     @property
     def initial_status(self):
         """:class:`~wntr.network.base.LinkStatus`: The initial status (`Opened`, `Closed`, `Active`) of the Link"""
-        return self._initial_status
+        return _link_statuses[self._link_columns.initial_status.item(self._row)]
     @initial_status.setter
     def initial_status(self, status):
         if not isinstance(status, LinkStatus):
             status = LinkStatus[status]
-        self._initial_status = status
+        self._link_columns.initial_status[self._row] = status
+        self._link_columns.data_version += 1
         
     @property
     def initial_setting(self):
@@ -335,7 +353,11 @@ class Link(six.with_metaclass(abc.ABCMeta, object)):
     def start_node(self, name):
         self._node_reg.remove_usage(self.start_node_name, (self._link_name, self.link_type))
         self._node_reg.add_usage(name, (self._link_name, self.link_type))
+        self._node_reg.remove_link_end(self.start_node_name, self._link_name, True)
+        self._node_reg.add_link_end(name, self._link_name, True)
         self._start_node = self._node_reg[name]
+        self._link_columns.start_node[self._row] = self._start_node._row
+        self._link_columns.data_version += 1
 
     @property
     def end_node(self):
@@ -345,7 +367,11 @@ class Link(six.with_metaclass(abc.ABCMeta, object)):
     def end_node(self, name):
         self._node_reg.remove_usage(self.end_node_name, (self._link_name, self.link_type))
         self._node_reg.add_usage(name, (self._link_name, self.link_type))
+        self._node_reg.remove_link_end(self.end_node_name, self._link_name, False)
+        self._node_reg.add_link_end(name, self._link_name, False)
         self._end_node = self._node_reg[name]
+        self._link_columns.end_node[self._row] = self._end_node._row
+        self._link_columns.data_version += 1
 
     @property
     def start_node_name(self):
@@ -392,6 +418,7 @@ class Link(six.with_metaclass(abc.ABCMeta, object)):
     @tag.setter
     def tag(self, tag):
         self._tag = tag
+        self._link_columns.data_version += 1
         
     @property
     def vertices(self):
@@ -399,6 +426,8 @@ class Link(six.with_metaclass(abc.ABCMeta, object)):
         
         The vertices should be listed as a list of (x,y) tuples when setting.
         """
+        # the list can be changed in place, so it is counted as changed
+        self._link_columns.data_version += 1
         return self._vertices
     @vertices.setter
     def vertices(self, points):
@@ -408,6 +437,7 @@ class Link(six.with_metaclass(abc.ABCMeta, object)):
             if not isinstance(pt, tuple) or len(pt) != 2:
                 raise ValueError('vertices must be a list of 2-tuples')
         self._vertices = points
+        self._link_columns.data_version += 1
     
     def todict(self):
         """Dictionary representation of the link"""
@@ -435,9 +465,13 @@ class Registry(MutableMapping):
 #        self._m = model
         self._data = OrderedDict()
         self._usage = OrderedDict()
+        # incremented by __setitem__ and __delitem__
+        self.version = 0
 
     def _finalize_(self, wn):
         self._options = wn._options
+        self._node_columns = wn._node_columns
+        self._link_columns = wn._link_columns
         self._pattern_reg = wn._pattern_reg
         self._curve_reg = wn._curve_reg
         self._node_reg = wn._node_reg
@@ -461,6 +495,7 @@ class Registry(MutableMapping):
         if not isinstance(key, string_types):
             raise ValueError('Registry keys must be strings')
         self._data[key] = value
+        self.version += 1
     
     def __delitem__(self, key):
         try:
@@ -471,7 +506,9 @@ class Registry(MutableMapping):
                                    self._usage[key])
             elif key in self._usage:
                 self._usage.pop(key)
-            return self._data.pop(key)
+            value = self._data.pop(key)
+            self.version += 1
+            return value
         except KeyError:
             # Do not raise an exception if there is no key of that name
             return
@@ -564,10 +601,11 @@ class Registry(MutableMapping):
         """add args to usage[key]"""
         if not key:
             return
-        if not key in self._usage:
-            self._usage[key] = OrderedSet()
+        usage = self._usage.get(key)
+        if usage is None:
+            usage = self._usage[key] = OrderedSet()
         for arg in args:
-            self._usage[key].add(arg)
+            usage.add(arg)
     
     def remove_usage(self, key, *args):
         """remove args from usage[key]"""
@@ -593,6 +631,197 @@ class Registry(MutableMapping):
         return l
 
 
+class _RowRef(weakref.ref):
+    """Weak reference to an element that is not registered, with its row."""
+    __slots__ = ('row',)
+
+    def __new__(cls, element, callback, row):
+        return super(_RowRef, cls).__new__(cls, element, callback)
+
+    def __init__(self, element, callback, row):
+        super(_RowRef, self).__init__(element, callback)
+        self.row = row
+
+
+class ColumnStore(object):
+    """
+    Contiguous arrays of numeric node or link attributes, one row per element.
+
+    Every node (or link) gets a row when it is created, and the element
+    properties backed by a column (such as elevation, length and diameter)
+    read and write their row. An attribute of all elements can therefore be
+    read as a single array. The rows of elements that are not in the
+    registry (not added yet, or removed) are not registered and are left
+    out of :meth:`get`. Once such an element is garbage collected its row
+    is reset to the default values and reused by the next element, so
+    adding and removing elements does not grow the columns. A removed
+    element that is still referenced keeps its row and its values.
+
+    Each column is an attribute of the store, an array of length
+    :attr:`capacity`. Adding rows can replace the arrays, so do not keep
+    references to them.
+
+    :attr:`version` is incremented when rows are registered or
+    unregistered. The node store is also bumped when links are reconnected
+    or node coordinates change, which invalidates the graph cached by
+    :meth:`~wntr.network.model.WaterNetworkModel.get_graph`.
+
+    :attr:`data_version` is incremented with :attr:`version` and whenever an
+    element sets a column value or another attribute that is written to the
+    large INP file sections (tags, coordinates, link vertices and pipe check
+    valves). :meth:`~wntr.epanet.io.InpFile.write` uses it to reuse the text
+    of unchanged sections.
+
+    Parameters
+    ----------
+    columns : list of (str, dtype, default)
+        Name, numpy dtype and default value of each column
+    """
+    def __init__(self, columns):
+        self._columns = OrderedDict((name, (np.dtype(dtype), default)) for name, dtype, default in columns)
+        self._num_rows = 0
+        self.version = 0
+        self.data_version = 0
+        self._names = np.empty(0, dtype=object)
+        self._registered = np.zeros(0, dtype=bool)
+        # Rows that can be reused, and weak references to the elements of
+        # the rows that are in use but not registered, by row
+        self._free_rows = []
+        self._unregistered = dict()
+        for name, (dtype, default) in self._columns.items():
+            setattr(self, name, np.empty(0, dtype=dtype))
+        self._grow(64)
+
+    def __getstate__(self):
+        # weak references cannot be copied; the unregistered rows of a copy
+        # are never reused
+        state = self.__dict__.copy()
+        state['_unregistered'] = dict()
+        return state
+
+    def _grow(self, capacity):
+        num_rows = self._num_rows
+        names = np.empty(capacity, dtype=object)
+        names[:num_rows] = self._names[:num_rows]
+        self._names = names
+        registered = np.zeros(capacity, dtype=bool)
+        registered[:num_rows] = self._registered[:num_rows]
+        self._registered = registered
+        for name, (dtype, default) in self._columns.items():
+            values = np.full(capacity, default, dtype=dtype)
+            values[:num_rows] = getattr(self, name)[:num_rows]
+            setattr(self, name, values)
+
+    @property
+    def capacity(self):
+        """int: The number of allocated rows"""
+        return len(self._registered)
+
+    @property
+    def num_rows(self):
+        """int: The number of rows in use or free for reuse"""
+        return self._num_rows
+
+    @property
+    def columns(self):
+        """list of str: The column names"""
+        return list(self._columns.keys())
+
+    def add_row(self, element, **values):
+        """
+        Add a row for an element, with default values except for the given
+        column values. A free row is reused if there is one.
+
+        Parameters
+        ----------
+        element : Node or Link
+            The element that owns the row. The row is freed if the element
+            is garbage collected while it is not registered.
+
+        Returns
+        -------
+        int
+            The row index
+        """
+        if self._free_rows:
+            row = self._free_rows.pop()
+        else:
+            row = self._num_rows
+            if row == self.capacity:
+                self._grow(2*row)
+            self._num_rows = row + 1
+        for name, value in values.items():
+            getattr(self, name)[row] = value
+        self._unregistered[row] = _RowRef(element, self._release, row)
+        return row
+
+    def register(self, row, name):
+        """Mark a row as used by the registered element name."""
+        self._names[row] = name
+        self._registered[row] = True
+        self._unregistered.pop(row, None)
+        self.version += 1
+        self.data_version += 1
+
+    def unregister(self, row, element):
+        """Mark the row of an element as no longer used (the element was removed)."""
+        self._names[row] = None
+        self._registered[row] = False
+        self._unregistered[row] = _RowRef(element, self._release, row)
+        self.version += 1
+        self.data_version += 1
+
+    def _release(self, ref):
+        # called when the element of an unregistered row is garbage collected
+        row = ref.row
+        if self._unregistered.get(row) is not ref:
+            return
+        del self._unregistered[row]
+        for name, (dtype, default) in self._columns.items():
+            getattr(self, name)[row] = default
+        self._free_rows.append(row)
+
+    def rows(self, types=None):
+        """
+        Get the registered rows, optionally only for some element types.
+
+        Parameters
+        ----------
+        types : list of int (optional)
+            :class:`NodeType` or :class:`LinkType` codes to include. Default is all types.
+
+        Returns
+        -------
+        tuple
+            List of element names and array of row indices, in row order
+        """
+        n = self._num_rows
+        mask = self._registered[:n].copy()
+        if types is not None:
+            mask &= np.isin(self.type[:n], [int(t) for t in types])
+        rows = np.flatnonzero(mask)
+        return self._names[rows].tolist(), rows
+
+    def get(self, column, types=None):
+        """
+        Get a column for all registered rows, optionally only for some element types.
+
+        Parameters
+        ----------
+        column : str
+            Column name
+        types : list of int (optional)
+            :class:`NodeType` or :class:`LinkType` codes to include. Default is all types.
+
+        Returns
+        -------
+        tuple
+            List of element names and array of values (a copy), in row order
+        """
+        names, rows = self.rows(types)
+        return names, getattr(self, column)[rows]
+
+
 class NodeType(enum.IntEnum):
     """
     Enum class for node types.
@@ -706,3 +935,8 @@ class LinkStatus(enum.IntEnum):
         return int(self) == int(other) and (isinstance(other, int) or \
                self.__class__.__name__ == other.__class__.__name__)
 
+
+# LinkStatus member for each code stored in the initial_status column (the
+# members are listed explicitly, iterating over LinkStatus yields nothing)
+_link_statuses = dict((int(status), status) for status in
+                      [LinkStatus.Closed, LinkStatus.Open, LinkStatus.Active, LinkStatus.CV])
@@ -97,6 +97,24 @@ class Junction(Node):
             return True
         return False
     
+    @property
+    def elevation(self):
+        """float: The elevation of the junction"""
+        return self._node_columns.elevation.item(self._row)
+    @elevation.setter
+    def elevation(self, value):
+        self._node_columns.elevation[self._row] = value
+        self._node_columns.data_version += 1
+
+    @property
+    def demand_timeseries_list(self):
+        """:class:`~wntr.network.elements.Demands`: The demands of the junction"""
+        return self._demand_timeseries_list
+    @demand_timeseries_list.setter
+    def demand_timeseries_list(self, demands):
+        self._demand_timeseries_list = demands
+        self._pattern_reg.version += 1
+
     @property
     def node_type(self):
         """returns ``"Junction"``"""
@@ -244,6 +262,15 @@ class Tank(Node):
         self._init_level = value
         self.head = self.elevation+self._init_level
 
+    @property
+    def elevation(self):
+        """float: The elevation of the tank bottom"""
+        return self._node_columns.elevation.item(self._row)
+    @elevation.setter
+    def elevation(self, value):
+        self._node_columns.elevation[self._row] = value
+        self._node_columns.data_version += 1
+
     @property
     def node_type(self):
         """returns ``"Tank"``"""
@@ -439,6 +466,51 @@ class Pipe(Link):
             return True
         return False
 
+    @property
+    def length(self):
+        """float: The length of the pipe"""
+        return self._link_columns.length.item(self._row)
+    @length.setter
+    def length(self, value):
+        self._link_columns.length[self._row] = value
+        self._link_columns.data_version += 1
+
+    @property
+    def diameter(self):
+        """float: The diameter of the pipe"""
+        return self._link_columns.diameter.item(self._row)
+    @diameter.setter
+    def diameter(self, value):
+        self._link_columns.diameter[self._row] = value
+        self._link_columns.data_version += 1
+
+    @property
+    def roughness(self):
+        """float: The roughness coefficient of the pipe"""
+        return self._link_columns.roughness.item(self._row)
+    @roughness.setter
+    def roughness(self, value):
+        self._link_columns.roughness[self._row] = value
+        self._link_columns.data_version += 1
+
+    @property
+    def minor_loss(self):
+        """float: The minor loss coefficient of the pipe"""
+        return self._link_columns.minor_loss.item(self._row)
+    @minor_loss.setter
+    def minor_loss(self, value):
+        self._link_columns.minor_loss[self._row] = value
+        self._link_columns.data_version += 1
+
+    @property
+    def cv(self):
+        """bool: True if the pipe has a check valve"""
+        return self._cv
+    @cv.setter
+    def cv(self, value):
+        self._cv = value
+        self._link_columns.data_version += 1
+
     @property
     def link_type(self):
         """returns ``"Pipe"``"""
@@ -774,7 +846,7 @@ class Valve(Link):
         super(Valve, self).__init__(wn, name, start_node_name, end_node_name)
         self.diameter = 0.3048
         self.minor_loss = 0.0
-        self._initial_status = LinkStatus.Active
+        self.initial_status = LinkStatus.Active
         self._user_status = LinkStatus.Active
         self._initial_setting = 0.0
 
@@ -807,6 +879,24 @@ class Valve(Link):
     def status(self, status):
         self._user_status = status
 
+    @property
+    def diameter(self):
+        """float: The diameter of the valve"""
+        return self._link_columns.diameter.item(self._row)
+    @diameter.setter
+    def diameter(self, value):
+        self._link_columns.diameter[self._row] = value
+        self._link_columns.data_version += 1
+
+    @property
+    def minor_loss(self):
+        """float: The minor loss coefficient of the valve"""
+        return self._link_columns.minor_loss.item(self._row)
+    @minor_loss.setter
+    def minor_loss(self, value):
+        self._link_columns.minor_loss[self._row] = value
+        self._link_columns.data_version += 1
+
     @property
     def link_type(self):
         """returns ``"Valve"``"""
@@ -1208,6 +1298,7 @@ class TimeSeries(object):
         if not isinstance(value, (int, float, complex)):
             raise ValueError('TimeSeries->base_value must be a number')
         self._base = value
+        self._pattern_reg.version += 1
 
     @property
     def pattern(self):
@@ -1223,6 +1314,7 @@ class TimeSeries(object):
     @pattern_name.setter
     def pattern_name(self, pattern_name):
         self._pattern = pattern_name
+        self._pattern_reg.version += 1
 
     @property
     def category(self):
@@ -1231,6 +1323,7 @@ class TimeSeries(object):
     @category.setter
     def category(self, category):
         self._category = category
+        self._pattern_reg.version += 1
 
     def at(self, time):
         """
@@ -1307,10 +1400,12 @@ class Demands(MutableSequence):
     
     def __setitem__(self, index, obj):
         """Set demand and index <==> S[index] = object"""
+        self._pattern_reg.version += 1
         return self._list.__setitem__(index, self.to_ts(obj))
     
     def __delitem__(self, index):
         """Remove demand at index <==> del S[index]"""
+        self._pattern_reg.version += 1
         return self._list.__delitem__(index)
 
     def __len__(self):
@@ -1372,19 +1467,23 @@ class Demands(MutableSequence):
     def insert(self, index, obj):
         """S.insert(index, object) - insert object before index"""
         self._list.insert(index, self.to_ts(obj))
+        self._pattern_reg.version += 1
     
     def append(self, obj):
         """S.append(object) - append object to the end"""
         self._list.append(self.to_ts(obj))
+        self._pattern_reg.version += 1
     
     def extend(self, iterable):
         """S.extend(iterable) - extend list by appending elements from the iterable"""
         for obj in iterable:
             self._list.append(self.to_ts(obj))
+        self._pattern_reg.version += 1
 
     def clear(self):
         """S.clear() - remove all entries"""
         self._list = []
+        self._pattern_reg.version += 1
 
     def at(self, time, category=None):
         """Return the total demand at a given time."""
@@ -6,7 +6,13 @@ model as a NetworkX MultiDiGraph, and compute topographic metrics on the graph.
 import networkx as nx
 import numpy as np
 import pandas as pd
+import scipy.sparse as sparse
+import scipy.sparse.linalg
+import scipy.sparse.csgraph as csgraph
+from collections import deque, OrderedDict
+import multiprocessing
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +21,13 @@ class WntrMultiDiGraph(nx.MultiDiGraph):
     Extension of networkx MultiDiGraph
     """
 
+    def fresh_copy(self):
+        """
+        Return an empty graph of the same class, used by copy (networkx 2.1)
+        so that copies keep the WNTR graph methods.
+        """
+        return WntrMultiDiGraph()
+
     def weight_graph(self, node_attribute={}, link_attribute={}):
         """
         Return a weighted graph based on node and link attributes.
@@ -32,31 +45,92 @@ class WntrMultiDiGraph(nx.MultiDiGraph):
         Returns
         -------
         Networkx weighted graph
-        
+
+        Notes
+        -----
+        The graph is modified in place, see :meth:`oriented_graph` to build
+        a new weighted graph instead.
         """
+        for node_name, value in dict(node_attribute).items():
+            if node_name in self:
+                self.node[node_name]['weight'] = value
+
+        edges = _edges_with_data(self)
+        values, present = _link_values(link_attribute, [link_name for (node1, node2, link_name, data) in edges])
+        reverse = (np.nan_to_num(values) < 0).tolist()
+        present = present.tolist()
+        # change the direction of the link and value
+        self.remove_edges_from([edge[:3] for edge, rev in zip(edges, reverse) if rev])
+        self.add_edges_from((node2, node1, link_name, {'type': data['type'], 'weight': -value})
+                            for (node1, node2, link_name, data), value, rev
+                            in zip(edges, values, reverse) if rev)
+        for (node1, node2, link_name, data), value, rev, has_value in \
+                zip(edges, values, reverse, present):
+            if has_value and not rev:
+                data['weight'] = value
+
+    def oriented_graph(self, link_attribute, node_attribute=None):
+        """
+        Return a new weighted graph, with links oriented by the sign of a
+        link attribute (e.g. flowrate). The graph is not modified.
 
-        for node_name in self.nodes():
-            try:
-                value = node_attribute[node_name]
+        Parameters
+        ----------
+        link_attribute : dict or pandas Series
+            Link attributes, the weight of each link is the absolute value
+        node_attribute : dict or pandas Series (optional)
+            Node attributes
 
-                nx.set_node_attributes(self, name='weight', values={node_name: value})
-            except:
-                pass
+        Returns
+        -------
+        WntrMultiDiGraph
 
-        for (node1, node2, link_name) in list(self.edges(keys=True)):
-            try:
-                value = link_attribute[link_name]
-
-                if value < 0: # change the direction of the link and value
-                    link_type = self[node1][node2][link_name]['type'] # 'type' should be the only other attribute on G.edge
-                    self.remove_edge(node1, node2, link_name)
-                    self.add_edge(node2, node1, link_name)
-                    nx.set_edge_attributes(self, name='type', values={(node2, node1, link_name): link_type})
-                    nx.set_edge_attributes(self, name='weight', values={(node2, node1, link_name): -value})
-                else:
-                    nx.set_edge_attributes(self, name='weight', values={(node1, node2, link_name): value})
-            except:
-                    pass
+        Notes
+        -----
+        The same as copying the graph and calling :meth:`weight_graph`, but
+        the graph is built in one pass (this also works on the frozen graph
+        returned by ``wn.get_graph(copy=False)``).
+        """
+        edges = _edges_with_data(self)
+        values, present = _link_values(link_attribute, [link_name for (node1, node2, link_name, data) in edges])
+        return self._oriented_graph(edges, values, present, node_attribute)
+
+    def oriented_graphs(self, link_attribute):
+        """
+        Generate weighted graphs oriented by the sign of a link attribute at
+        several times, see :meth:`oriented_graph`
+
+        Parameters
+        ----------
+        link_attribute : pandas DataFrame
+            Link attributes (e.g. flowrate), one row per time and one column
+            per link
+
+        Returns
+        -------
+        Generator of (time, WntrMultiDiGraph)
+        """
+        edges = _edges_with_data(self)
+        values, present = _link_values(link_attribute, [link_name for (node1, node2, link_name, data) in edges])
+        for time, row in zip(link_attribute.index, values):
+            yield time, self._oriented_graph(edges, row, present, None)
+
+    def _oriented_graph(self, edges, values, present, node_attribute):
+        reverse = (np.nan_to_num(values) < 0).tolist()
+        weights = np.abs(values)
+        present = present.tolist()
+        graph = WntrMultiDiGraph()
+        graph.add_nodes_from(self.nodes(data=True))
+        if node_attribute is not None:
+            for node_name, value in dict(node_attribute).items():
+                if node_name in graph:
+                    graph.node[node_name]['weight'] = value
+        graph.add_edges_from(((node2, node1) if rev else (node1, node2)) +
+                             (link_name, {'type': data['type'], 'weight': weight} if has_value
+                                         else {'type': data['type']})
+                             for (node1, node2, link_name, data), weight, rev, has_value
+                             in zip(edges, weights, reverse, present))
+        return graph
 
     def terminal_nodes(self):
         """
@@ -90,67 +164,198 @@ class WntrMultiDiGraph(nx.MultiDiGraph):
         Returns
         -------
         List of links that are bridges
-        
+
+        Notes
+        -----
+        A bridge is a link whose removal increases the number of connected
+        components. Bridges are found with a depth first search (Tarjan's
+        algorithm) in O(V+E). Each link is identified by its
+        (start node, end node, key), so parallel links are never bridges and
+        self loops are ignored.
         """
-        n = nx.number_connected_components(self.to_undirected())
-        bridges = []
-        for (node1, node2, link_name) in list(self.edges(keys=True)):
-            # if node1 and node2 have a neighbor in common, no bridge
-            if len(set(self.neighbors(node1)) & set(self.neighbors(node2))) == 0:
-                self.remove_edge(node1, node2, key=link_name)
-                if nx.number_connected_components(self.to_undirected()) > n:
-                    bridges.append(link_name)
-                self.add_edge(node1, node2, key=link_name)
+        # Undirected adjacency lists, with the link on each entry
+        adj = dict((node, []) for node in self.nodes())
+        for link in self.edges(keys=True):
+            node1, node2, link_name = link
+            if node1 != node2:
+                adj[node1].append((node2, link))
+                adj[node2].append((node1, link))
+
+        # Iterative depth first search. order is the discovery order of a
+        # node, low the lowest order reachable from its subtree using at most
+        # one link that is not in the search tree.
+        order = {}
+        low = {}
+        bridge_links = set()
+        for root in adj:
+            if root in order:
+                continue
+            order[root] = low[root] = len(order)
+            stack = [(root, None, iter(adj[root]))]
+            while stack:
+                node, tree_link, neighbors = stack[-1]
+                for neighbor, link in neighbors:
+                    if link == tree_link:
+                        continue
+                    if neighbor in order:
+                        low[node] = min(low[node], order[neighbor])
+                    else:
+                        order[neighbor] = low[neighbor] = len(order)
+                        stack.append((neighbor, link, iter(adj[neighbor])))
+                        break
+                else:
+                    stack.pop()
+                    if stack:
+                        parent = stack[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                        if low[node] > order[parent]:
+                            bridge_links.add(tree_link)
 
-        return bridges
+        return [link[2] for link in self.edges(keys=True) if link in bridge_links]
 
-    def central_point_dominance(self):
+    def central_point_dominance(self, k=None, epsilon=None, seed=None, processes=1):
         """
         Compute central point dominance
 
+        Parameters
+        ----------
+        k : int (optional)
+            Number of pivot nodes sampled to approximate betweenness
+            centrality. By default every node is a pivot (exact).
+        epsilon : float (optional)
+            Target additive error of the sampled (normalized) betweenness
+            centrality, used to choose k. Ignored if k is given.
+        seed : int or numpy RandomState (optional)
+            Random seed used to sample the pivots
+        processes : int (optional)
+            Number of worker processes, None uses the number of CPUs.
+            Default is 1 (computed in the calling process).
+
         Returns
         -------
         Central point dominance (float)
-        
+
+        Notes
+        -----
+        Betweenness centrality is computed on an undirected graph with
+        Brandes' algorithm, one breadth first search per pivot node, which
+        takes O(V*E) when every node is a pivot. When k (or epsilon) is
+        given, k pivots are sampled at random and the dependencies are
+        scaled by V/k (Brandes and Pich, 2007). With epsilon, k is chosen
+        from the Hoeffding bound k = ln(2V/0.1)/(2 epsilon^2), so that all
+        betweenness values are within epsilon with probability 0.9.
+        Pivots are split into shards that are processed in parallel when
+        processes is not 1.
         """
-        bet_cen = nx.betweenness_centrality(self.to_undirected())
-        bet_cen = list(bet_cen.values())
-        cpd = sum(max(bet_cen) - np.array(bet_cen))/(len(bet_cen)-1)
+        bet_cen = self._betweenness_centrality(k=k, epsilon=epsilon, seed=seed,
+                                               processes=processes)
+        cpd = sum(max(bet_cen) - bet_cen)/(len(bet_cen)-1)
 
         return cpd
 
+    def _betweenness_centrality(self, k=None, epsilon=None, seed=None, processes=1):
+        # Normalized betweenness centrality of the undirected graph, as a
+        # numpy array in the order of self.nodes()
+        nodes = list(self.nodes())
+        index = dict((node, i) for i, node in enumerate(nodes))
+        n = len(nodes)
+        adj = [set() for i in range(n)]
+        for node1, node2 in self.edges():
+            if node1 != node2:
+                adj[index[node1]].add(index[node2])
+                adj[index[node2]].add(index[node1])
+        adj = [list(neighbors) for neighbors in adj]
+
+        if k is None and epsilon is not None:
+            k = int(math.ceil(math.log(2*n/0.1)/(2*epsilon**2)))
+        if k is None or k >= n:
+            pivots = np.arange(n)
+        else:
+            if not isinstance(seed, np.random.RandomState):
+                seed = np.random.RandomState(seed)
+            pivots = np.sort(seed.choice(n, size=k, replace=False))
+        pivots = [int(i) for i in pivots]
+
+        if processes == 1:
+            betweenness = _betweenness_dependencies(adj, pivots)
+        else:
+            if processes is None:
+                processes = multiprocessing.cpu_count()
+            num_shards = min(len(pivots), 4*processes)
+            shards = [pivots[i::num_shards] for i in range(num_shards)]
+            pool = multiprocessing.Pool(processes=processes, initializer=_betweenness_initializer,
+                                        initargs=(adj,))
+            try:
+                output = pool.map(_betweenness_worker, shards, chunksize=1)
+            finally:
+                pool.close()
+                pool.join()
+            betweenness = np.sum(output, axis=0)
+
+        if n > 2:
+            betweenness *= 1.0/((n-1)*(n-2))
+        if len(pivots) < n:
+            betweenness *= float(n)/len(pivots)
+
+        return betweenness
+
     def spectral_gap(self):
         """
-        Spectral gap. Difference in the first and second eigenvalue of
-        the adjacency matrix
+        Spectral gap. Difference in the first and second largest eigenvalue
+        of the adjacency matrix. Uses an undirected graph.
 
         Returns
         -------
         Spectral gap (float)
-        
-        """
 
-        eig = nx.adjacency_spectrum(self)
+        Notes
+        -----
+        Only the two largest eigenvalues are computed, using the sparse
+        adjacency matrix and scipy.sparse.linalg.eigsh (Lanczos).
+        """
+        A = self._undirected_adjacency_matrix()
+        if A.shape[0] < 3:
+            eig = np.linalg.eigvalsh(A.toarray())
+        else:
+            eig = scipy.sparse.linalg.eigsh(A, k=2, which='LA', return_eigenvectors=False)
+        eig = np.sort(eig)[::-1]
         spectral_gap = eig[0] - eig[1]
 
-        return spectral_gap.real
+        return spectral_gap
 
     def algebraic_connectivity(self):
         """
-        Algebraic connectivity. Second smallest eigenvalue of the normalized
-        Laplacian matrix of a network. Uses an undirected graph.
+        Algebraic connectivity. Second smallest eigenvalue of the Laplacian
+        matrix of a network. Uses an undirected graph.
 
         Returns
         -------
         Algebraic connectivity (float)
-        
+
+        Notes
+        -----
+        Only the two smallest eigenvalues are computed, using the sparse
+        Laplacian matrix and scipy.sparse.linalg.eigsh in shift-invert mode
+        with a small negative shift (the Laplacian is singular).
         """
-        eig = nx.laplacian_spectrum(self.to_undirected())
+        A = self._undirected_adjacency_matrix()
+        L = sparse.diags(np.asarray(A.sum(axis=1)).ravel()) - A
+        if L.shape[0] < 3:
+            eig = np.linalg.eigvalsh(L.toarray())
+        else:
+            eig = scipy.sparse.linalg.eigsh(L.tocsc(), k=2, sigma=-1e-5, which='LM',
+                                            return_eigenvectors=False)
         eig = np.sort(eig)
         alg_con = eig[1]
 
         return alg_con
 
+    def _undirected_adjacency_matrix(self):
+        # Sparse adjacency matrix of self.to_undirected(), without copying
+        # the graph. Self loops are counted once.
+        A = nx.adjacency_matrix(self).astype(float)
+        return (A + A.T - sparse.diags(A.diagonal())).tocsr()
+
     def critical_ratio_defrag(self):
         """
         Critical ratio of defragmentation.
@@ -166,7 +371,7 @@ class WntrMultiDiGraph(nx.MultiDiGraph):
 
         return fc
 
-    def links_in_simple_paths(self, sources, sinks):
+    def links_in_simple_paths(self, sources, sinks, cutoff=None, max_paths=None, seed=None):
         """
         Count all links in a simple path between sources and sinks
 
@@ -176,33 +381,436 @@ class WntrMultiDiGraph(nx.MultiDiGraph):
             List of source nodes
         sinks : list
             List of sink nodes
-        sinks : list
-            List of sink nodes
+        cutoff : int (optional)
+            Only count paths with at most cutoff links
+        max_paths : int (optional)
+            Count at most max_paths paths between each source and sink. The
+            paths are found by a depth first search that visits the links
+            out of each node in random order, so they are a random sample
+            of the simple paths.
+        seed : int or numpy RandomState (optional)
+            Random seed used with max_paths
 
         Returns
         -------
-        Dictionary with the number of times each link is involved in a path
-        
+        pandas Series with the number of times each link is involved in a path
+
+        Notes
+        -----
+        If the graph is a directed acyclic graph (e.g. a graph oriented by
+        flow direction with :meth:`weight_graph`) and neither cutoff nor
+        max_paths is given, the counts are computed without enumerating
+        paths: the count of a link from u to v is the number of paths from
+        the sources to u, times the number of paths from v to the sinks,
+        times the number of parallel links from u to v. This takes O(V+E).
+        Otherwise simple paths are enumerated, which is exponential in the
+        number of loops.
         """
-        link_names = [name for (node1, node2, name) in list(self.edges(keys=True))]
-        link_count = pd.Series(data = 0, index=link_names)
-
+        for node in list(sources) + list(sinks):
+            if node not in self:
+                raise nx.NetworkXError('node %s not in graph'%node)
+        edges = list(self.edges(keys=True))
+        link_names = [name for (node1, node2, name) in edges]
+
+        if cutoff is None and max_paths is None and nx.is_directed_acyclic_graph(self):
+            order = list(nx.topological_sort(self))
+            # number of paths from the sources to each node
+            forward = dict.fromkeys(order, 0)
+            for source in sources:
+                forward[source] += 1
+            for node in order:
+                count = forward[node]
+                if count:
+                    for node1, node2 in self.out_edges(node):
+                        forward[node2] += count
+            # number of paths from each node to the sinks
+            backward = dict.fromkeys(order, 0)
+            for sink in sinks:
+                backward[sink] += 1
+            for node in reversed(order):
+                count = backward[node]
+                if count:
+                    for node1, node2 in self.in_edges(node):
+                        backward[node1] += count
+            # sources and sinks are the same node for paths of no links,
+            # which are not counted
+            counts = [forward[node1]*len(self[node1][node2])*backward[node2]
+                      for (node1, node2, name) in edges]
+            return pd.Series(data=np.array(counts), index=link_names)
+
+        # positions in edges of the links between each pair of nodes
+        pair_links = {}
+        for i, (node1, node2, name) in enumerate(edges):
+            pair_links.setdefault((node1, node2), []).append(i)
+        pair_links = dict((pair, np.array(links)) for pair, links in pair_links.items())
+
+        if max_paths is not None and not isinstance(seed, np.random.RandomState):
+            seed = np.random.RandomState(seed)
+        link_count = np.zeros(len(edges), dtype=int)
         for sink in sinks:
             for source in sources:
                 if nx.has_path(self, source, sink):
-                    paths = _all_simple_paths(self,source,target=sink)
-                    for path in paths:
+                    paths = _all_simple_paths(self, source, target=sink, cutoff=cutoff,
+                                              random_state=seed if max_paths is not None else None)
+                    for num_paths, path in enumerate(paths):
+                        if max_paths is not None and num_paths >= max_paths:
+                            break
                         for i in range(len(path)-1):
-                            links = list(self[path[i]][path[i+1]].keys())
-                            for link in links:
-                                link_count[link] = link_count[link]+1
+                            link_count[pair_links[(path[i], path[i+1])]] += 1
 
-        return link_count
+        return pd.Series(data=link_count, index=link_names)
 
 
-def _all_simple_paths(G, source, target, cutoff=None):
+class CSRGraph(object):
+    """
+    Compact graph of a water network model in compressed sparse row (CSR)
+    format.
+
+    The graph stores the start and end node of each link as integer arrays
+    and the undirected adjacency of the nodes as a
+    scipy.sparse.csr_matrix. Topographic metrics are computed with numpy and
+    scipy.sparse.csgraph instead of networkx, which is much faster and uses
+    much less memory on large networks. Distances are the number of links
+    on a shortest path of the undirected graph. Use
+    :meth:`~wntr.network.model.WaterNetworkModel.get_graph` for a networkx
+    graph.
+
+    Parameters
+    ----------
+    node_names : list of str
+        Node names
+    link_names : list of str
+        Link names
+    start_nodes : array of int
+        Position of the start node of each link in node_names
+    end_nodes : array of int
+        Position of the end node of each link in node_names
+    """
+
+    def __init__(self, node_names, link_names, start_nodes, end_nodes):
+        self.node_names = list(node_names)
+        self.link_names = list(link_names)
+        self.start_nodes = np.array(start_nodes, dtype=np.int64)
+        self.end_nodes = np.array(end_nodes, dtype=np.int64)
+        self.start_nodes.setflags(write=False)
+        self.end_nodes.setflags(write=False)
+
+        # symmetric 0/1 adjacency, without self loops or parallel links
+        n = len(self.node_names)
+        mask = self.start_nodes != self.end_nodes
+        rows = np.concatenate([self.start_nodes[mask], self.end_nodes[mask]])
+        cols = np.concatenate([self.end_nodes[mask], self.start_nodes[mask]])
+        adjacency = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+        adjacency.sum_duplicates()
+        adjacency.data[:] = 1.0
+        self.adjacency = adjacency
+
+    @property
+    def num_nodes(self):
+        """int: The number of nodes"""
+        return len(self.node_names)
+
+    @property
+    def num_links(self):
+        """int: The number of links"""
+        return len(self.link_names)
+
+    def oriented_adjacency(self, link_attribute):
+        """
+        Get the weighted adjacency matrix of the graph with links oriented by
+        the sign of a link attribute (e.g. flowrate)
+
+        Entry (i, j) is the sum of the absolute values of the links from
+        node i to node j after orientation (links with a negative value go
+        from their end node to their start node). Links without a value
+        are left out.
+
+        Parameters
+        ----------
+        link_attribute : pandas Series or DataFrame
+            Link attributes, a Series for one time or a DataFrame with one
+            row per time and one column per link
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix, or an OrderedDict of csr_matrix indexed by
+        time if link_attribute is a DataFrame
+        """
+        values, present = _link_values(link_attribute, self.link_names)
+        n = self.num_nodes
+        matrices = []
+        for row in np.atleast_2d(values):
+            mask = ~np.isnan(row)
+            reverse = np.nan_to_num(row) < 0
+            rows = np.where(reverse, self.end_nodes, self.start_nodes)[mask]
+            cols = np.where(reverse, self.start_nodes, self.end_nodes)[mask]
+            matrices.append(sparse.csr_matrix((np.abs(row[mask]), (rows, cols)), shape=(n, n)))
+        if isinstance(link_attribute, pd.DataFrame):
+            return OrderedDict(zip(link_attribute.index, matrices))
+        return matrices[0]
+
+    def degree(self):
+        """
+        Get the number of links connected to each node
+
+        Returns
+        -------
+        pandas Series with the degree of each node
+        """
+        degree = np.bincount(self.start_nodes, minlength=self.num_nodes) + \
+                 np.bincount(self.end_nodes, minlength=self.num_nodes)
+        return pd.Series(data=degree, index=self.node_names)
+
+    def terminal_nodes(self):
+        """
+        Get all nodes with degree 1
+
+        Returns
+        -------
+        List of terminal node names
+        """
+        degree = self.degree()
+        return degree.index[degree.values == 1].tolist()
+
+    def connected_components(self):
+        """
+        Get the connected components (uses an undirected graph)
+
+        Returns
+        -------
+        List of lists of node names, one list per component
+        """
+        num_components, labels = csgraph.connected_components(self.adjacency, directed=False)
+        order = np.argsort(labels, kind='mergesort')
+        splits = np.cumsum(np.bincount(labels, minlength=num_components))[:-1]
+        names = np.array(self.node_names, dtype=object)
+        return [component.tolist() for component in np.split(names[order], splits)]
+
+    def is_connected(self):
+        """
+        Return True if the undirected graph is connected
+
+        Returns
+        -------
+        bool
+        """
+        if self.num_nodes == 0:
+            return False
+        num_components, labels = csgraph.connected_components(self.adjacency, directed=False)
+        return num_components == 1
+
+    def articulation_points(self):
+        """
+        Get articulation points (uses an undirected graph)
+
+        Returns
+        -------
+        List of node names that are articulation points
+
+        Notes
+        -----
+        An articulation point is a node whose removal increases the number
+        of connected components. Articulation points are found with a depth
+        first search (Tarjan's algorithm) in O(V+E).
+        """
+        indptr = self.adjacency.indptr.tolist()
+        indices = self.adjacency.indices.tolist()
+        n = self.num_nodes
+        order = [-1]*n
+        low = [0]*n
+        is_articulation = [False]*n
+        count = 0
+        for root in range(n):
+            if order[root] >= 0:
+                continue
+            order[root] = low[root] = count
+            count += 1
+            root_children = 0
+            stack = [(root, iter(indices[indptr[root]:indptr[root+1]]))]
+            while stack:
+                node, neighbors = stack[-1]
+                for neighbor in neighbors:
+                    if order[neighbor] >= 0:
+                        low[node] = min(low[node], order[neighbor])
+                    else:
+                        order[neighbor] = low[neighbor] = count
+                        count += 1
+                        stack.append((neighbor, iter(indices[indptr[neighbor]:indptr[neighbor+1]])))
+                        break
+                else:
+                    stack.pop()
+                    if len(stack) > 1:
+                        parent = stack[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                        if low[node] >= order[parent]:
+                            is_articulation[parent] = True
+                    elif stack:
+                        root_children += 1
+            if root_children > 1:
+                is_articulation[root] = True
+
+        return [name for name, value in zip(self.node_names, is_articulation) if value]
+
+    def shortest_path_length(self, sources=None):
+        """
+        Get the number of links on the shortest paths between nodes (uses an
+        undirected graph and a breadth first search)
+
+        Parameters
+        ----------
+        sources : list of str (optional)
+            Source nodes. Default is all nodes.
+
+        Returns
+        -------
+        pandas DataFrame with one row per source and one column per node,
+        np.inf if the node cannot be reached
+        """
+        if sources is None:
+            sources = self.node_names
+        position = dict((name, i) for i, name in enumerate(self.node_names))
+        indices = [position[name] for name in sources]
+        dist = csgraph.shortest_path(self.adjacency, method='D', directed=False,
+                                     unweighted=True, indices=indices)
+        return pd.DataFrame(data=np.atleast_2d(dist), index=list(sources), columns=self.node_names)
+
+    def _source_eccentricity(self):
+        # Maximum and sum of the distances from each node, computed for
+        # blocks of sources to keep the distance matrix small
+        if not self.is_connected():
+            raise RuntimeError('Graph is not connected')
+        n = self.num_nodes
+        block = max(1, 2**23 // n)
+        eccentricity = np.zeros(n, dtype=int)
+        total = 0
+        for start in range(0, n, block):
+            indices = np.arange(start, min(start+block, n))
+            dist = csgraph.shortest_path(self.adjacency, method='D', directed=False,
+                                         unweighted=True, indices=indices)
+            eccentricity[indices] = dist.max(axis=1)
+            total += dist.sum()
+        return eccentricity, total
+
+    def eccentricity(self):
+        """
+        Get the eccentricity of each node, the maximum distance to all other
+        nodes (uses an undirected graph)
+
+        Returns
+        -------
+        pandas Series with the eccentricity of each node
+        """
+        eccentricity, total = self._source_eccentricity()
+        return pd.Series(data=eccentricity, index=self.node_names)
+
+    def diameter(self):
+        """
+        Get the diameter, the maximum eccentricity (uses an undirected graph)
+
+        Returns
+        -------
+        Diameter (int)
+        """
+        eccentricity, total = self._source_eccentricity()
+        return int(eccentricity.max())
+
+    def average_shortest_path_length(self):
+        """
+        Get the average shortest path length between all pairs of nodes
+        (uses an undirected graph)
+
+        Returns
+        -------
+        Average shortest path length (float)
+        """
+        n = self.num_nodes
+        if n == 1:
+            return 0.0
+        eccentricity, total = self._source_eccentricity()
+        return float(total)/(n*(n-1))
+
+
+def _edges_with_data(G):
+    # (start node, end node, key, data dict) of each link, in the order of
+    # G.edges(keys=True, data=True) but read straight from the adjacency
+    return [(node1, node2, key, data) for node1, neighbors in G._adj.items()
+            for node2, keys in neighbors.items() for key, data in keys.items()]
+
+
+def _link_values(link_attribute, link_names):
+    """
+    Values of a link attribute (dict, Series or DataFrame with links as
+    columns) as a float array aligned with link_names, nan where missing,
+    and a boolean array that is True for the links in link_attribute
+    """
+    if isinstance(link_attribute, pd.DataFrame):
+        present = link_attribute.columns.get_indexer(link_names) >= 0
+        return link_attribute.reindex(columns=link_names).values.astype(float), present
+    if not isinstance(link_attribute, pd.Series):
+        link_attribute = pd.Series(dict(link_attribute), dtype=float)
+    present = link_attribute.index.get_indexer(link_names) >= 0
+    return link_attribute.reindex(link_names).values.astype(float), present
+
+
+def _betweenness_dependencies(adj, pivots):
+    """
+    Sum of the dependencies of each node on the pivot nodes (Brandes'
+    algorithm for unweighted graphs). adj is a list of neighbor lists.
+    """
+    n = len(adj)
+    betweenness = [0.0]*n
+    for source in pivots:
+        # breadth first search, counting shortest paths
+        stack = []
+        pred = {}
+        sigma = {source: 1}
+        dist = {source: 0}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            stack.append(node)
+            next_dist = dist[node] + 1
+            node_sigma = sigma[node]
+            for neighbor in adj[node]:
+                if neighbor not in dist:
+                    queue.append(neighbor)
+                    dist[neighbor] = next_dist
+                    sigma[neighbor] = 0
+                    pred[neighbor] = []
+                if dist[neighbor] == next_dist:
+                    sigma[neighbor] += node_sigma
+                    pred[neighbor].append(node)
+        # accumulate dependencies in order of decreasing distance
+        delta = dict.fromkeys(stack, 0.0)
+        while stack:
+            node = stack.pop()
+            if node == source:
+                break
+            coeff = (1.0 + delta[node])/sigma[node]
+            for parent in pred[node]:
+                delta[parent] += sigma[parent]*coeff
+            betweenness[node] += delta[node]
+
+    return np.array(betweenness)
+
+
+_betweenness_adj = None
+
+def _betweenness_initializer(adj):
+    global _betweenness_adj
+    _betweenness_adj = adj
+
+
+def _betweenness_worker(pivots):
+    return _betweenness_dependencies(_betweenness_adj, pivots)
+
+
+def _all_simple_paths(G, source, target, cutoff=None, random_state=None):
     """
     Adaptation of nx.all_simple_paths for multigraphs
+
+    If random_state (a numpy RandomState) is given, the links out of each
+    node are visited in random order.
     """
 
     if source not in G:
@@ -212,30 +820,41 @@ def _all_simple_paths(G, source, target, cutoff=None):
     if cutoff is None:
         cutoff = len(G)-1
     if G.is_multigraph():
-        return _all_simple_paths_multigraph(G, source, target, cutoff=cutoff)
+        return _all_simple_paths_multigraph(G, source, target, cutoff=cutoff,
+                                            random_state=random_state)
     else:
         return 1 #_all_simple_paths_graph(G, source, target, cutoff=cutoff)
 
 
-def _all_simple_paths_multigraph(G, source, target, cutoff=None):
+def _children(G, node, random_state):
+    children = [v for u,v in G.edges(node)]
+    if random_state is not None:
+        random_state.shuffle(children)
+    return iter(children)
+
+
+def _all_simple_paths_multigraph(G, source, target, cutoff=None, random_state=None):
     if cutoff < 1:
         return
+    # nodes with a path to target
+    to_target = nx.ancestors(G, target)
+    to_target.add(target)
     visited = [source]
-    stack = [(v for u,v,k in list(G.edges(source, keys=True)))]
+    stack = [_children(G, source, random_state)]
     while stack:
         children = stack[-1]
         child = next(children, None)
         if child is None:
             stack.pop()
             visited.pop()
-        elif nx.has_path(G, child, target) == False: # added kaklise
+        elif child not in to_target: # added kaklise
             pass
         elif len(visited) < cutoff:
             if child == target:
                 yield visited + [target]
             elif child not in visited:
                 visited.append(child)
-                stack.append((v for u,v in list(G.edges(child))))
+                stack.append(_children(G, child, random_state))
         else: #len(visited) == cutoff:
             count = ([child]+list(children)).count(target)
             for i in range(count):
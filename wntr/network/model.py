@@ -24,15 +24,16 @@ else:
     from collections.abc import MutableSequence
 
 import numpy as np
+import pandas as pd
 import networkx as nx
 
 from .options import WaterNetworkOptions
-from .base import Link, Registry, LinkStatus, AbstractModel
+from .base import Node, Link, Registry, LinkStatus, AbstractModel, ColumnStore, NodeType, LinkType
 from .elements import Junction, Reservoir, Tank
 from .elements import Pipe, Pump, HeadPump, PowerPump
 from .elements import Valve, PRValve, PSValve, PBValve, TCValve, FCValve, GPValve
 from .elements import Pattern, TimeSeries, Demands, Curve, Source
-from .graph import WntrMultiDiGraph
+from .graph import WntrMultiDiGraph, CSRGraph
 from .controls import ControlPriority, _ControlType, TimeOfDayCondition, SimTimeCondition, ValueCondition, \
     TankLevelCondition, RelativeCondition, OrCondition, AndCondition, _CloseCVCondition, _OpenCVCondition, \
     _ClosePowerPumpCondition, _OpenPowerPumpCondition, _CloseHeadPumpCondition, _OpenHeadPumpCondition, \
@@ -55,9 +56,14 @@ class WaterNetworkModel(AbstractModel):
     inp_file_name: string (optional)
         Directory and filename of EPANET inp file to load into the
         WaterNetworkModel object.
+    cache_dir: string (optional)
+        Directory of the INP parse cache. If given, the parsed model is
+        saved in the WNTR npz format, keyed by the contents of the INP file,
+        and loaded from there the next time the same file is read (see
+        :func:`~wntr.network.npz.read_inpfile_cached`).
     """
 
-    def __init__(self, inp_file_name=None):
+    def __init__(self, inp_file_name=None, cache_dir=None):
 
         # Network name
         self.name = None
@@ -65,6 +71,8 @@ class WaterNetworkModel(AbstractModel):
         self._options = WaterNetworkOptions()
         self._node_reg = NodeRegistry(self)
         self._link_reg = LinkRegistry(self)
+        self._node_columns = self._node_reg._columns
+        self._link_columns = self._link_reg._columns
         self._pattern_reg = PatternRegistry(self)
         self._curve_reg = CurveRegistry(self)
         self._controls = OrderedDict()
@@ -78,7 +86,13 @@ class WaterNetworkModel(AbstractModel):
         # Name of pipes that are check valves
         self._check_valves = []
 
-        # NetworkX Graph to store the pipe connectivity and node coordinates
+        # NetworkX Graph to store the pipe connectivity and node coordinates,
+        # built by get_graph and cached until the node column store version
+        # changes (likewise the CSRGraph built by get_csr_graph)
+        self._graph = None
+        self._graph_version = None
+        self._csr_graph = None
+        self._csr_graph_version = None
 
         self._Htol = 0.00015  # Head tolerance in meters.
         self._Qtol = 2.8e-5  # Flow tolerance in m^3/s.
@@ -86,7 +100,9 @@ class WaterNetworkModel(AbstractModel):
         self._labels = None
 
         self._inpfile = None
-        if inp_file_name:
+        if inp_file_name and cache_dir is not None:
+            wntr.network.npz.read_inpfile_cached(inp_file_name, cache_dir, wn=self)
+        elif inp_file_name:
             self.read_inpfile(inp_file_name)
             
         # To be deleted and/or renamed and/or moved
@@ -439,6 +455,31 @@ class WaterNetworkModel(AbstractModel):
         if check_valve_flag:
             self._check_valves.append(name)
 
+    def _add_junctions(self, names, base_demands, demand_patterns, elevations,
+                       demand_category=None):
+        """
+        Adds a batch of junctions to the water network model.
+
+        Used by the INP reader; arguments are equal length lists, see
+        :meth:`add_junction`. Values are assumed to be floats already.
+        """
+        self._node_reg._add_junctions(names, base_demands, demand_patterns,
+                                      elevations, demand_category)
+
+    def _add_pipes(self, names, start_node_names, end_node_names, lengths,
+                   diameters, roughnesses, minor_losses, statuses, check_valve_flags):
+        """
+        Adds a batch of pipes to the water network model.
+
+        Used by the INP reader; arguments are equal length lists, see
+        :meth:`add_pipe`. Values are assumed to be floats and statuses
+        LinkStatus members already.
+        """
+        self._link_reg._add_pipes(names, start_node_names, end_node_names, lengths,
+                                  diameters, roughnesses, minor_losses, statuses,
+                                  check_valve_flags)
+        self._check_valves.extend(name for name, cv in zip(names, check_valve_flags) if cv)
+
 
     def add_pump(self, name, start_node_name, end_node_name, pump_type='POWER',
                  pump_parameter=50.0, speed=1.0, pattern=None):
@@ -1164,29 +1205,61 @@ class WaterNetworkModel(AbstractModel):
                  )
         return d
     
-    def get_graph(self):
+    def get_graph(self, copy=True):
         """
         Returns a networkx graph of the water network model
 
+        The graph is built once and cached on the model. The cache is
+        rebuilt after nodes or links are added, removed or reconnected, or
+        node coordinates change.
+
+        Parameters
+        ----------
+        copy : bool (optional)
+            If True (default), return a copy of the cached graph, which can be
+            modified (e.g. by :meth:`WntrMultiDiGraph.weight_graph`).
+            If False, return the cached graph itself. It is frozen, modifying
+            it raises a networkx error.
+
         Returns
         --------
         WaterNetworkModel networkx graph.
         """
-        graph = WntrMultiDiGraph()
-        
-        for name, node in self.nodes():
-            graph.add_node(name)
-            nx.set_node_attributes(graph, name='pos', values={name: node.coordinates})
-            nx.set_node_attributes(graph, name='type', values={name:node.node_type})
-        
-        for name, link in self.links():
-            start_node = link.start_node_name
-            end_node = link.end_node_name
-            graph.add_edge(start_node, end_node, key=name)
-            nx.set_edge_attributes(graph, name='type', 
-                        values={(start_node, end_node, name):link.link_type})
-        
-        return graph
+        version = self._node_columns.version
+        if self._graph is None or self._graph_version != version:
+            graph = WntrMultiDiGraph()
+            graph.add_nodes_from((name, {'pos': node.coordinates, 'type': node.node_type})
+                                 for name, node in self.nodes())
+            graph.add_edges_from((link.start_node_name, link.end_node_name, name, {'type': link.link_type})
+                                 for name, link in self.links())
+            self._graph = nx.freeze(graph)
+            self._graph_version = version
+        if copy:
+            return self._graph.copy()
+        return self._graph
+    
+    def get_csr_graph(self):
+        """
+        Returns a compact CSR graph of the water network model
+
+        The graph is built from the node and link column arrays, without
+        networkx, and is cached on the model like :meth:`get_graph`.
+
+        Returns
+        --------
+        :class:`~wntr.network.graph.CSRGraph`
+        """
+        version = self._node_columns.version
+        if self._csr_graph is None or self._csr_graph_version != version:
+            node_names, node_rows = self._node_columns.rows()
+            link_names, link_rows = self._link_columns.rows()
+            position = np.full(self._node_columns.num_rows, -1, dtype=np.int64)
+            position[node_rows] = np.arange(len(node_rows))
+            self._csr_graph = CSRGraph(node_names, link_names,
+                                       position[self._link_columns.start_node[link_rows]],
+                                       position[self._link_columns.end_node[link_rows]])
+            self._csr_graph_version = version
+        return self._csr_graph
     
     def assign_demand(self, demand, pattern_prefix='ResetDemand'):
         """
@@ -1245,13 +1318,15 @@ class WaterNetworkModel(AbstractModel):
         -------
         A list of link names connected to the node
         """
-        link_types = {'Pipe', 'Pump', 'Valve'}
+        empty = ()
         if flag.upper() == 'ALL':
-            return [link_name for link_name, link_type in self._node_reg.get_usage(node_name) if link_type in link_types and node_name in {self.get_link(link_name).start_node_name, self.get_link(link_name).end_node_name}]
+            out_links = self._node_reg._out_links.get(node_name, empty)
+            in_links = self._node_reg._in_links.get(node_name, empty)
+            return list(out_links) + [link_name for link_name in in_links if link_name not in out_links]
         elif flag.upper() == 'INLET':
-            return [link_name for link_name, link_type in self._node_reg.get_usage(node_name) if link_type in link_types and node_name == self.get_link(link_name).end_node_name]
+            return list(self._node_reg._in_links.get(node_name, empty))
         elif flag.upper() == 'OUTLET':
-            return [link_name for link_name, link_type in self._node_reg.get_usage(node_name) if link_type in link_types and node_name == self.get_link(link_name).start_node_name]
+            return list(self._node_reg._out_links.get(node_name, empty))
         else:
             logger.error('Unrecognized flag: {0}'.format(flag))
             raise ValueError('Unrecognized flag: {0}'.format(flag))
@@ -1287,27 +1362,21 @@ class WaterNetworkModel(AbstractModel):
 
         Returns
         -------
-        A dictionary of node names to attribute where node_type satisfies the
-        operation threshold.
+        A pandas Series of node attributes, indexed by node name, for the nodes
+        of node_type that satisfy the operation threshold.
 
         Notes
         -----
-        If operation and value are both None, the dictionary will contain the attributes
+        If operation and value are both None, the Series will contain the attributes
         for all nodes with the specified attribute.
 
+        Attributes stored in the node column store (elevation) are read as
+        one array and the operation is applied to the whole array.
+
         """
-        node_attribute_dict = OrderedDict()
-        for name, node in self.nodes(node_type):
-            try:
-                if operation == None and value == None:
-                    node_attribute_dict[name] = getattr(node, attribute)
-                else:
-                    node_attribute = getattr(node, attribute)
-                    if operation(node_attribute, value):
-                        node_attribute_dict[name] = node_attribute
-            except AttributeError:
-                pass
-        return node_attribute_dict
+        node_types = {Junction: NodeType.Junction, Reservoir: NodeType.Reservoir, Tank: NodeType.Tank}
+        return self._query_attribute(self._node_reg, NodeRegistry._column_types, node_types, Node,
+                                     attribute, operation, value, node_type)
 
     def query_link_attribute(self, attribute, operation=None, value=None, link_type=None):
         """
@@ -1340,27 +1409,58 @@ class WaterNetworkModel(AbstractModel):
 
         Returns
         -------
-        A dictionary of link names to attributes where link_type satisfies the
-        operation threshold.
+        A pandas Series of link attributes, indexed by link name, for the links
+        of link_type that satisfy the operation threshold.
 
         Notes
         -----
-        If operation and value are both None, the dictionary will contain the attributes
+        If operation and value are both None, the Series will contain the attributes
         for all links with the specified attribute.
 
+        Attributes stored in the link column store (length, diameter,
+        roughness and minor_loss) are read as one array and the operation is
+        applied to the whole array.
+
         """
-        link_attribute_dict = {}
-        for name, link in self.links(link_type):
-            try:
-                if operation == None and value == None:
-                    link_attribute_dict[name] = getattr(link, attribute)
-                else:
-                    link_attribute = getattr(link, attribute)
-                    if operation(link_attribute, value):
-                        link_attribute_dict[name] = link_attribute
-            except AttributeError:
-                pass
-        return link_attribute_dict
+        link_types = {Pipe: LinkType.Pipe, Pump: LinkType.Pump, Valve: LinkType.Valve}
+        return self._query_attribute(self._link_reg, LinkRegistry._column_types, link_types, Link,
+                                     attribute, operation, value, link_type)
+
+    def _query_attribute(self, registry, column_types, type_codes, base_class,
+                         attribute, operation, value, element_type):
+        if element_type is None or element_type is base_class:
+            types = None
+        else:
+            types = type_codes.get(element_type, False)
+        if attribute in column_types and types is not False:
+            # Types of the requested elements that have the attribute
+            codes = column_types[attribute]
+            if types is not None:
+                codes = [code for code in codes if code == types]
+            names, values = registry._columns.get(attribute, codes)
+        else:
+            names = []
+            values = []
+            for name, element in registry(element_type):
+                try:
+                    values.append(getattr(element, attribute))
+                except AttributeError:
+                    continue
+                names.append(name)
+            if all(type(v) in (float, int) for v in values):
+                values = np.array(values, dtype=float if len(values) == 0 else None)
+        if not (operation is None and value is None):
+            if isinstance(values, np.ndarray):
+                mask = np.asarray(operation(values, value), dtype=bool)
+                values = values[mask]
+            else:
+                mask = [bool(operation(v, value)) for v in values]
+                values = [v for v, keep in zip(values, mask) if keep]
+            names = [name for name, keep in zip(names, mask) if keep]
+        index = pd.Index(names, dtype=object)
+        if isinstance(values, np.ndarray):
+            return pd.Series(values, index=index)
+        return pd.Series(values, index=index, dtype=object)
 
     def reset_initial_values(self):
         """
@@ -1420,10 +1520,14 @@ class WaterNetworkModel(AbstractModel):
         """
         Writes the current water network model to an EPANET INP file
 
+        The largest sections are reused from the previous write if the model
+        has not changed since (see :meth:`wntr.epanet.io.InpFile.write`).
+
         Parameters
         ----------
-        filename : string
-            Name of the inp file.
+        filename : string or file-like
+            Name of the inp file, or a binary file-like object (such as
+            io.BytesIO) to write to.
         units : str, int or FlowUnits
             Name of the units being written to the inp file.
 
@@ -1434,6 +1538,35 @@ class WaterNetworkModel(AbstractModel):
         if units is None:
             units = self._options.hydraulic.en2_units
         self._inpfile.write(filename, self, units=units)
+
+    def read_npzfile(self, filename):
+        """
+        Defines water network model components from a WNTR npz file
+
+        Parameters
+        ----------
+        filename : string
+            Name of the npz file.
+
+        """
+        wntr.network.npz.read_npzfile(filename, wn=self)
+
+    def write_npzfile(self, filename, compressed=False):
+        """
+        Writes the water network model to a WNTR npz file
+
+        The npz format stores the model components as typed arrays, which are
+        loaded without text parsing (see :mod:`wntr.network.npz`).
+
+        Parameters
+        ----------
+        filename : string
+            Name of the npz file.
+        compressed : bool (optional)
+            Compress the arrays. Default = False.
+
+        """
+        wntr.network.npz.write_npzfile(self, filename, compressed=compressed)
     
     ### #
     ### Move to morph
@@ -1679,8 +1812,8 @@ class WaterNetworkModel(AbstractModel):
             raise RuntimeError('The new link name you provided is already being used for another link.')
 
         # Get start and end node info
-        start_node = self.get_node(pipe.start_node)
-        end_node = self.get_node(pipe.end_node)
+        start_node = pipe.start_node
+        end_node = pipe.end_node
         
         # calculate the new elevation
         if isinstance(start_node, Reservoir):
@@ -1708,17 +1841,11 @@ class WaterNetworkModel(AbstractModel):
                           elevation=junction_elevation, coordinates=junction_coordinates)
         new_junction2 = self.get_node(new_junction_name_new_pipe)
 
-        # remove the original pipe from the graph (to be added back below)
-        self._graph.remove_edge(pipe.start_node, pipe.end_node, key=pipe_name_to_split)
         original_length = pipe.length
 
         if add_pipe_at_node.lower() == 'start':
-            # add original pipe back to graph between new junction and original end
-            pipe.start_node_name = new_junction_name_old_pipe
-            self._graph.add_edge(new_junction_name_old_pipe, end_node.name, key=pipe_name_to_split)
-            nx.set_edge_attributes(self._graph, name='type', values={(new_junction_name_old_pipe, 
-                                                          end_node.name,
-                                                          pipe_name_to_split):'pipe'})
+            # reconnect the original pipe between the new junction and original end
+            pipe.start_node = new_junction_name_old_pipe
             # add new pipe and change original length
             self.add_pipe(new_pipe_name, start_node.name, new_junction_name_new_pipe,
                           original_length*split_at_point, pipe.diameter, pipe.roughness,
@@ -1726,12 +1853,8 @@ class WaterNetworkModel(AbstractModel):
             pipe.length = original_length * (1-split_at_point)
 
         elif add_pipe_at_node.lower() == 'end':
-            # add original pipe back to graph between original start and new junction
-            pipe.end_node_name = new_junction_name_old_pipe            
-            self._graph.add_edge(start_node.name, new_junction_name_old_pipe, key=pipe_name_to_split)
-            nx.set_edge_attributes(self._graph, name='type', values={(start_node.name,
-                                                          new_junction_name_old_pipe,
-                                                          pipe_name_to_split):'pipe'})
+            # reconnect the original pipe between the original start and new junction
+            pipe.end_node = new_junction_name_old_pipe
             # add new pipe and change original length
             self.add_pipe(new_pipe_name, new_junction_name_new_pipe, end_node.name,
                           original_length*(1-split_at_point), pipe.diameter, pipe.roughness,
@@ -1744,7 +1867,14 @@ class WaterNetworkModel(AbstractModel):
 
 
 class PatternRegistry(Registry):
-    """A registry for patterns."""
+    """
+    A registry for patterns.
+
+    :attr:`version` is incremented when a pattern is added or removed, and
+    when a time series or demand list that looks up its patterns here is
+    changed. :meth:`~wntr.epanet.io.InpFile.write` uses it to reuse the text
+    of unchanged demand sections.
+    """
     def _finalize_(self, model):
         super(self.__class__, self)._finalize_(model)
         self._pattern_reg = None
@@ -2026,13 +2156,41 @@ class SourceRegistry(Registry):
             return
 
 
+def _check_new_names(data, names, element_type):
+    """
+    Check that a batch of element names are strings that are not used in
+    the registry data or repeated in the batch.
+    """
+    seen = set()
+    for name in names:
+        if not isinstance(name, six.string_types):
+            raise ValueError('Registry keys must be strings')
+        if name in data or name in seen:
+            raise ValueError('{} name {} is already used'.format(element_type, name))
+        seen.add(name)
+
+
 class NodeRegistry(Registry):
     """A registry for nodes."""
+    # Node types with each column attribute, see WaterNetworkModel.query_node_attribute
+    _column_types = {'elevation': [NodeType.Junction, NodeType.Tank]}
+
     def __init__(self, model):
         super(NodeRegistry, self).__init__(model)
         self._junctions = OrderedSet()
         self._reservoirs = OrderedSet()
         self._tanks = OrderedSet()
+        # Numeric node attributes, see Node._row. Base demands are not a
+        # column: a junction has a list of demands (any number, each with
+        # its own pattern and category), and a demand's base value is set on
+        # its TimeSeries object, which does not know its junction, so a base
+        # demand column could not be kept up to date.
+        self._columns = ColumnStore([('type', np.int8, -1),
+                                     ('elevation', float, np.nan)])
+        # Names of the links leaving (out) and entering (in) each node, see
+        # WaterNetworkModel.get_links_for_node
+        self._out_links = dict()
+        self._in_links = dict()
     
     def _finalize_(self, model):
         super(self.__class__, self)._finalize_(model)
@@ -2041,7 +2199,10 @@ class NodeRegistry(Registry):
     def __setitem__(self, key, value):
         if not isinstance(key, six.string_types):
             raise ValueError('Registry keys must be strings')
+        if key in self._data:
+            self._columns.unregister(self._data[key]._row, self._data[key])
         self._data[key] = value
+        self._columns.register(value._row, key)
         if isinstance(value, Junction):
             self._junctions.add(key)
         elif isinstance(value, Tank):
@@ -2059,6 +2220,9 @@ class NodeRegistry(Registry):
             elif key in self._usage:
                 self._usage.pop(key)
             node = self._data.pop(key)
+            self._columns.unregister(node._row, node)
+            self._out_links.pop(key, None)
+            self._in_links.pop(key, None)
             self._junctions.discard(key)
             self._reservoirs.discard(key)
             self._tanks.discard(key)
@@ -2073,7 +2237,47 @@ class NodeRegistry(Registry):
             return node
         except KeyError:
             return 
-    
+
+    def add_link_end(self, node_name, link_name, outlet):
+        """Add a link to the adjacency index of a node.
+
+        Parameters
+        ----------
+        node_name : str
+            Name of the node
+        link_name : str
+            Name of the link
+        outlet : bool
+            True if the node is the start node of the link, False if it is the end node
+        """
+        adjacency = self._out_links if outlet else self._in_links
+        links = adjacency.get(node_name)
+        if links is None:
+            links = adjacency[node_name] = OrderedSet()
+        links.add(link_name)
+        self._columns.version += 1
+
+    def remove_link_end(self, node_name, link_name, outlet):
+        """Remove a link from the adjacency index of a node.
+
+        Parameters
+        ----------
+        node_name : str
+            Name of the node
+        link_name : str
+            Name of the link
+        outlet : bool
+            True if the node is the start node of the link, False if it is the end node
+        """
+        adjacency = self._out_links if outlet else self._in_links
+        links = adjacency.get(node_name)
+        if links is None:
+            return
+        links.discard(link_name)
+        if len(links) < 1:
+            adjacency.pop(node_name)
+        self._columns.version += 1
+
     def __call__(self, node_type=None):
         """
         Returns a generator to iterate over all nodes of a specific node type.
@@ -2137,6 +2341,26 @@ class NodeRegistry(Registry):
         if coordinates is not None:
             junction.coordinates = coordinates
 
+    def _add_junctions(self, names, base_demands, demand_patterns, elevations,
+                       demand_category=None):
+        """
+        Adds a batch of junctions, bypassing the per-item type dispatch of
+        __setitem__ (see :meth:`WaterNetworkModel._add_junctions`).
+        """
+        data = self._data
+        junctions = self._junctions
+        columns = self._columns
+        _check_new_names(data, names, 'Node')
+        rows = []
+        for name, base_demand, demand_pattern in zip(names, base_demands, demand_patterns):
+            junction = Junction(name, self)
+            junction.add_demand(base_demand, demand_pattern, demand_category)
+            data[name] = junction
+            columns.register(junction._row, name)
+            junctions.add(name)
+            rows.append(junction._row)
+        columns.elevation[rows] = elevations
+
     def add_tank(self, name, elevation=0.0, init_level=3.048,
                  min_level=0.0, max_level=6.096, diameter=15.24,
                  min_vol=None, vol_curve=None, coordinates=None):
@@ -2295,6 +2519,11 @@ class NodeRegistry(Registry):
 class LinkRegistry(Registry):
     """A registry for links."""
     __subsets = ['_pipes', '_pumps', '_head_pumps', '_power_pumps', '_prvs', '_psvs', '_pbvs', '_tcvs', '_fcvs', '_gpvs', '_valves']
+    # Link types with each column attribute, see WaterNetworkModel.query_link_attribute
+    _column_types = {'length': [LinkType.Pipe],
+                     'diameter': [LinkType.Pipe, LinkType.Valve],
+                     'roughness': [LinkType.Pipe],
+                     'minor_loss': [LinkType.Pipe, LinkType.Valve]}
 
     def __init__(self, model):
         super(LinkRegistry, self).__init__(model)
@@ -2309,6 +2538,16 @@ class LinkRegistry(Registry):
         self._fcvs = OrderedSet()
         self._gpvs = OrderedSet()
         self._valves = OrderedSet()
+        # Numeric link attributes, see Link._row; start_node and end_node
+        # are rows of the node column store
+        self._columns = ColumnStore([('type', np.int8, -1),
+                                     ('start_node', np.int64, -1),
+                                     ('end_node', np.int64, -1),
+                                     ('length', float, np.nan),
+                                     ('diameter', float, np.nan),
+                                     ('roughness', float, np.nan),
+                                     ('minor_loss', float, np.nan),
+                                     ('initial_status', np.int8, int(LinkStatus.Open))])
     
     def _finalize_(self, model):
         super(self.__class__, self)._finalize_(model)
@@ -2317,7 +2556,10 @@ class LinkRegistry(Registry):
     def __setitem__(self, key, value):
         if not isinstance(key, six.string_types):
             raise ValueError('Registry keys must be strings')
+        if key in self._data:
+            self._columns.unregister(self._data[key]._row, self._data[key])
         self._data[key] = value
+        self._columns.register(value._row, key)
         if isinstance(value, Pipe):
             self._pipes.add(key)
         elif isinstance(value, Pump):
@@ -2351,8 +2593,11 @@ class LinkRegistry(Registry):
             elif key in self._usage:
                 self._usage.pop(key)
             link = self._data.pop(key)
+            self._columns.unregister(link._row, link)
             self._node_reg.remove_usage(link.start_node_name, (link.name, link.link_type))
             self._node_reg.remove_usage(link.end_node_name, (link.name, link.link_type))
+            self._node_reg.remove_link_end(link.start_node_name, link.name, True)
+            self._node_reg.remove_link_end(link.end_node_name, link.name, False)
             if isinstance(link, GPValve):
                 self._curve_reg.remove_usage(link.headloss_curve_name, (link.name, 'Valve'))
             if isinstance(link, Pump):
@@ -2444,6 +2689,36 @@ class LinkRegistry(Registry):
         pipe.cv = check_valve_flag
         self[name] = pipe
 
+    def _add_pipes(self, names, start_node_names, end_node_names, lengths,
+                   diameters, roughnesses, minor_losses, statuses, check_valve_flags):
+        """
+        Adds a batch of pipes, bypassing the per-item type dispatch of
+        __setitem__ (see :meth:`WaterNetworkModel._add_pipes`).
+        """
+        data = self._data
+        pipes = self._pipes
+        columns = self._columns
+        _check_new_names(data, names, 'Link')
+        nodes = self._node_reg._data
+        missing = set(start_node_names).union(end_node_names).difference(nodes)
+        if missing:
+            raise KeyError('Node {} does not exist'.format(sorted(missing)[0]))
+        rows = []
+        for name, start_node_name, end_node_name, status, check_valve_flag in zip(
+                names, start_node_names, end_node_names, statuses, check_valve_flags):
+            pipe = Pipe(name, start_node_name, end_node_name, self)
+            pipe.initial_status = status
+            pipe.status = status
+            pipe.cv = check_valve_flag
+            data[name] = pipe
+            columns.register(pipe._row, name)
+            pipes.add(name)
+            rows.append(pipe._row)
+        columns.length[rows] = lengths
+        columns.diameter[rows] = diameters
+        columns.roughness[rows] = roughnesses
+        columns.minor_loss[rows] = minor_losses
+
     def add_pump(self, name, start_node_name, end_node_name, pump_type='POWER',
                  pump_parameter=50.0, speed=1.0, pattern=None):
         """
@@ -0,0 +1,401 @@
+"""
+The wntr.network.npz module contains methods to save and load water network
+models in the WNTR binary (npz) format and to cache parsed INP files.
+
+The npz format stores junctions, demands, tanks, reservoirs, pipes, pumps,
+valves, patterns and curves as typed column arrays (in SI units), so they
+can be loaded without any text parsing. Controls, rules and the
+remaining, mostly small, INP sections (status, energy, emitters, initial
+quality, reactions, tags, vertices, labels, ...) are stored as the INP text
+written by :class:`~wntr.epanet.io.InpFile` and parsed on load. Water quality
+sources are stored as arrays and the options as JSON, so both are restored
+exactly.
+
+WNTR-only element attributes that have no INP representation (such as leaks
+and the nominal and minimum pressure of tanks) are not stored, except for
+the nominal and minimum pressure of junctions.
+
+.. rubric:: Contents
+
+.. autosummary::
+
+    write_npzfile
+    read_npzfile
+    read_inpfile_cached
+
+"""
+from __future__ import absolute_import
+
+import io
+import os
+import json
+import hashlib
+import logging
+import tempfile
+
+import numpy as np
+import six
+
+import wntr
+from wntr.network.base import LinkStatus
+from wntr.network.elements import Junction
+from wntr.network.model import WaterNetworkModel, PatternRegistry
+
+logger = logging.getLogger(__name__)
+
+_npz_format = 'wntr-npz'
+_npz_version = 1
+
+# INP sections stored as text; all other sections are stored as arrays
+_npz_inp_sections = ['[TITLE]', '[TAGS]', '[STATUS]', '[CONTROLS]', '[RULES]', '[ENERGY]',
+                     '[EMITTERS]', '[QUALITY]', '[REACTIONS]', '[MIXING]',
+                     '[TIMES]', '[REPORT]', '[OPTIONS]', '[VERTICES]', '[LABELS]']
+_option_groups = ['time', 'hydraulic', 'results', 'quality', 'energy', 'solver', 'graphics', 'user']
+
+
+def _str_array(values):
+    return np.array([six.text_type(v) for v in values], dtype=six.text_type)
+
+
+def _optional_str(value):
+    return '' if value is None else value
+
+
+def _optional_float(value):
+    return np.nan if value is None else value
+
+
+def _coordinates(nodes):
+    xy = np.full((len(nodes), 2), np.nan)
+    for i, node in enumerate(nodes):
+        if node.coordinates is not None:
+            xy[i] = node.coordinates
+    return xy
+
+
+def _ragged(lists):
+    """Concatenate a list of sequences, return (values, offsets)."""
+    offsets = np.zeros(len(lists)+1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(l) for l in lists])
+    if offsets[-1] == 0:
+        return np.zeros(0), offsets
+    return np.concatenate([np.asarray(l, dtype=float) for l in lists if len(l) > 0]), offsets
+
+
+def write_npzfile(wn, filename, compressed=False):
+    """
+    Save a water network model in the WNTR binary (npz) format.
+
+    Parameters
+    ----------
+    wn : :class:`~wntr.network.model.WaterNetworkModel`
+        Water network model
+    filename : str
+        Name of the npz file
+    compressed : bool (optional)
+        Compress the arrays (smaller file, slower to save and load). Default = False.
+    """
+    data = {'format': np.array(_npz_format),
+            'version': np.array(_npz_version),
+            'name': np.array(_optional_str(wn.name)),
+            'has_name': np.array(wn.name is not None)}
+    default_pattern = PatternRegistry.DefaultPattern
+
+    # Patterns and curves
+    patterns = [wn.get_pattern(name) for name in wn.pattern_name_list]
+    data['pattern/name'] = _str_array(wn.pattern_name_list)
+    data['pattern/wrap'] = np.array([p.wrap for p in patterns], dtype=bool)
+    data['pattern/multipliers'], data['pattern/offsets'] = _ragged([p.multipliers for p in patterns])
+    curves = [wn.get_curve(name) for name in wn.curve_name_list]
+    data['curve/name'] = _str_array(wn.curve_name_list)
+    data['curve/type'] = _str_array([_optional_str(c.curve_type) for c in curves])
+    points, data['curve/offsets'] = _ragged([c.points for c in curves])
+    data['curve/points'] = points.reshape(-1, 2)
+
+    # Nodes
+    junctions = [wn.get_node(name) for name in wn.junction_name_list]
+    data['junction/name'] = _str_array(wn.junction_name_list)
+    data['junction/elevation'] = np.array([j.elevation for j in junctions], dtype=float)
+    data['junction/nominal_pressure'] = np.array([j.nominal_pressure for j in junctions], dtype=float)
+    data['junction/minimum_pressure'] = np.array([j.minimum_pressure for j in junctions], dtype=float)
+    data['junction/coordinates'] = _coordinates(junctions)
+    demand_junction = []
+    demand_base = []
+    demand_pattern = []
+    demand_category = []
+    for i, junction in enumerate(junctions):
+        for demand in junction.demand_timeseries_list:
+            demand_junction.append(i)
+            demand_base.append(demand.base_value)
+            pattern = demand._pattern
+            if pattern is None or isinstance(pattern, default_pattern):
+                demand_pattern.append('')
+            else:
+                demand_pattern.append(str(pattern))
+            demand_category.append(demand.category)
+    data['demand/junction'] = np.array(demand_junction, dtype=np.int64)
+    data['demand/base'] = np.array(demand_base, dtype=float)
+    data['demand/pattern'] = _str_array(demand_pattern)
+    data['demand/category'] = _str_array([_optional_str(c) for c in demand_category])
+    data['demand/has_category'] = np.array([c is not None for c in demand_category], dtype=bool)
+
+    reservoirs = [wn.get_node(name) for name in wn.reservoir_name_list]
+    data['reservoir/name'] = _str_array(wn.reservoir_name_list)
+    data['reservoir/base_head'] = np.array([r.base_head for r in reservoirs], dtype=float)
+    data['reservoir/head_pattern'] = _str_array([_optional_str(r.head_pattern_name) for r in reservoirs])
+    data['reservoir/coordinates'] = _coordinates(reservoirs)
+
+    tanks = [wn.get_node(name) for name in wn.tank_name_list]
+    data['tank/name'] = _str_array(wn.tank_name_list)
+    for attr in ['elevation', 'init_level', 'min_level', 'max_level', 'diameter']:
+        data['tank/'+attr] = np.array([getattr(t, attr) for t in tanks], dtype=float)
+    data['tank/min_vol'] = np.array([_optional_float(t.min_vol) for t in tanks], dtype=float)
+    data['tank/vol_curve'] = _str_array([_optional_str(t.vol_curve_name) for t in tanks])
+    data['tank/coordinates'] = _coordinates(tanks)
+
+    # Links
+    pipes = [wn.get_link(name) for name in wn.pipe_name_list]
+    data['pipe/name'] = _str_array(wn.pipe_name_list)
+    data['pipe/start_node'] = _str_array([p.start_node_name for p in pipes])
+    data['pipe/end_node'] = _str_array([p.end_node_name for p in pipes])
+    for attr in ['length', 'diameter', 'roughness', 'minor_loss']:
+        data['pipe/'+attr] = np.array([getattr(p, attr) for p in pipes], dtype=float)
+    data['pipe/initial_status'] = np.array([int(p.initial_status) for p in pipes], dtype=np.int64)
+    data['pipe/cv'] = np.array([p.cv for p in pipes], dtype=bool)
+
+    pumps = [wn.get_link(name) for name in wn.pump_name_list]
+    data['pump/name'] = _str_array(wn.pump_name_list)
+    data['pump/start_node'] = _str_array([p.start_node_name for p in pumps])
+    data['pump/end_node'] = _str_array([p.end_node_name for p in pumps])
+    data['pump/type'] = _str_array([p.pump_type for p in pumps])
+    data['pump/power'] = np.array([p.power if p.pump_type == 'POWER' else np.nan for p in pumps],
+                                  dtype=float)
+    data['pump/curve'] = _str_array([p.pump_curve_name if p.pump_type == 'HEAD' else '' for p in pumps])
+    data['pump/speed'] = np.array([p.base_speed for p in pumps], dtype=float)
+    data['pump/speed_pattern'] = _str_array([_optional_str(p.speed_pattern_name) for p in pumps])
+    data['pump/efficiency'] = _str_array([p.efficiency.name if p.efficiency is not None else ''
+                                          for p in pumps])
+
+    valves = [wn.get_link(name) for name in wn.valve_name_list]
+    data['valve/name'] = _str_array(wn.valve_name_list)
+    data['valve/start_node'] = _str_array([v.start_node_name for v in valves])
+    data['valve/end_node'] = _str_array([v.end_node_name for v in valves])
+    data['valve/type'] = _str_array([v.valve_type for v in valves])
+    data['valve/diameter'] = np.array([v.diameter for v in valves], dtype=float)
+    data['valve/minor_loss'] = np.array([v.minor_loss for v in valves], dtype=float)
+    data['valve/setting'] = np.array([v.initial_setting if v.valve_type != 'GPV' else np.nan
+                                      for v in valves], dtype=float)
+    data['valve/curve'] = _str_array([v.headloss_curve_name if v.valve_type == 'GPV' else ''
+                                      for v in valves])
+
+    sources = [wn.get_source(name) for name in wn._sources.keys()]
+    data['source/name'] = _str_array([s.name for s in sources])
+    data['source/node'] = _str_array([s.node_name for s in sources])
+    data['source/type'] = _str_array([s.source_type for s in sources])
+    data['source/strength'] = np.array([s.strength_timeseries.base_value for s in sources], dtype=float)
+    data['source/pattern'] = _str_array([_optional_str(s.strength_timeseries.pattern_name) for s in sources])
+
+    # Controls, options and the remaining sections, as INP text. Pump efficiency
+    # curves are stored above, the INP reader would look for them in [CURVES].
+    inpfile = wntr.epanet.InpFile()
+    inpfile._set_write_units(wn, wn.options.hydraulic.en2_units)
+    buf = io.BytesIO()
+    inpfile._write_sections(buf, wn, _npz_inp_sections)
+    lines = buf.getvalue().decode('ascii').splitlines()
+    lines = [line for line in lines if not (line.startswith('PUMP ') and line.split()[2] == 'EFFIC')]
+    data['inp'] = np.array('\n'.join(lines))
+    data['options'] = np.array(json.dumps(dict((key, vars(getattr(wn.options, key)))
+                                                for key in _option_groups)))
+
+    if compressed:
+        np.savez_compressed(filename, **data)
+    else:
+        np.savez(filename, **data)
+
+
+def read_npzfile(filename, wn=None):
+    """
+    Load a water network model saved in the WNTR binary (npz) format.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the npz file
+    wn : :class:`~wntr.network.model.WaterNetworkModel` (optional)
+        Empty water network model to load the data into. If None, a new model is created.
+
+    Returns
+    -------
+    :class:`~wntr.network.model.WaterNetworkModel`
+        Water network model
+    """
+    with np.load(filename, allow_pickle=False) as npz:
+        data = dict(npz.items())
+    if data['format'].item() != _npz_format:
+        raise ValueError('{} is not a WNTR npz file'.format(filename))
+    if int(data['version']) > _npz_version:
+        raise ValueError('{} was saved in npz format version {}, this version of WNTR reads up to version {}'.format(
+                         filename, int(data['version']), _npz_version))
+    if wn is None:
+        wn = WaterNetworkModel()
+
+    _load_arrays(wn, data)
+    wn.name = data['name'].item() if data['has_name'] else None
+    return wn
+
+
+def _load_arrays(wn, data):
+    def names(key):
+        return data[key].tolist()
+
+    def optional(values):
+        return [v if v != '' else None for v in values]
+
+    def set_coordinates(node_names, xy):
+        for name, (x, y) in zip(node_names, xy.tolist()):
+            if not (np.isnan(x) or np.isnan(y)):
+                wn.get_node(name).coordinates = (x, y)
+
+    # Patterns and curves
+    offsets = data['pattern/offsets']
+    multipliers = data['pattern/multipliers']
+    for i, (name, wrap) in enumerate(zip(names('pattern/name'), data['pattern/wrap'].tolist())):
+        wn.add_pattern(name, multipliers[offsets[i]:offsets[i+1]].tolist())
+        wn.get_pattern(name).wrap = wrap
+    offsets = data['curve/offsets']
+    points = data['curve/points'].tolist()
+    for i, (name, curve_type) in enumerate(zip(names('curve/name'), optional(names('curve/type')))):
+        wn.add_curve(name, curve_type, [tuple(p) for p in points[offsets[i]:offsets[i+1]]])
+
+    # Junctions and demands
+    node_reg = wn._node_reg
+    junction_names = names('junction/name')
+    demands = [[] for name in junction_names]
+    for i, base, pattern, category, has_category in zip(data['demand/junction'].tolist(),
+                                                        data['demand/base'].tolist(),
+                                                        optional(names('demand/pattern')),
+                                                        names('demand/category'),
+                                                        data['demand/has_category'].tolist()):
+        demands[i].append((base, pattern, category if has_category else None))
+    for name, elevation, nominal_pressure, minimum_pressure, junction_demands in zip(
+            junction_names, data['junction/elevation'].tolist(), data['junction/nominal_pressure'].tolist(),
+            data['junction/minimum_pressure'].tolist(), demands):
+        junction = Junction(name, node_reg)
+        junction.elevation = elevation
+        junction.nominal_pressure = nominal_pressure
+        junction.minimum_pressure = minimum_pressure
+        for base, pattern, category in junction_demands:
+            junction.add_demand(base, pattern, category)
+        node_reg[name] = junction
+    set_coordinates(junction_names, data['junction/coordinates'])
+
+    # Reservoirs and tanks
+    reservoir_names = names('reservoir/name')
+    for name, base_head, pattern in zip(reservoir_names, data['reservoir/base_head'].tolist(),
+                                        optional(names('reservoir/head_pattern'))):
+        wn.add_reservoir(name, base_head, pattern)
+    set_coordinates(reservoir_names, data['reservoir/coordinates'])
+    tank_names = names('tank/name')
+    for values in zip(tank_names, data['tank/elevation'].tolist(), data['tank/init_level'].tolist(),
+                      data['tank/min_level'].tolist(), data['tank/max_level'].tolist(),
+                      data['tank/diameter'].tolist(), data['tank/min_vol'].tolist(),
+                      optional(names('tank/vol_curve'))):
+        values = list(values)
+        if np.isnan(values[6]):
+            values[6] = None
+        wn.add_tank(*values)
+    set_coordinates(tank_names, data['tank/coordinates'])
+
+    # Links
+    wn._add_pipes(names('pipe/name'), names('pipe/start_node'), names('pipe/end_node'),
+                  data['pipe/length'].tolist(), data['pipe/diameter'].tolist(),
+                  data['pipe/roughness'].tolist(), data['pipe/minor_loss'].tolist(),
+                  [LinkStatus(s) for s in data['pipe/initial_status'].tolist()],
+                  data['pipe/cv'].tolist())
+    for name, start_node, end_node, pump_type, power, curve, speed, pattern, efficiency in zip(
+            names('pump/name'), names('pump/start_node'), names('pump/end_node'), names('pump/type'),
+            data['pump/power'].tolist(), names('pump/curve'), data['pump/speed'].tolist(),
+            optional(names('pump/speed_pattern')), optional(names('pump/efficiency'))):
+        parameter = curve if pump_type == 'HEAD' else power
+        wn.add_pump(name, start_node, end_node, pump_type, parameter, speed, pattern)
+        if efficiency is not None:
+            wn.get_link(name).efficiency = wn.get_curve(efficiency)
+    for name, start_node, end_node, valve_type, diameter, minor_loss, setting, curve in zip(
+            names('valve/name'), names('valve/start_node'), names('valve/end_node'), names('valve/type'),
+            data['valve/diameter'].tolist(), data['valve/minor_loss'].tolist(),
+            data['valve/setting'].tolist(), names('valve/curve')):
+        if valve_type == 'GPV':
+            setting = curve
+        wn.add_valve(name, start_node, end_node, diameter, valve_type, minor_loss, setting)
+
+    for name, node_name, source_type, strength, pattern in zip(
+            names('source/name'), names('source/node'), names('source/type'),
+            data['source/strength'].tolist(), optional(names('source/pattern'))):
+        wn.add_source(name, node_name, source_type, strength, pattern)
+
+    # Options, controls and the remaining sections
+    inpfile = wntr.epanet.InpFile()
+    inpfile.wn = wn
+    inpfile._read_lines(io.StringIO(data['inp'].item()), '<npz>')
+    inpfile._read_sections(_npz_inp_sections)
+    for key, values in json.loads(data['options'].item()).items():
+        options = getattr(wn.options, key)
+        for name, value in values.items():
+            setattr(options, name, value)
+
+
+def _inp_cache_key(inp_file):
+    key = hashlib.sha256()
+    key.update('{} {} {}\n'.format(_npz_format, _npz_version, wntr.__version__).encode('ascii'))
+    with open(inp_file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            key.update(block)
+    return key.hexdigest()
+
+
+def read_inpfile_cached(inp_file, cache_dir, wn=None):
+    """
+    Read an EPANET INP file through an on-disk parse cache.
+
+    The parsed model is saved in the WNTR npz format in `cache_dir`, keyed by
+    the SHA-256 hash of the INP file contents (and the npz format and WNTR
+    versions). Later reads of an identical file load the npz file instead of
+    parsing the INP file.
+
+    Parameters
+    ----------
+    inp_file : str
+        EPANET INP file
+    cache_dir : str
+        Cache directory (created if it does not exist)
+    wn : :class:`~wntr.network.model.WaterNetworkModel` (optional)
+        Empty water network model to load the data into. If None, a new model is created.
+
+    Returns
+    -------
+    :class:`~wntr.network.model.WaterNetworkModel`
+        Water network model
+    """
+    if wn is None:
+        wn = WaterNetworkModel()
+    cache_file = os.path.join(cache_dir, _inp_cache_key(inp_file) + '.npz')
+    if os.path.isfile(cache_file):
+        logger.debug('Loading %s from the parse cache %s', inp_file, cache_file)
+        read_npzfile(cache_file, wn)
+        wn.name = inp_file
+        return wn
+
+    wn.read_inpfile(inp_file)
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        fd, tmp_file = tempfile.mkstemp(suffix='.npz', dir=cache_dir)
+        with os.fdopen(fd, 'wb') as f:
+            write_npzfile(wn, f)
+        if os.path.isfile(cache_file):
+            os.remove(tmp_file)
+        else:
+            os.rename(tmp_file, cache_file)
+    except (OSError, IOError) as e:
+        logger.warning('Could not store %s in the parse cache: %s', inp_file, e)
+    return wn
@@ -6,4 +6,5 @@ from wntr.sim.core import WaterNetworkSimulator, WNTRSimulator
 from wntr.sim.results import NetResults
 from wntr.sim.solvers import NewtonSolver
 from wntr.sim.hydraulics import HydraulicModel
-from wntr.sim.epanet import EpanetSimulator
\ No newline at end of file
+from wntr.sim.epanet import EpanetSimulator, run_parallel
+from wntr.sim.profiling import PhaseProfiler
\ No newline at end of file
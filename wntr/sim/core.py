@@ -3,6 +3,7 @@ from wntr.sim.hydraulics import *
 from wntr.network.model import *
 from wntr.sim.solvers import *
 from wntr.sim.results import *
+from wntr.sim.profiling import PhaseProfiler, null_profiler
 from wntr.network.model import *
 from wntr.network.controls import ControlManager, _ControlType
 import numpy as np
@@ -118,6 +119,7 @@ class WNTRSimulator(WaterNetworkSimulator):
         self._time_per_step = []
         self._solver = None
         self._model = None
+        self.profiler = None
 
     def _get_time(self):
         s = int(self._wn.sim_time)
@@ -128,7 +130,7 @@ class WNTRSimulator(WaterNetworkSimulator):
         s = int(s)
         return str(h)+':'+str(m)+':'+str(s)
 
-    def run_sim(self, solver_options={}, convergence_error=True):
+    def run_sim(self, solver_options={}, convergence_error=True, profile=False, warm_start=None):
         """
         Run an extended period simulation (hydraulics only).
 
@@ -149,6 +151,24 @@ class WNTRSimulator(WaterNetworkSimulator):
             simulation does not converge. If convergence_error is False,
             a warning will be issued and results.error_code will be set to 2
             if the simulation does not converge.  Default = True.
+
+        profile: bool (optional)
+            If profile is True, the time spent in each phase of the simulation
+            (controls, internal graph updates, network inputs, Jacobian
+            assembly, linear solves, line searches and result saving) is
+            recorded in a :class:`~wntr.sim.profiling.PhaseProfiler` stored
+            as sim.profiler. Default = False.
+
+        warm_start: NetResults (optional)
+            Results from a previous simulation of the same network (for
+            example, from the EpanetSimulator or read from an EPANET
+            hydraulics file with :class:`~wntr.epanet.io.HydFile`). At each
+            timestep, the head, demand and flowrate from the latest time in
+            warm_start at or before the simulation time are used as the
+            starting point of the Newton solver instead of the solution of
+            the previous timestep. Nodes and links missing from warm_start
+            keep the previous solution. The solution itself is not changed,
+            only the number of iterations needed to find it. Default = None.
         """
         logger_level = logger.getEffectiveLevel()
 
@@ -156,6 +176,13 @@ class WNTRSimulator(WaterNetworkSimulator):
             logger.log(1, 'beginning of run_sim')
 
         self._time_per_step = []
+        self._iters_per_step = []
+        if profile:
+            self.profiler = PhaseProfiler()
+            prof = self.profiler
+        else:
+            self.profiler = None
+            prof = null_profiler
 
         self._presolve_controls = ControlManager()
         self._postsolve_controls = ControlManager()
@@ -193,6 +220,7 @@ class WNTRSimulator(WaterNetworkSimulator):
         model.initialize_results_dict()
 
         self._solver = NewtonSolver(model.num_nodes, model.num_links, model.num_leaks, model, options=solver_options)
+        self._solver.profiler = self.profiler
 
         results = NetResults()
         results.error_code = 0
@@ -211,6 +239,8 @@ class WNTRSimulator(WaterNetworkSimulator):
         leak_demand0 = model.initialize_leak_demand()
 
         X_init = np.concatenate((head0, demand0, flow0, leak_demand0))
+        if warm_start is not None:
+            warm_times, warm_X = self._get_warm_start_values(warm_start)
 
         self._initialize_internal_graph()
 
@@ -259,6 +289,7 @@ class WNTRSimulator(WaterNetworkSimulator):
                     """
                     self._model.update_tank_heads()
                 trial = 0
+                t0 = prof.tic()
 
                 # check which presolve controls need to be activated before the next hydraulic timestep
                 presolve_controls_to_run = self._presolve_controls.check()
@@ -375,7 +406,10 @@ class WNTRSimulator(WaterNetworkSimulator):
                             if logger_level <= 1:
                                 logger.log(1, 'no changes made by rules at rule timestep {0}'.format((rule_iter - 1) * self._wn.options.time.rule_timestep))
                             self._wn.sim_time = old_time
+                prof.record('controls', t0, self._wn.sim_time)
+                t0 = prof.tic()
                 self._update_internal_graph()
+                prof.record('internal_graph', t0, self._wn.sim_time)
                 if logger_level <= logging.DEBUG:
                     logger.debug('changes made by rules: ')
                     for obj, attr in self._rules.get_changes():
@@ -389,6 +423,7 @@ class WNTRSimulator(WaterNetworkSimulator):
             logger.info('simulation time = %s, trial = %d', self._get_time(), trial)
 
             # Prepare for solve
+            t0 = prof.tic()
             if logger_level <= logging.DEBUG:
                 logger.debug('checking for isolated junctions and links')
             isolated_junctions, isolated_links = self._get_isolated_junctions_and_links()
@@ -399,10 +434,20 @@ class WNTRSimulator(WaterNetworkSimulator):
                 else:
                     logger.debug('no isolated junctions or links found')
             model.set_isolated_junctions_and_links(isolated_junctions, isolated_links)
+            prof.record('internal_graph', t0, self._wn.sim_time)
             if not first_step and not resolve:
                 model.update_tank_heads()
+            t0 = prof.tic()
             model.set_network_inputs_by_id()
+            prof.record('network_inputs', t0, self._wn.sim_time)
+            t0 = prof.tic()
             model.set_jacobian_constants()
+            prof.record('jacobian_constants', t0, self._wn.sim_time)
+
+            if warm_start is not None and not resolve:
+                i = np.searchsorted(warm_times, self._wn.sim_time, side='right') - 1
+                if i >= 0:
+                    X_init = np.where(np.isnan(warm_X[i]), X_init, warm_X[i])
 
             # Solve
             if logger_level <= logging.DEBUG:
@@ -417,12 +462,16 @@ class WNTRSimulator(WaterNetworkSimulator):
                 model.get_results(results)
                 results.error_code = 2
                 return results
+            self._iters_per_step.append(num_iters)
             X_init = np.array(self._X)
 
             # Enter results in network and update previous inputs
             if logger_level <= logging.DEBUG:
                 logger.debug('storing results in network')
+            t0 = prof.tic()
             model.store_results_in_network(self._X)
+            prof.record('save_results', t0, self._wn.sim_time)
+            t0 = prof.tic()
 
             if logger_level <= logging.DEBUG:
                 logger.debug('checking postsolve controls')
@@ -433,13 +482,16 @@ class WNTRSimulator(WaterNetworkSimulator):
                 if logger_level <= 1:
                     logger.log(1, '\tactivating control {0}'.format(control))
                 control.run_control_action()
+            prof.record('controls', t0, self._wn.sim_time)
             if self._postsolve_controls.changes_made():
                 if logger_level <= logging.DEBUG:
                     logger.debug('postsolve controls made changes:')
                     for obj, attr in self._postsolve_controls.get_changes():
                         logger.debug('\t{0}.{1} changed to {2}'.format(obj, attr, getattr(obj, attr)))
                 resolve = True
+                t0 = prof.tic()
                 self._update_internal_graph()
+                prof.record('internal_graph', t0, self._wn.sim_time)
                 self._postsolve_controls.reset()
                 trial += 1
                 if trial > max_trials:
@@ -456,6 +508,7 @@ class WNTRSimulator(WaterNetworkSimulator):
             logger.debug('no changes made by postsolve controls; moving to next timestep')
 
             resolve = False
+            t0 = prof.tic()
             if type(self._wn.options.time.report_timestep) == float or type(self._wn.options.time.report_timestep) == int:
                 if self._wn.sim_time % self._wn.options.time.report_timestep == 0:
                     model.save_results(self._X, results)
@@ -468,6 +521,7 @@ class WNTRSimulator(WaterNetworkSimulator):
                     raise RuntimeError('Simulation already solved this timestep')
                 results.time.append(int(self._wn.sim_time))
             model.update_network_previous_values()
+            prof.record('save_results', t0, self._wn.sim_time)
             first_step = False
             self._wn.sim_time += self._wn.options.time.hydraulic_timestep
             overstep = float(self._wn.sim_time) % self._wn.options.time.hydraulic_timestep
@@ -481,6 +535,35 @@ class WNTRSimulator(WaterNetworkSimulator):
         model.get_results(results)
         return results
 
+    def _get_warm_start_values(self, warm_start):
+        """
+        Arrange the head, demand and flowrate in warm_start in the order of
+        the solution vector (leak demands are NaN).
+
+        Returns
+        -------
+        times: numpy array
+            Times in warm_start
+        X: numpy array
+            Values with shape (len(times), len(X)), NaN where warm_start has no value
+        """
+        model = self._model
+        num_nodes = model.num_nodes
+        num_links = model.num_links
+        times = np.asarray(warm_start.node.major_axis, dtype=float)
+        X = np.full((len(times), 2*num_nodes + num_links + model.num_leaks), np.nan)
+
+        node_names = [name for name in warm_start.node.minor_axis if name in model._node_name_to_id]
+        node_ids = np.array([model._node_name_to_id[name] for name in node_names], dtype=int)
+        if len(node_ids) > 0:
+            X[:, node_ids] = warm_start.node['head'].loc[:, node_names].values
+            X[:, num_nodes + node_ids] = warm_start.node['demand'].loc[:, node_names].values
+        link_names = [name for name in warm_start.link.minor_axis if name in model._link_name_to_id]
+        link_ids = np.array([model._link_name_to_id[name] for name in link_names], dtype=int)
+        if len(link_ids) > 0:
+            X[:, 2*num_nodes + link_ids] = warm_start.link['flowrate'].loc[:, link_names].values
+        return times, X
+
     def _initialize_internal_graph(self):
         n_links = {}
         rows = []
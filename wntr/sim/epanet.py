@@ -1,5 +1,15 @@
 from wntr.sim.core import WaterNetworkSimulator
+from wntr.sim.results import NetResults
 import wntr.epanet.io
+from wntr.epanet.util import EN, FlowUnits, MassUnits, QualType, HydParam, QualParam, to_si
+import numpy as np
+import pandas as pd
+import multiprocessing
+import hashlib
+import tempfile
+import threading
+import shutil
+import os
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,6 +22,8 @@ except ImportError as e:
     raise ImportError('Error importing epanet toolkit while running epanet simulator. '
                       'Make sure libepanet is installed and added to path.')
 
+_toolkit_lock = threading.RLock()
+"""The EPANET 2.0 library keeps global state; only one thread can use it at a time"""
 
 
 class EpanetSimulator(WaterNetworkSimulator):
@@ -22,7 +34,9 @@ class EpanetSimulator(WaterNetworkSimulator):
     binary output file. Multiple water quality simulations are still possible
     using the WQ keyword in the run_sim function. Hydraulics will be stored and
     saved to a file. This file will not be deleted by default, nor will any
-    binary files be deleted.
+    binary files be deleted, unless the simulation is run in a scratch
+    directory (``run_sim(file_prefix=None)``). Use :func:`~run_parallel` to
+    run many simulations in parallel worker processes.
 
     The reason this is considered a "fast" simulator is due to the fact that there
     is no looping within Python. The "ENsolveH" and "ENsolveQ" toolkit
@@ -52,7 +66,8 @@ class EpanetSimulator(WaterNetworkSimulator):
         if self.reader is None:
             self.reader = wntr.epanet.io.BinFile(result_types=result_types)
 
-    def run_sim(self, file_prefix='temp', save_hyd=False, use_hyd=False, hydfile=None):
+    def run_sim(self, file_prefix='temp', save_hyd=False, use_hyd=False, hydfile=None,
+                stepwise=False, hyd_cache=None):
         """
         Run the EPANET simulator.
 
@@ -61,39 +76,445 @@ class EpanetSimulator(WaterNetworkSimulator):
 
         Parameters
         ----------
-        file_prefix : str
-            Default prefix is "temp". All files (.inp, .bin/.out, .hyd, .rpt) use this prefix
+        file_prefix : str or None
+            Default prefix is "temp". All files (.inp, .bin/.out, .hyd, .rpt) use this prefix.
+            If None, the files are written to a new scratch directory which is
+            removed when the run is complete (specify `hydfile` to keep saved
+            hydraulics). Use None to run simulations concurrently.
         use_hyd : bool
             Will load hydraulics from ``file_prefix + '.hyd'`` or from file specified in `hydfile_name`
         save_hyd : bool
             Will save hydraulics to ``file_prefix + '.hyd'`` or to file specified in `hydfile_name`
         hydfile : str
             Optionally specify a filename for the hydraulics file other than the `file_prefix`
+        stepwise : bool
+            If True, step through the simulation with the toolkit functions
+            (ENrunH/ENnextH and ENrunQ/ENnextQ) and pull the results at each
+            report time directly from EPANET memory. No .rpt or .bin file is
+            written and the reader is not used. See :func:`~run_stepwise` for
+            the differences with the binary output file. Default is False.
+        hyd_cache : str
+            Optionally specify a directory used as a hydraulics cache. The
+            hydraulically relevant sections of the INP file are hashed (see
+            :func:`~hydraulics_key`). If a hydraulics file with that key is in
+            the directory, it is used instead of solving the hydraulics;
+            otherwise the hydraulics are solved and saved there. This overrides
+            `use_hyd`, `save_hyd` and `hydfile`.
 
         """
-        inpfile = file_prefix + '.inp'
-        self._wn.write_inpfile(inpfile, units=self._wn.options.hydraulic.en2_units)
-        enData = wntr.epanet.toolkit.ENepanet()
-        rptfile = file_prefix + '.rpt'
-        outfile = file_prefix + '.bin'
-        if hydfile is None:
-            hydfile = file_prefix + '.hyd'
-        enData.ENopen(inpfile, rptfile, outfile)
+        scratch_dir = None
+        if file_prefix is None:
+            scratch_dir = tempfile.mkdtemp(prefix='wntr_')
+            file_prefix = os.path.join(scratch_dir, 'temp')
+        cache_file = None
+        try:
+            inpfile = file_prefix + '.inp'
+            self._wn.write_inpfile(inpfile, units=self._wn.options.hydraulic.en2_units)
+            if hydfile is None:
+                hydfile = file_prefix + '.hyd'
+            if hyd_cache is not None:
+                if not os.path.isdir(hyd_cache):
+                    os.makedirs(hyd_cache)
+                hydfile = os.path.join(hyd_cache, hydraulics_key(inpfile) + '.hyd')
+                use_hyd = os.path.isfile(hydfile)
+                save_hyd = not use_hyd
+                if save_hyd:
+                    # save under a unique temporary name so that concurrent runs
+                    # (threads or processes) never see a partially written
+                    # hydraulics file
+                    cache_file = hydfile
+                    fd, hydfile = tempfile.mkstemp(dir=hyd_cache, prefix=os.path.basename(cache_file) + '.',
+                                                   suffix='.tmp')
+                    os.close(fd)
+                logger.debug('Hydraulics cache %s: %s', 'hit' if use_hyd else 'miss', hydfile)
+            if stepwise:
+                data = run_stepwise(inpfile, save_hyd=save_hyd, use_hyd=use_hyd, hydfile=hydfile,
+                                    mass_units=self._wn.options.quality.wq_units)
+                if cache_file is not None:
+                    _move_to_cache(hydfile, cache_file)
+                return stepwise_results(data)
+            rptfile = file_prefix + '.rpt'
+            outfile = file_prefix + '.bin'
+            with _toolkit_lock:
+                enData = wntr.epanet.toolkit.ENepanet()
+                enData.ENopen(inpfile, rptfile, outfile)
+                if use_hyd:
+                    enData.ENusehydfile(hydfile)
+                    logger.debug('Loaded hydraulics')
+                else:
+                    enData.ENsolveH()
+                    logger.debug('Solved hydraulics')
+                if save_hyd:
+                    enData.ENsavehydfile(hydfile)
+                    logger.debug('Saved hydraulics')
+                enData.ENsolveQ()
+                logger.debug('Solved quality')
+                enData.ENreport()
+                logger.debug('Ran quality')
+                enData.ENclose()
+                logger.debug('Completed run')
+            if cache_file is not None:
+                _move_to_cache(hydfile, cache_file)
+            #os.sys.stderr.write('Finished Closing\n')
+            return self.reader.read(outfile)
+        finally:
+            if cache_file is not None and os.path.isfile(hydfile):
+                # the run failed before the file was moved to the cache
+                os.remove(hydfile)
+            if scratch_dir is not None:
+                shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+# INP file sections and [OPTIONS]/[TIMES] keywords that do not change the hydraulics
+_nonhydraulic_sections = set(['[TITLE]', '[TAGS]', '[ENERGY]', '[QUALITY]', '[SOURCES]',
+                              '[REACTIONS]', '[MIXING]', '[REPORT]', '[COORDINATES]',
+                              '[VERTICES]', '[LABELS]', '[BACKDROP]'])
+_nonhydraulic_options = ('QUALITY', 'DIFFUSIVITY', 'TOLERANCE', 'HYDRAULICS', 'MAP',
+                         'STATISTIC')
+
+
+def hydraulics_key(inpfile):
+    """
+    Compute a key that identifies the hydraulics of an EPANET INP file.
+
+    The key is the SHA-256 hash of the INP file with the sections and options
+    that do not affect the hydraulics removed: title, tags, energy, water
+    quality (quality, sources, reactions, mixing, the quality options, the
+    quality timestep and patterns only used by sources), report options and
+    map data. Two INP files with the same key produce the same hydraulics file.
+
+    Parameters
+    ----------
+    inpfile : str
+        EPANET INP file
+
+    Returns
+    -------
+    str
+        Hexadecimal key
+    """
+    lines = []
+    section = None
+    with open(inpfile, 'rb') as fin:
+        for line in fin:
+            line = line.decode('utf-8', 'replace').split(';', 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith('['):
+                section = line.upper()
+            lines.append((section, line))
+
+    # Patterns referenced by sources, but not by any hydraulic section
+    source_patterns = set(line.split()[3] for section, line in lines
+                          if section == '[SOURCES]' and len(line.split()) > 3)
+    hydraulic_tokens = set(['1'])
+    for section, line in lines:
+        if section not in _nonhydraulic_sections and section not in ['[PATTERNS]', '[CURVES]']:
+            hydraulic_tokens.update(line.split())
+    skip_patterns = source_patterns - hydraulic_tokens
+
+    key = hashlib.sha256()
+    for section, line in lines:
+        if section in _nonhydraulic_sections and not line.startswith('['):
+            continue
+        elif section in ['[OPTIONS]', '[TIMES]'] and line.upper().startswith(_nonhydraulic_options):
+            continue
+        elif section == '[PATTERNS]' and line.split()[0] in skip_patterns:
+            continue
+        key.update(line.encode('utf-8'))
+        key.update(b'\n')
+    return key.hexdigest()
+
+
+def _move_to_cache(hydfile, cache_file):
+    try:
+        if os.path.isfile(cache_file):
+            os.remove(hydfile)
+        else:
+            os.rename(hydfile, cache_file)
+    except OSError as e:
+        logger.warning('Could not store hydraulics file in cache: %s', e)
+
+
+_node_hyd_params = [('demand', EN.DEMAND), ('head', EN.HEAD), ('pressure', EN.PRESSURE)]
+_link_hyd_params = [('flowrate', EN.FLOW), ('velocity', EN.VELOCITY), ('headloss', EN.HEADLOSS),
+                    ('status', EN.STATUS), ('setting', EN.SETTING)]
+_node_params = set(['demand', 'head', 'pressure', 'quality'])
+
+
+def run_stepwise(inpfile, save_hyd=False, use_hyd=False, hydfile=None, mass_units='mg/L'):
+    """
+    Step through an EPANET simulation and collect the results in NumPy arrays.
+
+    The hydraulics are run with ENopenH/ENinitH/ENrunH/ENnextH and, if a
+    water quality analysis is specified in the INP file (or `use_hyd` is True),
+    the quality with ENopenQ/ENinitQ/ENrunQ/ENnextQ. Node and link values are
+    pulled at each report time with the bulk toolkit getters. The
+    report is sent to the null device and no binary output file is written.
+
+    Values are returned in the EPANET units of the INP file; use
+    :func:`~stepwise_results` to build a results object in SI units.
+    Compared to reading the binary output file:
+
+    * headloss for pipes is computed per 1000 units of length from the
+      toolkit total headloss
+    * status is 0 (closed) or 1 (open); the toolkit does not report the
+      active state of valves
+    * reaction rate and friction factor are not available
+    * the report statistic option is ignored; all report times are returned
+
+    Parameters
+    ----------
+    inpfile : str
+        EPANET INP file
+    save_hyd : bool
+        Save the hydraulics to `hydfile`
+    use_hyd : bool
+        Use the hydraulics in `hydfile` instead of solving them
+    hydfile : str
+        Hydraulics file name, required if `save_hyd` or `use_hyd` is True
+    mass_units : str
+        Water quality concentration units (mg/L or ug/L)
+
+    Returns
+    -------
+    dict
+        Dictionary with the node and link names, types, report times, flow
+        units, quality type and the result arrays, each of shape
+        (number of report times, number of nodes or links)
+
+    """
+    with _toolkit_lock:
+        return _run_stepwise(inpfile, save_hyd, use_hyd, hydfile, mass_units)
+
+
+def _run_stepwise(inpfile, save_hyd, use_hyd, hydfile, mass_units):
+    enData = wntr.epanet.toolkit.ENepanet()
+    enData.ENopen(inpfile, os.devnull, '')
+    try:
+        nnodes = enData.ENgetcount(EN.NODECOUNT)
+        nlinks = enData.ENgetcount(EN.LINKCOUNT)
+        duration = enData.ENgettimeparam(EN.DURATION)
+        report_step = enData.ENgettimeparam(EN.REPORTSTEP)
+        report_start = enData.ENgettimeparam(EN.REPORTSTART)
+        qual_code, trace_node = enData.ENgetqualtype()
+        report_times = np.arange(report_start, duration+1, report_step)
+        nperiods = len(report_times)
+
+        data = {}
+        data['flow_units'] = FlowUnits(enData.ENgetflowunits())
+        data['quality_type'] = QualType(qual_code)
+        data['mass_units'] = mass_units
+        data['report_times'] = report_times
+        data['node_names'] = [enData.ENgetnodeid(i) for i in range(1, nnodes+1)]
+        data['link_names'] = [enData.ENgetlinkid(i) for i in range(1, nlinks+1)]
+        data['node_type'] = np.array([enData.ENgetnodetype(i) for i in range(1, nnodes+1)])
+        data['link_type'] = np.array([enData.ENgetlinktype(i) for i in range(1, nlinks+1)])
+        data['link_length'] = enData.get_link_values(EN.LENGTH)
+        link_nodes = np.array([enData.ENgetlinknodes(i) for i in range(1, nlinks+1)], dtype=int)
+        data['link_start'] = link_nodes[:, 0]
+        data['link_end'] = link_nodes[:, 1]
+        if data['quality_type'] is QualType.Trace:
+            data['trace_node'] = data['node_names'][trace_node-1]
+        else:
+            data['trace_node'] = None
+
+        for name, code in _node_hyd_params + [('quality', EN.QUALITY)]:
+            data[name] = np.zeros((nperiods, nnodes))
+        for name, code in _link_hyd_params + [('linkquality', EN.LINKQUAL)]:
+            data[name] = np.zeros((nperiods, nlinks))
+
+        def capture(period, params):
+            for name, code in params:
+                if name in _node_params:
+                    enData.get_node_values(code, out=data[name][period])
+                else:
+                    enData.get_link_values(code, out=data[name][period])
+
+        hyd_params = _node_hyd_params + _link_hyd_params
+        qual_params = [('quality', EN.QUALITY), ('linkquality', EN.LINKQUAL)]
+        run_quality = use_hyd or data['quality_type'] is not QualType.none
+
         if use_hyd:
             enData.ENusehydfile(hydfile)
             logger.debug('Loaded hydraulics')
         else:
-            enData.ENsolveH()
+            enData.ENopenH()
+            enData.ENinitH(1 if (run_quality or save_hyd) else 0)
+            period = 0
+            while True:
+                t = enData.ENrunH()
+                if period < nperiods and t >= report_times[period]:
+                    capture(period, hyd_params)
+                    period += 1
+                if enData.ENnextH() <= 0:
+                    break
+            enData.ENcloseH()
             logger.debug('Solved hydraulics')
         if save_hyd:
             enData.ENsavehydfile(hydfile)
             logger.debug('Saved hydraulics')
-        enData.ENsolveQ()
-        logger.debug('Solved quality')
-        enData.ENreport()
-        logger.debug('Ran quality')
+
+        if run_quality:
+            if use_hyd:
+                qual_params = hyd_params + qual_params
+            enData.ENopenQ()
+            enData.ENinitQ(0)
+            period = 0
+            while True:
+                t = enData.ENrunQ()
+                if period < nperiods and t >= report_times[period]:
+                    capture(period, qual_params)
+                    period += 1
+                if enData.ENnextQ() <= 0:
+                    break
+            enData.ENcloseQ()
+            logger.debug('Solved quality')
+
+        # Convert total headloss to headloss per 1000 units of length for pipes
+        pipes = data['link_type'] <= EN.PIPE
+        headloss = data['headloss']
+        headloss[:, pipes] = 1000.0 * headloss[:, pipes] / data['link_length'][pipes]
+    finally:
         enData.ENclose()
-        logger.debug('Completed run')
-        #os.sys.stderr.write('Finished Closing\n')
-        return self.reader.read(outfile)
+    return data
+
+
+def stepwise_results(data):
+    """
+    Create a results object from the arrays returned by :func:`~run_stepwise`.
+
+    Parameters
+    ----------
+    data : dict
+        Output of :func:`~run_stepwise`
+
+    Returns
+    -------
+    :class:`~wntr.sim.results.NetResults`
+        Results in SI units, with the same node and link result types as
+        :class:`~wntr.epanet.io.BinFile` except for reaction rate and
+        friction factor
+
+    """
+    flow_units = data['flow_units']
+    quality_type = data['quality_type']
+    mass_units = MassUnits[data['mass_units'].split('/', 1)[0]]
+    times = data['report_times']
+    node_names = data['node_names']
+    link_names = data['link_names']
+    link_type = data['link_type']
 
+    results = NetResults()
+    results.time = times
+    node = {}
+    link = {}
+    node['demand'] = HydParam.Demand._to_si(flow_units, data['demand'])
+    node['head'] = HydParam.HydraulicHead._to_si(flow_units, data['head'])
+    node['pressure'] = HydParam.Pressure._to_si(flow_units, data['pressure'])
+    if quality_type is QualType.Chem:
+        node['quality'] = QualParam.Concentration._to_si(flow_units, data['quality'], mass_units=mass_units)
+        link['linkquality'] = QualParam.Concentration._to_si(flow_units, data['linkquality'], mass_units=mass_units)
+    elif quality_type is QualType.Age:
+        node['quality'] = QualParam.WaterAge._to_si(flow_units, data['quality'])
+        link['linkquality'] = QualParam.WaterAge._to_si(flow_units, data['linkquality'])
+    else:
+        node['quality'] = data['quality']
+        link['linkquality'] = data['linkquality']
+    link['flowrate'] = HydParam.Flow._to_si(flow_units, data['flowrate'])
+    link['velocity'] = HydParam.Velocity._to_si(flow_units, data['velocity'])
+    link['headloss'] = data['headloss']  # Unit is per 1000
+    link['status'] = data['status']
+    settings = np.array(data['setting'])
+    for valve_type, param in [(EN.PRV, HydParam.Pressure), (EN.PSV, HydParam.Pressure),
+                              (EN.PBV, HydParam.Pressure), (EN.FCV, HydParam.Flow)]:
+        mask = link_type == valve_type
+        settings[:, mask] = to_si(flow_units, settings[:, mask], param)
+    link['setting'] = settings
+
+    results.node = pd.Panel.from_dict(dict((key, pd.DataFrame(values, index=times, columns=node_names))
+                                           for key, values in node.items()))
+    results.link = pd.Panel.from_dict(dict((key, pd.DataFrame(values, index=times, columns=link_names))
+                                           for key, values in link.items()))
+
+    if quality_type is QualType.Age:
+        results.meta['quality_mode'] = 'AGE'
+        results.meta['quality_units'] = 's'
+    elif quality_type is QualType.Trace:
+        results.meta['quality_mode'] = 'TRACE'
+        results.meta['quality_units'] = '%'
+        results.meta['quality_trace'] = data['trace_node']
+    elif quality_type is QualType.Chem:
+        results.meta['quality_mode'] = 'CHEMICAL'
+        results.meta['quality_units'] = data['mass_units']
+    node_types = np.array(['Junction', 'Reservoir', 'Tank'])[data['node_type']]
+    link_types = np.array(['Pipe'] * len(link_names), dtype=object)
+    link_types[link_type == EN.PUMP] = 'Pump'
+    link_types[link_type > EN.PUMP] = 'Valve'
+    link_subtypes = np.array(link_types)
+    for code, subtype in [(EN.CVPIPE, 'CV'), (EN.PRV, 'PRV'), (EN.PSV, 'PSV'), (EN.PBV, 'PBV'),
+                          (EN.FCV, 'FCV'), (EN.TCV, 'TCV'), (EN.GPV, 'GPV')]:
+        link_subtypes[link_type == code] = subtype
+    names = np.array(node_names, dtype=str)
+    results.meta['report_times'] = times
+    results.meta['node_names'] = names
+    results.meta['link_names'] = np.array(link_names, dtype=str)
+    results.meta['node_type'] = pd.Series(data=node_types, index=node_names)
+    results.meta['link_type'] = pd.Series(data=link_types, index=link_names)
+    results.meta['link_subtype'] = pd.Series(data=link_subtypes, index=link_names)
+    results.meta['link_length'] = pd.Series(data=data['link_length'], index=link_names)
+    results.meta['link_start'] = pd.Series(data=names[data['link_start']-1], index=link_names)
+    results.meta['link_end'] = pd.Series(data=names[data['link_end']-1], index=link_names)
+    return results
+
+
+def _pool_initializer():
+    wntr.epanet.toolkit.load_library()
+
+
+def _pool_worker(wn):
+    scratch_dir = tempfile.mkdtemp(prefix='wntr_')
+    try:
+        inpfile = os.path.join(scratch_dir, 'temp.inp')
+        wn.write_inpfile(inpfile, units=wn.options.hydraulic.en2_units)
+        return run_stepwise(inpfile, mass_units=wn.options.quality.wq_units)
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def run_parallel(models, processes=None, results=False):
+    """
+    Run EPANET simulations of several water network models in parallel.
+
+    Each model is simulated in a worker process (with the EPANET library
+    loaded once per worker) using the stepwise EPANET mode, see
+    :func:`~run_stepwise`. Every run uses its own scratch directory, which is
+    removed when the run is complete.
+
+    Parameters
+    ----------
+    models : iterable of WaterNetworkModel
+        Water network models to simulate
+    processes : int, optional
+        Number of worker processes, defaults to the number of CPUs
+    results : bool, optional
+        If True, convert the output of each run to a
+        :class:`~wntr.sim.results.NetResults` object (in the calling process).
+        Default is False.
+
+    Returns
+    -------
+    list
+        One dictionary of NumPy arrays (see :func:`~run_stepwise`) or one
+        NetResults object per model, in the order of `models`
+
+    """
+    pool = multiprocessing.Pool(processes=processes, initializer=_pool_initializer)
+    try:
+        output = pool.map(_pool_worker, models, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+    if results:
+        output = [stepwise_results(data) for data in output]
+    return output
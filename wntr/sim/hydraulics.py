@@ -343,6 +343,20 @@ class HydraulicModel(object):
         self.pump_line_params = {} # {pump_id: (q_bar, h_bar)} h = pump_m*(q-q_bar)+h_bar
         self.pump_powers = {}
 
+        # Pipe coefficients are computed from the link column store arrays
+        link_columns = self._wn._link_columns
+        pipe_names, rows = link_columns.rows([LinkType.Pipe])
+        pipe_ids = np.array([self._link_name_to_id[name] for name in pipe_names], dtype=int)
+        roughness = link_columns.roughness[rows]
+        diameter = link_columns.diameter[rows]
+        length = link_columns.length[rows]
+        minor_loss = link_columns.minor_loss[rows]
+        self.pipe_resistance_coefficients[pipe_ids] = (self._Hw_k*(roughness**(-1.852)) *
+                                                       (diameter**(-4.871))*length)  # Hazen-Williams
+        self.pipe_minor_loss_coefficients[pipe_ids] = 8.0*minor_loss/(self._g*math.pi**2*diameter**4)
+        self.pipe_diameters.update(zip(pipe_ids.tolist(), diameter.tolist()))
+        pipe_ids = set(pipe_ids.tolist())
+
         for link_name, link in self._wn.links():
             link_id = self._link_name_to_id[link_name]
             start_node_name = link.start_node_name
@@ -351,12 +365,10 @@ class HydraulicModel(object):
             end_node_id = self._node_name_to_id[end_node_name]
             self.link_start_nodes[link_id] = start_node_id
             self.link_end_nodes[link_id] = end_node_id
-            if link_id in self._pipe_ids:
-                self.pipe_resistance_coefficients[link_id] = (self._Hw_k*(link.roughness**(-1.852)) *
-                                                              (link.diameter**(-4.871))*link.length)  # Hazen-Williams
-                self.pipe_minor_loss_coefficients[link_id] = 8.0*link.minor_loss/(self._g*math.pi**2*link.diameter**4)
-                self.pipe_diameters[link_id] = link.diameter
-            elif link_id in self._valve_ids:
+            if link_id in pipe_ids:
+                # pipe coefficients are set above
+                continue
+            if link_id in self._valve_ids:
                 """
                 There is a discrepancy between Epanet and the Epanet Manual on how open valves are treated. The manual
                 states: Open valves are assigned an r-value by assuming the open valve acts as a smooth pipe (f = 0.02)
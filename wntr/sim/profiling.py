@@ -0,0 +1,142 @@
+"""
+Per-phase timers used to profile a WNTRSimulator run.
+"""
+from timeit import default_timer
+import json
+
+import numpy as np
+import pandas as pd
+
+
+class PhaseProfiler(object):
+    """
+    Collects wall-clock timings for the individual phases of a simulation.
+
+    A profiler is created by :meth:`WNTRSimulator.run_sim` when
+    ``profile=True`` and is available afterwards as ``sim.profiler``.
+    Each recorded event stores the phase name, start time, duration and the
+    simulation time at which the phase ran.
+
+    The phases recorded by the WNTRSimulator are:
+
+    * controls: checking and activating presolve controls, rules and postsolve controls
+    * internal_graph: updating the internal graph and detecting isolated junctions and links
+    * network_inputs: ``HydraulicModel.set_network_inputs_by_id``
+    * jacobian_constants: ``HydraulicModel.set_jacobian_constants``, before each solve
+    * residual: evaluation of the hydraulic equations outside of the line search
+    * jacobian: Jacobian assembly in each Newton iteration
+    * linear_solve: sparse linear solve of the Newton step
+    * line_search: backtracking line search
+    * save_results: storing results in the network and in the results object
+    """
+
+    def __init__(self):
+        self._origin = default_timer()
+        self.events = []
+
+    @staticmethod
+    def tic():
+        """
+        Return the current timer value, to be passed to :meth:`record`.
+        """
+        return default_timer()
+
+    def record(self, phase, start, sim_time=None):
+        """
+        Record an event for phase which started at start (from :meth:`tic`).
+
+        Parameters
+        ----------
+        phase : string
+            Name of the phase
+        start : float
+            Timer value returned by :meth:`tic` when the phase started
+        sim_time : float (optional)
+            Simulation time (in seconds) at which the phase ran
+        """
+        end = default_timer()
+        self.events.append((phase, start - self._origin, end - start, sim_time))
+
+    def reset(self):
+        """
+        Remove all recorded events.
+        """
+        self._origin = default_timer()
+        self.events = []
+
+    def summary(self):
+        """
+        Summarize the recorded events by phase.
+
+        Returns
+        -------
+        pandas DataFrame
+            Indexed by phase with columns calls, total, mean and max (in
+            seconds), sorted by total time.
+        """
+        columns = ['calls', 'total', 'mean', 'max']
+        if len(self.events) == 0:
+            return pd.DataFrame(columns=columns)
+        phases = [e[0] for e in self.events]
+        durations = np.array([e[2] for e in self.events])
+        df = pd.DataFrame({'phase': phases, 'duration': durations})
+        grouped = df.groupby('phase')['duration']
+        summary = pd.DataFrame({'calls': grouped.count(),
+                                'total': grouped.sum(),
+                                'mean': grouped.mean(),
+                                'max': grouped.max()}, columns=columns)
+        return summary.sort_values('total', ascending=False)
+
+    def to_chrome_trace(self, filename=None):
+        """
+        Export the recorded events in the Chrome trace event format.
+
+        The output can be loaded in chrome://tracing or any viewer that
+        supports the trace event format.
+
+        Parameters
+        ----------
+        filename : string (optional)
+            If given, the trace is written to this file as JSON
+
+        Returns
+        -------
+        dict
+            Trace events, in the form ``{'traceEvents': [...]}``
+        """
+        trace_events = []
+        for phase, start, duration, sim_time in self.events:
+            event = {'name': phase,
+                     'ph': 'X',
+                     'ts': start * 1e6,
+                     'dur': duration * 1e6,
+                     'pid': 0,
+                     'tid': 0}
+            if sim_time is not None:
+                event['args'] = {'sim_time': sim_time}
+            trace_events.append(event)
+        trace = {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+        if filename is not None:
+            with open(filename, 'w') as f:
+                json.dump(trace, f)
+        return trace
+
+
+class NullProfiler(object):
+    """
+    A profiler that records nothing.
+
+    The simulators use it when profiling is disabled, so that the phases are
+    timed without checking whether profiling is enabled.
+    """
+
+    @staticmethod
+    def tic():
+        return 0.0
+
+    @staticmethod
+    def record(phase, start, sim_time=None):
+        pass
+
+
+null_profiler = NullProfiler()
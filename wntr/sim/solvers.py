@@ -2,6 +2,7 @@ import numpy as np
 import scipy.sparse as sp
 import warnings
 import logging
+from wntr.sim.profiling import null_profiler
 
 warnings.filterwarnings("error",'Matrix is exactly singular',sp.linalg.MatrixRankWarning)
 np.set_printoptions(precision=3, threshold=10000, linewidth=300)
@@ -19,6 +20,7 @@ class NewtonSolver(object):
         self.num_links = num_links
         self.num_leaks = num_leaks
         self.model = model
+        self.profiler = None
 
         if 'MAXITER' not in self._options:
             self.maxiter = 100
@@ -54,6 +56,9 @@ class NewtonSolver(object):
     def solve(self, Residual, Jacobian, x0):
 
         x = np.array(x0)
+        prof = self.profiler
+        if prof is None:
+            prof = null_profiler
 
         use_r_ = False
 
@@ -63,8 +68,10 @@ class NewtonSolver(object):
                 r = r_
                 r_norm = new_norm
             else:
+                t0 = prof.tic()
                 r = Residual(x)
                 r_norm = np.max(abs(r))
+                prof.record('residual', t0)
 
             # if iter<self.bt_start_iter:
             #    logger.debug('iter: {0:<4d} norm: {1:<10.2e}'.format(iter, r_norm))
@@ -72,7 +79,10 @@ class NewtonSolver(object):
             if r_norm < self.tol:
                 return [x, iter, 1]
 
+            t0 = prof.tic()
             J = Jacobian(x).tocsr()
+            prof.record('jacobian', t0)
+            t0 = prof.tic()
 
             # Call Linear solver
             try:
@@ -80,11 +90,13 @@ class NewtonSolver(object):
             except sp.linalg.MatrixRankWarning:
                 logger.warning('Jacobian is singular.')
                 return [x, iter, 0]
+            prof.record('linear_solve', t0)
 
             # Backtracking
             alpha = 1.0
             if self.bt and iter>=self.bt_start_iter:
                 use_r_ = True
+                t0 = prof.tic()
                 for iter_bt in range(self.bt_maxiter):
                     x_ = x + alpha*d
                     r_ = Residual(x_)
@@ -94,6 +106,7 @@ class NewtonSolver(object):
                         break
                     else:
                         alpha = alpha*self.rho
+                prof.record('line_search', t0)
 
                 if iter_bt+1 >= self.bt_maxiter:
                     logger.debug('Backtracking failed.')
@@ -1,6 +1,9 @@
 import unittest
 import nose
+import shutil
+import tempfile
 from os.path import abspath, dirname, join
+from pandas.util.testing import assert_frame_equal
 
 testdir = dirname(abspath(str(__file__)))
 test_datadir = join(testdir, 'networks_for_testing')
@@ -15,12 +18,14 @@ class TestWriter(unittest.TestCase):
 
         inp_file = join(test_datadir, 'io.inp')
         self.wn = self.wntr.network.WaterNetworkModel(inp_file)
-        self.wn.write_inpfile('_io_copy.inp', 'GPM')
-        self.wn2 = self.wntr.network.WaterNetworkModel('_io_copy.inp')
+        self.tempdir = tempfile.mkdtemp()
+        copy_file = join(self.tempdir, 'io_copy.inp')
+        self.wn.write_inpfile(copy_file, 'GPM')
+        self.wn2 = self.wntr.network.WaterNetworkModel(copy_file)
 
     @classmethod
     def tearDownClass(self):
-        pass
+        shutil.rmtree(self.tempdir)
 
     def test_all(self):
         """FIXME: waternetworkmodel._compare"""
@@ -146,6 +151,87 @@ class TestInpFileWriter(unittest.TestCase):
         options2 = self.wn2.options
         self.assertEqual(options1 == options2, True)
 
+class TestInpFileWriterCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        import wntr
+        self.wntr = wntr
+        self.inp_file = join(ex_datadir, 'Net3.inp')
+
+    @classmethod
+    def tearDownClass(self):
+        pass
+
+    def _write(self, inpfile, wn, units='GPM'):
+        import io
+        f = io.BytesIO()
+        inpfile.write(f, wn, units=units)
+        # drop the creation time in the header
+        return [line for line in f.getvalue().splitlines() if not line.startswith(b'; Created')]
+
+    def test_unchanged(self):
+        wn = self.wntr.network.WaterNetworkModel(self.inp_file)
+        inpfile = self.wntr.epanet.InpFile()
+        text = self._write(inpfile, wn)
+        self.assertIn('[PIPES]', inpfile._section_cache)
+        self.assertListEqual(text, self._write(inpfile, wn))
+        self.assertListEqual(text, self._write(self.wntr.epanet.InpFile(), wn))
+
+    def test_changed(self):
+        wn = self.wntr.network.WaterNetworkModel(self.inp_file)
+        inpfile = self.wntr.epanet.InpFile()
+        text = self._write(inpfile, wn)
+        wn.get_node('10').elevation += 1.0
+        wn.get_node('15').coordinates = (1.0, 2.0)
+        wn.get_link('20').diameter *= 2
+        wn.get_link('40').tag = 'TAG'
+        wn.get_node('35').demand_timeseries_list[0].base_value *= 3
+        text2 = self._write(inpfile, wn)
+        self.assertNotEqual(text, text2)
+        self.assertListEqual(text2, self._write(self.wntr.epanet.InpFile(), wn))
+        # units are part of the cache key
+        self.assertListEqual(self._write(inpfile, wn, units='LPS'),
+                             self._write(self.wntr.epanet.InpFile(), wn, units='LPS'))
+
+    def test_changed_in_place(self):
+        wn = self.wntr.network.WaterNetworkModel(self.inp_file)
+        inpfile = self.wntr.epanet.InpFile()
+        text = self._write(inpfile, wn)
+        wn.get_link('20').vertices.append((1.0, 2.0))
+        wn.get_link('40').cv = True
+        wn.get_node('35').demand_timeseries_list.append((0.01, '1', 'extra'))
+        wn.get_node('10').demand_timeseries_list[0].pattern_name = '2'
+        text2 = self._write(inpfile, wn)
+        self.assertNotEqual(text, text2)
+        self.assertListEqual(text2, self._write(self.wntr.epanet.InpFile(), wn))
+        # a different model with the same versions is not mistaken for wn
+        wn2 = self.wntr.network.WaterNetworkModel(self.inp_file)
+        self.assertListEqual(self._write(inpfile, wn2), text)
+
+    def test_unchanged_skips_elements(self):
+        wn = self.wntr.network.WaterNetworkModel(self.inp_file)
+        inpfile = self.wntr.epanet.InpFile()
+        text = self._write(inpfile, wn)
+        def fail(wn):
+            raise AssertionError('records were built for an unchanged section')
+        for name in ['_junction_records', '_pipe_records', '_demand_records',
+                     '_coordinate_records', '_vertex_records', '_tag_records']:
+            setattr(inpfile, name, fail)
+        self.assertListEqual(text, self._write(inpfile, wn))
+
+    def test_write_inpfile_buffer(self):
+        import io
+        wn = self.wntr.network.WaterNetworkModel(self.inp_file)
+        f = io.BytesIO()
+        wn.write_inpfile(f)
+        wn2 = self.wntr.network.WaterNetworkModel()
+        inpfile = self.wntr.epanet.InpFile()
+        inpfile.wn = wn2
+        inpfile._read_lines(io.StringIO(f.getvalue().decode('ascii')), '<buffer>')
+        inpfile._read_sections()
+        self.assertTrue(wn._compare(wn2))
+
 class TestNet3InpWriterResults(unittest.TestCase):
 
     @classmethod
@@ -201,22 +287,152 @@ class TestNet3InpUnitsResults(unittest.TestCase):
         self.wn = self.wntr.network.WaterNetworkModel(inp_file)
 
         sim = self.wntr.sim.EpanetSimulator(self.wn)
-        self.results = sim.run_sim()
+        self.results = sim.run_sim(file_prefix=None)
 
-        self.wn.write_inpfile('tmp_units.inp', units='CMH')
-        self.wn2 = self.wntr.network.WaterNetworkModel('tmp_units.inp')
+        self.tempdir = tempfile.mkdtemp()
+        inp_file = join(self.tempdir, 'units.inp')
+        self.wn.write_inpfile(inp_file, units='CMH')
+        self.wn2 = self.wntr.network.WaterNetworkModel(inp_file)
 
         sim = self.wntr.sim.EpanetSimulator(self.wn2)
-        self.results2 = sim.run_sim()
+        self.results2 = sim.run_sim(file_prefix=None)
 
     @classmethod
     def tearDownClass(self):
-        pass
+        shutil.rmtree(self.tempdir)
 
     def test_link_flowrate_units_convert(self):
         for link_name, link in self.wn.links():
             for t in self.results2.time:
                 self.assertLessEqual(abs(self.results2.link['flowrate'].loc[t,link_name] - self.results.link['flowrate'].loc[t,link_name]), 0.00001)
 
+
+
+class TestBinFileReader(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        import wntr
+        self.wntr = wntr
+        inp_file = join(ex_datadir, 'Net3.inp')
+        self.wn = wntr.network.WaterNetworkModel(inp_file)
+        self.wn.options.time.duration = 24*3600
+        self.wn.options.quality.mode = 'AGE'
+        self.tempdir = tempfile.mkdtemp()
+        sim = wntr.sim.EpanetSimulator(self.wn)
+        file_prefix = join(self.tempdir, 'temp')
+        self.results = sim.run_sim(file_prefix=file_prefix)
+        self.binfile = file_prefix + '.bin'
+
+    @classmethod
+    def tearDownClass(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_result_types(self):
+        ResultType = self.wntr.epanet.util.ResultType
+        reader = self.wntr.epanet.io.BinFile(result_types=[ResultType.pressure, ResultType.quality,
+                                                           ResultType.flowrate])
+        results = reader.read(self.binfile)
+        self.assertListEqual(sorted(results.node.items), ['pressure', 'quality'])
+        self.assertListEqual(list(results.link.items), ['flowrate'])
+        self.assertTrue((results.node['pressure'] == self.results.node['pressure']).all().all())
+        self.assertTrue((results.node['quality'] == self.results.node['quality']).all().all())
+        self.assertTrue((results.link['flowrate'] == self.results.link['flowrate']).all().all())
+
+    def test_elements_and_times(self):
+        ResultType = self.wntr.epanet.util.ResultType
+        reader = self.wntr.epanet.io.BinFile(result_types=[ResultType.pressure, ResultType.setting])
+        nodes = ['159', '10', 'River']
+        links = ['335', '10']
+        results = reader.read(self.binfile, nodes=nodes, links=links,
+                              start_time=3600, end_time=6*3600)
+        pressure = results.node['pressure']
+        self.assertListEqual(list(pressure.columns), nodes)
+        self.assertListEqual(list(pressure.index), list(range(3600, 6*3600+1, 900)))
+        self.assertListEqual(list(results.time), list(pressure.index))
+        expected = self.results.node['pressure'].loc[3600:6*3600, nodes]
+        self.assertTrue((pressure == expected).all().all())
+        expected = self.results.link['setting'].loc[3600:6*3600, links]
+        self.assertTrue((results.link['setting'] == expected).all().all())
+        self.assertRaises(KeyError, reader.read, self.binfile, nodes=['not a node'])
+
+    def test_iter_periods(self):
+        import numpy as np
+        reader = self.wntr.epanet.io.BinFile()
+        times = []
+        for time, node_block, link_block in reader.iter_periods(self.binfile):
+            times.append(time)
+            self.assertEqual(node_block.shape, (4, len(reader.node_names)))
+            self.assertEqual(link_block.shape, (8, len(reader.link_names)))
+            self.assertFalse(node_block.flags.owndata)
+        self.assertListEqual(times, list(self.results.time))
+        # the last period, converted to SI units
+        pressure = self.wntr.epanet.util.HydParam.Pressure._to_si(reader.flow_units, node_block[2])
+        self.assertTrue(np.allclose(pressure, self.results.node['pressure'].iloc[-1].values))
+
+    def test_custom_handlers(self):
+        reader = self.wntr.epanet.io.BinFile()
+        results = reader.read(self.binfile, custom_handlers=True)
+        for key in ['demand', 'head', 'pressure', 'quality']:
+            self.assertTrue((results.node[key] == self.results.node[key]).all().all())
+        for key in ['flowrate', 'velocity', 'linkquality']:
+            self.assertTrue((results.link[key] == self.results.link[key]).all().all())
+
+
+class TestHydFileReader(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        import wntr
+        self.wntr = wntr
+        inp_file = join(ex_datadir, 'Net3.inp')
+        self.wn = wntr.network.WaterNetworkModel(inp_file)
+        self.wn.options.time.duration = 24*3600
+        self.tempdir = tempfile.mkdtemp()
+        sim = wntr.sim.EpanetSimulator(self.wn)
+        file_prefix = join(self.tempdir, 'temp')
+        self.results = sim.run_sim(file_prefix=file_prefix, save_hyd=True)
+        self.reader = wntr.epanet.io.HydFile(self.wn)
+        self.hyd_results = self.reader.read(file_prefix + '.hyd')
+
+    @classmethod
+    def tearDownClass(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_header(self):
+        self.assertEqual(self.reader.num_nodes, self.wn.num_nodes)
+        self.assertEqual(self.reader.num_links, self.wn.num_links)
+        self.assertEqual(self.reader.num_tanks, self.wn.num_tanks + self.wn.num_reservoirs)
+        self.assertEqual(self.reader.duration, 24*3600)
+        self.assertEqual(len(self.reader.hydraulic_steps), len(self.hyd_results.time))
+
+    def test_results(self):
+        times = self.results.node.major_axis
+        # hydraulic timesteps include intermediate times caused by controls and tank events
+        self.assertTrue(set(times).issubset(set(self.hyd_results.time)))
+        for key in ['demand', 'head']:
+            hyd = self.hyd_results.node[key].loc[times, self.results.node.minor_axis]
+            assert_frame_equal(hyd, self.results.node[key], check_dtype=False, check_less_precise=True)
+        for key in ['flowrate', 'setting', 'status']:
+            hyd = self.hyd_results.link[key].loc[times, self.results.link.minor_axis]
+            assert_frame_equal(hyd, self.results.link[key], check_dtype=False, check_less_precise=True)
+
+    def test_warm_start(self):
+        wn = self.wntr.network.WaterNetworkModel(join(ex_datadir, 'Net3.inp'))
+        wn.options.time.duration = 24*3600
+        sim = self.wntr.sim.WNTRSimulator(wn)
+        results = sim.run_sim()
+        iterations = sum(sim._iters_per_step)
+
+        wn = self.wntr.network.WaterNetworkModel(join(ex_datadir, 'Net3.inp'))
+        wn.options.time.duration = 24*3600
+        sim = self.wntr.sim.WNTRSimulator(wn)
+        warm_results = sim.run_sim(warm_start=self.hyd_results)
+        self.assertLess(sum(sim._iters_per_step), iterations)
+        # both runs converge to the same solution, within the solver tolerance
+        self.assertLess(abs(warm_results.node['pressure'] - results.node['pressure']).max().max(), 1e-4)
+        self.assertLess(abs(warm_results.link['flowrate'] - results.link['flowrate']).max().max(), 1e-5)
+
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
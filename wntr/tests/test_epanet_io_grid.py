@@ -0,0 +1,91 @@
+import unittest
+import sys
+import shutil
+import tempfile
+from os.path import abspath, dirname, join
+
+testdir = dirname(abspath(str(__file__)))
+benchmarks_dir = join(testdir,'..','..','benchmarks')
+
+# size of the synthetic grid network
+num_x = 60
+num_y = 50
+
+
+class TestGridInp(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        sys.path.append(benchmarks_dir)
+        from inp_file_benchmark import write_grid_inp
+        import wntr
+        self.wntr = wntr
+        self.tempdir = tempfile.mkdtemp()
+        self.inp_file = join(self.tempdir, 'grid.inp')
+        write_grid_inp(self.inp_file, num_x, num_y)
+        self.wn = wntr.network.WaterNetworkModel(self.inp_file)
+
+    @classmethod
+    def tearDownClass(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_counts(self):
+        self.assertEqual(self.wn.num_junctions, num_x*num_y)
+        self.assertEqual(self.wn.num_reservoirs, 1)
+        self.assertEqual(self.wn.num_pipes, 1 + (num_x-1)*num_y + num_x*(num_y-1))
+        self.assertListEqual(self.wn._check_valves, ['P0'])
+        self.assertEqual(len(self.wn.get_links_for_node('J1_1')), 4)
+
+    def test_values(self):
+        junction = self.wn.get_node('J3_4')
+        self.assertAlmostEqual(junction.elevation, 107*0.3048)
+        self.assertAlmostEqual(junction.demand_timeseries_list[0].base_value, 2*6.30901964e-05)
+        self.assertEqual(junction.demand_timeseries_list[0].pattern_name, '1')
+        self.assertEqual(junction.coordinates, (300.0, 400.0))
+        pipe = self.wn.get_link('PV2_5')
+        self.assertAlmostEqual(pipe.length, 102*0.3048)
+        self.assertAlmostEqual(pipe.diameter, 6*0.0254)
+        self.assertEqual(pipe.roughness, 120)
+        self.assertEqual(pipe.status, self.wntr.network.LinkStatus.Open)
+        self.assertTrue(self.wn.get_link('P0').cv)
+
+    def test_write_read(self):
+        inp_file = join(self.tempdir, 'grid_rewrite.inp')
+        self.wn.write_inpfile(inp_file)
+        wn2 = self.wntr.network.WaterNetworkModel(inp_file)
+        self.assertTrue(self.wn._compare(wn2))
+
+    def test_duplicate_names(self):
+        inp_file = join(self.tempdir, 'duplicate.inp')
+        with open(inp_file, 'w') as f:
+            f.write('[JUNCTIONS]\n J1\t10\t1\n J2\t10\t1\n J1\t20\t1\n\n'
+                    '[RESERVOIRS]\n R1\t100\n\n'
+                    '[PIPES]\n P1\tR1\tJ1\t100\t12\t100\t0\tOpen\n\n[OPTIONS]\n Units\tGPM\n\n[END]\n')
+        self.assertRaises(ValueError, self.wntr.network.WaterNetworkModel, inp_file)
+
+        with open(inp_file, 'w') as f:
+            f.write('[JUNCTIONS]\n J1\t10\t1\n J2\t10\t1\n\n'
+                    '[RESERVOIRS]\n R1\t100\n\n'
+                    '[PIPES]\n P1\tR1\tJ1\t100\t12\t100\t0\tOpen\n'
+                    ' P1\tJ1\tJ2\t100\t12\t100\t0\tOpen\n\n[OPTIONS]\n Units\tGPM\n\n[END]\n')
+        self.assertRaises(ValueError, self.wntr.network.WaterNetworkModel, inp_file)
+
+    def test_unknown_node(self):
+        inp_file = join(self.tempdir, 'unknown_node.inp')
+        with open(inp_file, 'w') as f:
+            f.write('[JUNCTIONS]\n J1\t10\t1\n\n'
+                    '[RESERVOIRS]\n R1\t100\n\n'
+                    '[PIPES]\n P1\tR1\tJ1\t100\t12\t100\t0\tOpen\n'
+                    ' P2\tJ1\tJ9\t100\t12\t100\t0\tOpen\n\n[OPTIONS]\n Units\tGPM\n\n[END]\n')
+        self.assertRaises(KeyError, self.wntr.network.WaterNetworkModel, inp_file)
+
+        wn = self.wntr.network.WaterNetworkModel()
+        wn.add_junction('J1')
+        self.assertRaises(KeyError, wn._add_pipes, ['P1'], ['J1'], ['J9'], [100.0], [0.3],
+                          [100.0], [0.0], [self.wntr.network.LinkStatus.Open], [False])
+        self.assertEqual(wn.num_links, 0)
+        self.assertEqual(wn._node_reg.get_usage('J1'), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
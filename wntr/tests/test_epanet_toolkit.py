@@ -1,5 +1,6 @@
 from nose.tools import *
 import wntr.epanet.toolkit
+import numpy as np
 from os.path import abspath, dirname, join
 
 testdir = dirname(abspath(__file__))
@@ -21,3 +22,40 @@ def test_ENgetcount():
     nLinks = enData.ENgetcount(wntr.epanet.util.EN.LINKCOUNT)
     assert_equal(13, nLinks)
 
+
+def test_ENgetnodeid_linkid():
+    enData = wntr.epanet.toolkit.ENepanet()
+    enData.inpfile = join(datadir,'Net1.inp')
+    enData.ENopen(enData.inpfile,'tmp.rpt')
+    assert_equal('10', enData.ENgetnodeid(1))
+    assert_equal(1, enData.ENgetnodeindex(enData.ENgetnodeid(1)))
+    assert_equal('10', enData.ENgetlinkid(1))
+    assert_equal(wntr.epanet.util.EN.PIPE, enData.ENgetlinktype(1))
+    assert_equal(wntr.epanet.util.EN.TANK, enData.ENgetnodetype(enData.ENgetnodeindex('2')))
+    assert_equal((enData.ENgetnodeindex('10'), enData.ENgetnodeindex('11')), enData.ENgetlinknodes(1))
+    assert_equal(24*3600, enData.ENgettimeparam(wntr.epanet.util.EN.DURATION))
+    assert_equal(wntr.epanet.util.EN.CHEM, enData.ENgetqualtype()[0])
+
+def test_library_loaded_once():
+    enData1 = wntr.epanet.toolkit.ENepanet()
+    enData2 = wntr.epanet.toolkit.ENepanet()
+    assert_true(enData1.ENlib is enData2.ENlib)
+    assert_true(enData1.ENlib is wntr.epanet.toolkit.load_library())
+
+def test_get_node_link_values():
+    EN = wntr.epanet.util.EN
+    enData = wntr.epanet.toolkit.ENepanet()
+    enData.inpfile = join(datadir,'Net1.inp')
+    enData.ENopen(enData.inpfile,'tmp.rpt')
+    enData.ENopenH()
+    enData.ENinitH(0)
+    enData.ENrunH()
+    heads = enData.get_node_values(EN.HEAD)
+    assert_equal(11, len(heads))
+    for i in range(11):
+        assert_equal(enData.ENgetnodevalue(i+1, EN.HEAD), heads[i])
+    flows = np.zeros(13)
+    enData.get_link_values(EN.FLOW, out=flows)
+    for i in range(13):
+        assert_equal(enData.ENgetlinkvalue(i+1, EN.FLOW), flows[i])
+    enData.ENcloseH()
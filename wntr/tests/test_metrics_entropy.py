@@ -98,6 +98,26 @@ def test_layout8():
     error = abs((Shat - expected_Shat)/expected_Shat)
     assert_less(error, 0.05) # 5% error
 
+def test_path_counts():
+    from wntr.metrics.hydraulic import _DagPathCounts, _link_paths_enumerated
+    inp_file = join(datadir,'Awumah_layout8.inp')
+    wn = wntr.network.WaterNetworkModel(inp_file)
+    G = wn.get_graph()
+    G.add_edge('2', '3', key='parallel', type='Pipe') # parallel link
+    sources = ['1']
+
+    counts = _DagPathCounts(G, sources)
+    for nodej in G.nodes():
+        if nodej in sources:
+            continue
+        expected = _link_paths_enumerated(G, sources, nodej)
+        paths = counts.link_paths(nodej)
+        assert_equal(len(paths), len(expected))
+        for (nodei, NDij, aij), (ei, eND, ea) in zip(paths, expected):
+            assert_equal(nodei, ei)
+            assert_almost_equal(NDij, eND)
+            assert_almost_equal(aij, ea)
+
 if __name__ == '__main__':
     test_layout1()
     test_layout8()
@@ -0,0 +1,50 @@
+from nose.tools import *
+import numpy as np
+import pandas as pd
+import wntr
+
+def _scenarios():
+    # three scenarios of demand and quality results, 4 times and 3 nodes,
+    # node 'c' has no expected demand
+    rng = np.random.RandomState(42)
+    times = [0, 3600, 7200, 10800]
+    nodes = ['a', 'b', 'c']
+    expected = np.array([[1.0, 2.0, 0.0]]*4)
+    panels = []
+    for i in range(3):
+        demand = expected*rng.uniform(0.5, 1.0, size=expected.shape)
+        quality = rng.uniform(0, 1, size=expected.shape)
+        panels.append(pd.Panel({'expected_demand': pd.DataFrame(expected, index=times, columns=nodes),
+                                'demand': pd.DataFrame(demand, index=times, columns=nodes),
+                                'quality': pd.DataFrame(quality, index=times, columns=nodes)}))
+    ensemble = dict((attribute, np.stack([panel[attribute].values for panel in panels]))
+                    for attribute in ['expected_demand', 'demand', 'quality'])
+    return panels, ensemble
+
+def test_fdv_fdd_fdq_scenarios():
+    panels, ensemble = _scenarios()
+    for average_times in [False, True]:
+        for average_nodes in [False, True]:
+            FDV = wntr.metrics.fdv(ensemble, average_times, average_nodes)
+            FDD = wntr.metrics.fdd(ensemble, 0.8, average_times, average_nodes)
+            FDQ = wntr.metrics.fdq(ensemble, 0.5, average_times, average_nodes)
+            assert_equal(FDV.shape[0], 3)
+            for k, panel in enumerate(panels):
+                expected = np.asarray(wntr.metrics.fdv(panel, average_times, average_nodes))
+                assert_less(np.abs(FDV[k] - expected).max(), 1e-12)
+                expected = np.asarray(wntr.metrics.fdd(panel, 0.8, average_times, average_nodes))
+                assert_true(np.array_equal(FDD[k], expected))
+                expected = np.asarray(wntr.metrics.fdq(panel, 0.5, average_times, average_nodes))
+                assert_true(np.array_equal(FDQ[k], expected))
+
+    # nodes with no expected demand have FDV = 1
+    FDV = wntr.metrics.fdv(ensemble)
+    assert_true((FDV[:, :, 2] == 1).all())
+
+def test_fdv_float32():
+    panels, ensemble = _scenarios()
+    FDV = wntr.metrics.fdv(ensemble, average_times=True, dtype=np.float32)
+    assert_equal(FDV.dtype, np.float32)
+    assert_less(np.abs(FDV - wntr.metrics.fdv(ensemble, average_times=True)).max(), 1e-6)
+    FDV = wntr.metrics.fdv(ensemble, dtype=np.float32)
+    assert_equal(FDV.dtype, np.float32)
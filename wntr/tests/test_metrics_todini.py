@@ -29,7 +29,7 @@ def test_Todini_Fig2_optCost_GPM():
     wn = wntr.network.WaterNetworkModel(inp_file)
 
     sim = wntr.sim.EpanetSimulator(wn)
-    results = sim.run_sim()
+    results = sim.run_sim(file_prefix=None)
 
     # Compute todini index
     todini = wntr.metrics.todini(results.node, results.link, wn, 30) # h* = 30 m
@@ -50,7 +50,7 @@ def test_Todini_Fig2_optCost_CMH():
     wn = parser.read(inp_file)
 
     sim = wntr.sim.EpanetSimulator(wn)
-    results = sim.run_sim()
+    results = sim.run_sim(file_prefix=None)
 
     # Compute todini index
     todini = wntr.metrics.todini(results.node, results.link, wn, 30) # h* = 30 m
@@ -71,7 +71,7 @@ def test_Todini_Fig2_solA_GPM():
     wn = parser.read(inp_file)
 
     sim = wntr.sim.EpanetSimulator(wn)
-    results = sim.run_sim(file_prefix='tmp_tod_solA_GPM')
+    results = sim.run_sim(file_prefix=None)
 
     # Compute todini index
     todini = wntr.metrics.todini(results.node, results.link, wn, 30) # h* = 30 m
@@ -91,7 +91,7 @@ def test_Todini_Fig2_solA_CMH():
     wn = parser.read(inp_file)
 
     sim = wntr.sim.EpanetSimulator(wn)
-    results = sim.run_sim()
+    results = sim.run_sim(file_prefix=None)
 
     # Compute todini index
     todini = wntr.metrics.todini(results.node, results.link, wn, 30) # h* = 30 m
@@ -113,7 +113,7 @@ def test_Net6():
     wn = parser.read(inp_file)
 
     sim = wntr.sim.EpanetSimulator(wn)
-    results = sim.run_sim()
+    results = sim.run_sim(file_prefix=None)
 
     # Compute todini index
     todini = wntr.metrics.todini(results.node, results.link, wn, 21.1)
@@ -140,5 +140,36 @@ def test_Net6():
     error = abs((Tmin - expected_Tmin)/expected_Tmin)
     assert_less(error, 0.1) # 10% error
 
+def test_todini_scenarios():
+    inp_file = join(net6dir,'Net3.inp')
+    wn = wntr.network.WaterNetworkModel(inp_file)
+    wn.options.time.duration = 24*3600
+
+    sim = wntr.sim.EpanetSimulator(wn)
+    results = sim.run_sim(file_prefix=None)
+    todini = wntr.metrics.todini(results.node, results.link, wn, 21.1)
+
+    # the same results, with more head at the reservoirs
+    node2 = results.node.copy()
+    head2 = node2['head'].copy()
+    head2.loc[:, wn.reservoir_name_list] += 10
+    node2['head'] = head2
+    todini2 = wntr.metrics.todini(node2, results.link, wn, 21.1)
+
+    # both scenarios stacked, with the nodes in reverse order
+    nodes = list(results.node.minor_axis)[::-1]
+    node_results = {'node_names': nodes}
+    for attribute in ['head', 'pressure', 'demand']:
+        node_results[attribute] = np.stack([results.node[attribute].loc[:, nodes].values,
+                                            node2[attribute].loc[:, nodes].values])
+    link_results = {'link_names': list(results.link.minor_axis),
+                    'flowrate': np.stack([results.link['flowrate'].values]*2)}
+    T = wntr.metrics.todini(node_results, link_results, wn, 21.1)
+
+    assert_equal(T.shape, (2, len(todini)))
+    assert_less(np.abs(T[0] - todini.values).max(), 1e-12)
+    assert_less(np.abs(T[1] - todini2.values).max(), 1e-12)
+    assert_greater(np.abs(T[1] - T[0]).max(), 1e-3)
+
 if __name__ == '__main__':
     test_BWSN_Network_2()
@@ -8,6 +8,7 @@ import networkx as nx
 
 testdir = dirname(abspath(str(__file__)))
 datadir = join(testdir,'networks_for_testing')
+ex_datadir = join(testdir,'..','..','examples','networks')
 
 def test_central_point_dominance():
     """
@@ -35,6 +36,21 @@ def test_central_point_dominance():
     assert_equal(wn.num_links,41)
     assert_equal(wn.num_nodes,22)
 
+def test_central_point_dominance_sampled():
+    inp_file = join(ex_datadir,'Net3.inp')
+    wn = wntr.network.WaterNetworkModel(inp_file)
+    G = wn.get_graph()
+
+    bet_cen = np.array(list(nx.betweenness_centrality(G.to_undirected()).values()))
+    expected = sum(max(bet_cen) - bet_cen)/(len(bet_cen)-1)
+    assert_almost_equal(G.central_point_dominance(), expected, 12)
+    assert_almost_equal(G.central_point_dominance(k=wn.num_nodes), expected, 12)
+
+    CPD = G.central_point_dominance(k=50, seed=1)
+    assert_equal(CPD, G.central_point_dominance(k=50, seed=1))
+    assert_almost_equal(CPD, G.central_point_dominance(k=50, seed=1, processes=2), 12)
+    assert_less(abs(CPD-expected), 0.1)
+
 def test_diameter():
     """
     Pandit, Arka, and John C. Crittenden. "Index of network resilience
@@ -99,6 +115,20 @@ def test_algebraic_connectivity():
     error = abs(0.56-AC)
     assert_less(error, 0.01)
 
+def test_spectral_metrics_dense():
+    # The sparse eigenvalue solvers agree with the full dense spectrum
+    inp_file = join(ex_datadir,'Net3.inp')
+    wn = wntr.network.WaterNetworkModel(inp_file)
+    G = wn.get_graph()
+    udG = G.to_undirected()
+
+    eig = np.sort(nx.laplacian_spectrum(udG))
+    assert_almost_equal(G.algebraic_connectivity(), eig[1], 10)
+    assert_almost_equal(G.algebraic_connectivity(), 0.007950965053532176, 10)
+
+    eig = np.sort(nx.adjacency_spectrum(udG).real)[::-1]
+    assert_almost_equal(G.spectral_gap(), eig[0]-eig[1], 10)
+
 def test_crit_ratio_defrag():
     """
     Pandit, Arka, and John C. Crittenden. "Index of network resilience
@@ -440,6 +440,35 @@ class TestNetworkMethods(unittest.TestCase):
         self.assertEqual(l4,['p5'])
         self.assertEqual(l5,[])
 
+    def test_get_links_for_node_updates(self):
+        wn = self.wntr.network.WaterNetworkModel()
+        wn.add_junction('j1')
+        wn.add_junction('j2')
+        wn.add_junction('j3')
+        wn.add_pipe('p1','j1','j2')
+        wn.add_pipe('p2','j2','j3')
+        wn.add_pattern('pat1', [1])
+        wn.add_source('s1', 'j2', 'SETPOINT', 1.0, 'pat1')
+        self.assertEqual(wn.get_links_for_node('j2'), ['p2','p1'])
+
+        wn.split_pipe('p1', 'p1_b', 'j4')
+        self.assertEqual(wn.get_links_for_node('j1','outlet'), ['p1'])
+        self.assertEqual(wn.get_links_for_node('j4','inlet'), ['p1'])
+        self.assertEqual(wn.get_links_for_node('j4','outlet'), ['p1_b'])
+        self.assertEqual(wn.get_links_for_node('j2','inlet'), ['p1_b'])
+
+        wn._break_pipe('p2', 'p2_b', 'j5', 'j6', add_pipe_at_node='start')
+        self.assertEqual(wn.get_links_for_node('j2'), ['p2_b','p1_b'])
+        self.assertEqual(wn.get_links_for_node('j5'), ['p2'])
+        self.assertEqual(wn.get_links_for_node('j6'), ['p2_b'])
+        self.assertEqual(wn.get_links_for_node('j3','inlet'), ['p2'])
+
+        wn.remove_link('p2')
+        self.assertEqual(wn.get_links_for_node('j3'), [])
+        self.assertEqual(wn.get_links_for_node('j5'), [])
+        wn.remove_node('j3')
+        self.assertRaises(ValueError, wn.get_links_for_node, 'j1', 'both')
+
 #    def test_assign_demand(self):
 #        inp_file = join(ex_datadir, 'Net3.inp')
 #        wn = self.wntr.network.WaterNetworkModel(inp_file)
@@ -558,12 +587,12 @@ def test_Net1():
     expected_length = wntr.epanet.util.HydParam.Length._to_si(wn._inpfile.flow_units, expected_length)
 
     assert_dict_equal(dict(node), expected_node)
-    assert_dict_equal(elevation, expected_elevation)
+    assert_dict_equal(dict(elevation), expected_elevation)
     #assert_dict_equal(base_demand, expected_base_demand)
 
     assert_dict_equal(dict(edge), expected_edge)
-    assert_dict_equal(diameter, expected_diameter)
-    assert_dict_equal(length, expected_length)
+    assert_dict_equal(dict(diameter), expected_diameter)
+    assert_dict_equal(dict(length), expected_length)
 
 def test_query_node_attribute():
     inp_file = join(ex_datadir,'Net1.inp')
@@ -591,6 +620,31 @@ def test_query_pipe_attribute():
 
     assert_set_equal(set(pipes.keys()), expected_pipes)
 
+def test_query_attribute_series():
+    import pandas as pd
+    inp_file = join(ex_datadir,'Net1.inp')
+    wn = wntr.network.WaterNetworkModel(inp_file)
+
+    diameter = wn.query_link_attribute('diameter', link_type=wntr.network.Pipe)
+    assert_is_instance(diameter, pd.Series)
+    assert_equal(len(diameter), wn.num_pipes)
+    assert_almost_equal(diameter['10'], wn.get_link('10').diameter)
+
+    wn.get_link('10').diameter = 0.5
+    large = wn.query_link_attribute('diameter', np.greater_equal, 0.5)
+    assert_list_equal(list(large.index), ['10'])
+
+    tanks = wn.query_node_attribute('elevation', node_type=wntr.network.Tank)
+    assert_list_equal(list(tanks.index), ['2'])
+    assert_almost_equal(tanks['2'], wn.get_node('2').elevation)
+
+    # attributes without a column are gathered element by element
+    base_head = wn.query_node_attribute('base_head')
+    assert_list_equal(list(base_head.index), ['9'])
+    status = wn.query_link_attribute('status', np.equal, wntr.network.LinkStatus.Open,
+                                     link_type=wntr.network.Pump)
+    assert_list_equal(list(status.index), ['9'])
+
 def test_nzd_nodes():
     inp_file = join(ex_datadir,'Net1.inp')
 
@@ -689,5 +743,150 @@ def test_add_get_remove_num():
     expected = [92,3,2,117,2,0,5,2,0]
     assert_list_equal(nums, expected)
     
+class TestColumnStore(unittest.TestCase):
+
+    def setUp(self):
+        self.wn = wntr.network.WaterNetworkModel(join(ex_datadir, 'Net3.inp'))
+
+    def test_node_columns(self):
+        names, elevations = self.wn._node_columns.get('elevation', [wntr.network.NodeType.Junction])
+        self.assertListEqual(names, self.wn.junction_name_list)
+        self.assertListEqual(elevations.tolist(), [self.wn.get_node(name).elevation for name in names])
+        junction = self.wn.get_node('10')
+        junction.elevation = 123.0
+        self.assertEqual(self.wn._node_columns.elevation[junction._row], 123.0)
+        self.assertIsInstance(junction.elevation, float)
+
+    def test_link_columns(self):
+        link_columns = self.wn._link_columns
+        names, rows = link_columns.rows([wntr.network.LinkType.Pipe])
+        self.assertListEqual(names, self.wn.pipe_name_list)
+        for name, row in zip(names, rows):
+            pipe = self.wn.get_link(name)
+            self.assertEqual(link_columns.length[row], pipe.length)
+            self.assertEqual(link_columns.diameter[row], pipe.diameter)
+            self.assertEqual(link_columns.roughness[row], pipe.roughness)
+            self.assertEqual(link_columns.minor_loss[row], pipe.minor_loss)
+            self.assertEqual(link_columns.initial_status[row], int(pipe.initial_status))
+            self.assertEqual(link_columns.start_node[row], pipe.start_node._row)
+            self.assertEqual(link_columns.end_node[row], pipe.end_node._row)
+        pipe = self.wn.get_link('20')
+        pipe.initial_status = 'Closed'
+        self.assertEqual(pipe.initial_status, wntr.network.LinkStatus.Closed)
+        names, valve_diameters = link_columns.get('diameter', [wntr.network.LinkType.Valve])
+        self.assertListEqual(names, [])
+
+    def test_add_remove(self):
+        wn = self.wn
+        wn.add_junction('new_junc', elevation=10.0)
+        wn.add_pipe('new_pipe', '10', 'new_junc', length=50.0, diameter=0.2)
+        names, lengths = wn._link_columns.get('length')
+        self.assertEqual(names[-1], 'new_pipe')
+        self.assertEqual(lengths[-1], 50.0)
+        wn.remove_link('new_pipe')
+        wn.remove_node('new_junc')
+        self.assertNotIn('new_pipe', wn._link_columns.get('length')[0])
+        self.assertNotIn('new_junc', wn._node_columns.get('elevation')[0])
+        self.assertEqual(len(wn._node_columns.get('elevation')[0]), wn.num_nodes)
+        self.assertEqual(len(wn._link_columns.get('length')[0]), wn.num_links)
+
+    def test_reuse_rows(self):
+        wn = self.wn
+        num_node_rows = wn._node_columns.num_rows
+        num_link_rows = wn._link_columns.num_rows
+        for i in range(20):
+            wn.add_junction('new_junc', elevation=10.0)
+            wn.add_pipe('new_pipe', '10', 'new_junc', length=50.0, diameter=0.2)
+            wn.remove_link('new_pipe')
+            wn.remove_node('new_junc')
+        # an element that is never added
+        wntr.network.Junction('tmp_junc', wn)
+        self.assertEqual(wn._node_columns.num_rows, num_node_rows + 1)
+        self.assertEqual(wn._link_columns.num_rows, num_link_rows + 1)
+
+        # a removed element that is still referenced keeps its row
+        wn.add_junction('new_junc', elevation=10.0)
+        junction = wn.get_node('new_junc')
+        wn.remove_node('new_junc')
+        wn.add_junction('other_junc', elevation=20.0)
+        self.assertEqual(junction.elevation, 10.0)
+        self.assertEqual(wn.get_node('other_junc').elevation, 20.0)
+        names, elevations = wn._node_columns.get('elevation')
+        self.assertEqual(len(names), wn.num_nodes)
+        self.assertEqual(elevations[names.index('other_junc')], 20.0)
+
+        # reused rows start with the default values
+        wn.add_pipe('new_pipe', '10', 'other_junc')
+        self.assertEqual(wn.get_link('new_pipe').length, 304.8)
+        self.assertEqual(wn._link_columns.initial_status[wn.get_link('new_pipe')._row],
+                         int(wntr.network.LinkStatus.Open))
+
+    def test_copy(self):
+        wn2 = copy.deepcopy(self.wn)
+        wn2.get_link('20').diameter = 1.0
+        self.assertNotEqual(self.wn.get_link('20').diameter, 1.0)
+        self.assertTrue(wn2.get_link('20')._link_columns is wn2._link_columns)
+
+class TestNpzFile(unittest.TestCase):
+
+    def setUp(self):
+        import tempfile
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmpdir)
+
+    def _round_trip(self, inp_file):
+        wn = wntr.network.WaterNetworkModel(inp_file)
+        npz_file = join(self.tmpdir, 'wn.npz')
+        wn.write_npzfile(npz_file)
+        wn2 = wntr.network.WaterNetworkModel()
+        wn2.read_npzfile(npz_file)
+        return wn, wn2
+
+    def test_round_trip(self):
+        for inp_file in [join(ex_datadir, 'Net3.inp'), join(test_datadir, 'io.inp')]:
+            wn, wn2 = self._round_trip(inp_file)
+            self.assertTrue(wn._compare(wn2))
+            self.assertEqual(wn.name, wn2.name)
+            self.assertListEqual(sorted(str(c) for name, c in wn.controls()),
+                                 sorted(str(c) for name, c in wn2.controls()))
+            self.assertEqual(wn.options.time.duration, wn2.options.time.duration)
+            self.assertEqual(wn.options.hydraulic.headloss, wn2.options.hydraulic.headloss)
+
+    def test_simulation(self):
+        wn, wn2 = self._round_trip(join(ex_datadir, 'Net3.inp'))
+        wn.options.time.duration = 4*3600
+        wn2.options.time.duration = 4*3600
+        results = wntr.sim.EpanetSimulator(wn).run_sim()
+        results2 = wntr.sim.EpanetSimulator(wn2).run_sim()
+        self.assertTrue((abs(results.node['pressure'] - results2.node['pressure']) < 1e-6).all().all())
+
+    def test_version(self):
+        npz_file = join(self.tmpdir, 'wn.npz')
+        np.savez(npz_file, format=np.array('wntr-npz'), version=np.array(1000))
+        self.assertRaises(ValueError, wntr.network.npz.read_npzfile, npz_file)
+        np.savez(npz_file, format=np.array('other'), version=np.array(1))
+        self.assertRaises(ValueError, wntr.network.npz.read_npzfile, npz_file)
+
+    def test_inp_cache(self):
+        import os
+        import shutil
+        inp_file = join(self.tmpdir, 'Net3.inp')
+        shutil.copy(join(ex_datadir, 'Net3.inp'), inp_file)
+        cache_dir = join(self.tmpdir, 'cache')
+        wn = wntr.network.WaterNetworkModel(inp_file, cache_dir=cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        wn2 = wntr.network.WaterNetworkModel(inp_file, cache_dir=cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        self.assertTrue(wn._compare(wn2))
+        self.assertEqual(wn2.name, inp_file)
+        # a modified file is parsed again
+        with open(inp_file, 'a') as f:
+            f.write('\n')
+        wntr.network.WaterNetworkModel(inp_file, cache_dir=cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+
 if __name__ == '__main__':
     unittest.main()
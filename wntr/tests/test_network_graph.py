@@ -54,5 +54,167 @@ def test_Net1_MultiDiGraph():
     assert_dict_contains_subset(node, G.node)
     assert_dict_contains_subset(edge, G.adj)
 
+def test_graph_cache():
+    import networkx as nx
+    inp_file = join(net1dir,'Net1.inp')
+    wn = wntr.network.WaterNetworkModel(inp_file)
+
+    G = wn.get_graph(copy=False)
+    assert_true(nx.is_frozen(G))
+    assert_raises(nx.NetworkXError, G.remove_node, '10')
+    assert_is(wn.get_graph(copy=False), G)
+
+    # copies can be modified without changing the cached graph
+    G2 = wn.get_graph()
+    assert_false(nx.is_frozen(G2))
+    G2.weight_graph(link_attribute={'10': -1.0})
+    assert_true(G2.has_edge('11', '10', '10'))
+    assert_true(G.has_edge('10', '11', '10'))
+
+    # topology changes invalidate the cache
+    wn.split_pipe('10', '10_b', '10_j')
+    G3 = wn.get_graph(copy=False)
+    assert_is_not(G3, G)
+    assert_true(G3.has_edge('10', '10_j', '10'))
+    assert_true(G3.has_edge('10_j', '11', '10_b'))
+    wn.get_node('10_j').coordinates = (1.0, 2.0)
+    assert_equal(wn.get_graph(copy=False).node['10_j']['pos'], (1.0, 2.0))
+    wn.remove_link('10_b')
+    assert_false(wn.get_graph().has_edge('10_j', '11', '10_b'))
+
+def test_bridges():
+    G = wntr.network.WntrMultiDiGraph()
+    G.add_edge('a', 'b', key='ab')
+    G.add_edge('b', 'c', key='bc1')
+    G.add_edge('c', 'b', key='bc2') # parallel links are not bridges
+    G.add_edge('c', 'd', key='cd')
+    G.add_edge('d', 'e', key='de')
+    G.add_edge('e', 'c', key='ec')
+    G.add_edge('e', 'e', key='ee')
+    G.add_edge('f', 'g', key='fg') # separate component
+    assert_list_equal(G.bridges(), ['ab', 'fg'])
+    assert_equal(G.number_of_edges(), 8)
+
+def test_Net3_bridges():
+    import networkx as nx
+    inp_file = join(net1dir,'Net3.inp')
+    wn = wntr.network.WaterNetworkModel(inp_file)
+    G = wn.get_graph()
+    bridges = G.bridges()
+
+    # links whose removal increases the number of connected components
+    n = nx.number_connected_components(G.to_undirected())
+    expected = []
+    for node1, node2, link_name in list(G.edges(keys=True)):
+        G.remove_edge(node1, node2, key=link_name)
+        if nx.number_connected_components(G.to_undirected()) > n:
+            expected.append(link_name)
+        G.add_edge(node1, node2, key=link_name)
+    assert_equal(len(bridges), 31)
+    assert_set_equal(set(bridges), set(expected))
+
+def test_links_in_simple_paths():
+    G = wntr.network.WntrMultiDiGraph()
+    G.add_edge('s', 'a', key='sa')
+    G.add_edge('s', 'b', key='sb')
+    G.add_edge('a', 'b', key='ab1')
+    G.add_edge('a', 'b', key='ab2') # parallel link
+    G.add_edge('a', 't', key='at')
+    G.add_edge('b', 't', key='bt')
+    # paths s-a-t, s-b-t and s-a-b-t twice (once for each parallel link)
+    expected = {'sa': 3, 'sb': 1, 'ab1': 2, 'ab2': 2, 'at': 1, 'bt': 3}
+    counts = G.links_in_simple_paths(['s'], ['t'])
+    assert_dict_equal(counts.to_dict(), expected)
+    # path enumeration
+    counts = G.links_in_simple_paths(['s'], ['t'], cutoff=len(G))
+    assert_dict_equal(counts.to_dict(), expected)
+    counts = G.links_in_simple_paths(['s'], ['t'], cutoff=2)
+    assert_dict_equal(counts.to_dict(), {'sa': 1, 'sb': 1, 'ab1': 0, 'ab2': 0, 'at': 1, 'bt': 1})
+
+    # a loop, only simple paths are counted
+    G.add_edge('t', 's', key='ts')
+    counts = G.links_in_simple_paths(['s'], ['t'])
+    expected['ts'] = 0
+    assert_dict_equal(counts.to_dict(), expected)
+    counts = G.links_in_simple_paths(['s'], ['t'], max_paths=2, seed=1)
+    assert_equal(counts['at'] + counts['bt'], 2)
+
+def test_csr_graph():
+    G = wntr.network.CSRGraph(['a', 'b', 'c', 'd', 'e', 'f', 'g'],
+                              ['ab', 'bc1', 'bc2', 'cd', 'de', 'ec', 'ee', 'fg'],
+                              [0, 1, 2, 2, 3, 4, 4, 5], [1, 2, 1, 3, 4, 2, 4, 6])
+    assert_dict_equal(G.degree().to_dict(), {'a': 1, 'b': 3, 'c': 4, 'd': 2, 'e': 4, 'f': 1, 'g': 1})
+    assert_list_equal(G.terminal_nodes(), ['a', 'f', 'g'])
+    assert_list_equal(G.connected_components(), [['a', 'b', 'c', 'd', 'e'], ['f', 'g']])
+    assert_false(G.is_connected())
+    assert_list_equal(G.articulation_points(), ['b', 'c'])
+    dist = G.shortest_path_length(['a'])
+    assert_list_equal(dist.loc['a'].tolist(), [0, 1, 2, 3, 3, np.inf, np.inf])
+    assert_raises(RuntimeError, G.eccentricity)
+
+def test_Net3_csr_graph():
+    import networkx as nx
+    inp_file = join(net1dir,'Net3.inp')
+    wn = wntr.network.WaterNetworkModel(inp_file)
+    G = wn.get_csr_graph()
+    assert_is(wn.get_csr_graph(), G)
+    uG = wn.get_graph().to_undirected()
+
+    assert_equal(G.num_nodes, wn.num_nodes)
+    assert_equal(G.num_links, wn.num_links)
+    assert_dict_equal(G.degree().to_dict(), dict(uG.degree()))
+    assert_set_equal(set(G.articulation_points()), set(nx.articulation_points(uG)))
+    assert_true(G.is_connected())
+    assert_dict_equal(G.eccentricity().to_dict(), nx.eccentricity(uG))
+    assert_equal(G.diameter(), nx.diameter(uG))
+    assert_almost_equal(G.average_shortest_path_length(), nx.average_shortest_path_length(uG))
+
+    # topology changes invalidate the cache
+    wn.split_pipe(wn.pipe_name_list[0], 'P_b', 'J_b')
+    G2 = wn.get_csr_graph()
+    assert_is_not(G2, G)
+    assert_equal(G2.num_nodes, wn.num_nodes)
+    assert_equal(G2.degree()['J_b'], 2)
+
+def test_oriented_graph():
+    import pandas as pd
+    G = wntr.network.WntrMultiDiGraph()
+    G.add_node('a', type='Reservoir')
+    G.add_node('b', type='Junction')
+    G.add_node('c', type='Junction')
+    G.add_edge('a', 'b', key='ab', type='Pipe')
+    G.add_edge('b', 'c', key='bc', type='Pipe')
+    G.add_edge('c', 'a', key='ca', type='Pump')
+    flowrate = pd.DataFrame([[1.0, -2.0, 3.0], [-1.0, 2.0, 0.0]], index=[0, 3600],
+                            columns=['ab', 'bc', 'ca'])
+
+    G1 = G.oriented_graph(flowrate.loc[0], node_attribute={'a': 5.0})
+    assert_is_instance(G1, wntr.network.WntrMultiDiGraph)
+    assert_equal(G1.node['a'], {'type': 'Reservoir', 'weight': 5.0})
+    assert_dict_equal(G1['c']['b']['bc'], {'type': 'Pipe', 'weight': 2.0})
+    assert_false(G.has_edge('c', 'b'))
+
+    # the same as weight_graph on a copy
+    G2 = G.copy()
+    G2.weight_graph(link_attribute=flowrate.loc[0])
+    assert_list_equal(sorted(G1.edges(keys=True, data=True)), sorted(G2.edges(keys=True, data=True)))
+
+    # one graph per time
+    graphs = list(G.oriented_graphs(flowrate))
+    assert_list_equal([t for t, graph in graphs], [0, 3600])
+    assert_list_equal(sorted(graphs[1][1].edges(keys=True)), [('b', 'a', 'ab'), ('b', 'c', 'bc'), ('c', 'a', 'ca')])
+
+    # links without a value keep their direction and have no weight
+    G3 = G.oriented_graph({'ab': -1.0})
+    assert_dict_equal(G3['b']['a']['ab'], {'type': 'Pipe', 'weight': 1.0})
+    assert_dict_equal(G3['b']['c']['bc'], {'type': 'Pipe'})
+
+    C = wntr.network.CSRGraph(['a', 'b', 'c'], ['ab', 'bc', 'ca'], [0, 1, 2], [1, 2, 0])
+    matrices = C.oriented_adjacency(flowrate)
+    assert_list_equal(list(matrices.keys()), [0, 3600])
+    assert_list_equal(matrices[0].toarray().tolist(), [[0, 1, 0], [0, 0, 0], [3, 2, 0]])
+    A = C.oriented_adjacency(flowrate.loc[3600])
+    assert_list_equal(A.toarray().tolist(), [[0, 0, 0], [1, 0, 2], [0, 0, 0]])
+
 if __name__ == '__main__':
     test_Net1()
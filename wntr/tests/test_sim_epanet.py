@@ -0,0 +1,164 @@
+from nose.tools import *
+from os.path import abspath, dirname, join
+import os
+import shutil
+import tempfile
+import threading
+import numpy as np
+import wntr
+
+testdir = dirname(abspath(str(__file__)))
+datadir = join(testdir,'..','..','examples','networks')
+
+
+def _compare_results(results1, results2, skip=[]):
+    assert_list_equal(list(results1.time), list(results2.time))
+    for key in results2.node.items:
+        diff = np.abs(results1.node[key].values - results2.node[key].values)
+        scale = max(1.0, np.abs(results1.node[key].values).max())
+        assert_less(diff.max()/scale, 1e-5, key)
+    for key in results2.link.items:
+        if key in skip:
+            continue
+        diff = np.abs(results1.link[key].values - results2.link[key].values)
+        scale = max(1.0, np.abs(results1.link[key].values).max())
+        assert_less(diff.max()/scale, 1e-5, key)
+
+
+def test_stepwise_hydraulics():
+    inp_file = join(datadir,'Net3.inp')
+    wn = wntr.network.WaterNetworkModel(inp_file)
+
+    sim = wntr.sim.EpanetSimulator(wn)
+    results1 = sim.run_sim()
+    results2 = sim.run_sim(stepwise=True)
+
+    assert_not_in('rxnrate', results2.link.items)
+    assert_not_in('frictionfact', results2.link.items)
+    # headloss is computed from single precision heads, compare it separately
+    _compare_results(results1, results2, skip=['headloss'])
+    diff = np.abs(results1.link['headloss'].values - results2.link['headloss'].values)
+    assert_less(diff.max(), 0.05)
+    assert_equal(results2.meta['node_type']['River'], 'Reservoir')
+    assert_equal(results2.meta['link_type']['10'], 'Pump')
+
+
+def test_stepwise_report_times():
+    # the duration is not a multiple of the report step
+    inp_file = join(datadir,'Net3.inp')
+    wn = wntr.network.WaterNetworkModel(inp_file)
+    wn.options.time.duration = 25*3600
+    wn.options.time.report_timestep = 2*3600
+
+    sim = wntr.sim.EpanetSimulator(wn)
+    results1 = sim.run_sim()
+    results2 = sim.run_sim(stepwise=True)
+
+    assert_list_equal(list(results2.time), list(range(0, 25*3600, 2*3600)))
+    _compare_results(results1, results2, skip=['headloss'])
+
+
+def test_stepwise_waterquality():
+    inp_file = join(datadir,'Net3.inp')
+    wn = wntr.network.WaterNetworkModel(inp_file)
+    wn.options.quality.mode = 'CHEMICAL'
+    wn.add_pattern('NewPattern', [1])
+    wn.add_source('Source1', '121', 'SETPOINT', 100, 'NewPattern')
+
+    sim = wntr.sim.EpanetSimulator(wn)
+    results1 = sim.run_sim()
+    results2 = sim.run_sim(stepwise=True)
+
+    assert_equal(results2.meta['quality_mode'], 'CHEMICAL')
+    assert_greater(results2.node['quality'].values.max(), 0)
+    _compare_results(results1, results2, skip=['headloss'])
+
+
+def test_scratch_directory():
+    inp_file = join(datadir,'Net1.inp')
+    wn = wntr.network.WaterNetworkModel(inp_file)
+    scratch_root = tempfile.mkdtemp()
+    old_tempdir = tempfile.tempdir
+    tempfile.tempdir = scratch_root
+    try:
+        sim = wntr.sim.EpanetSimulator(wn)
+        results1 = sim.run_sim(file_prefix=None)
+        results2 = sim.run_sim(file_prefix=None, stepwise=True)
+        assert_list_equal(os.listdir(scratch_root), [])
+    finally:
+        tempfile.tempdir = old_tempdir
+        shutil.rmtree(scratch_root)
+    _compare_results(results1, results2, skip=['headloss'])
+
+
+def test_run_parallel():
+    inp_file = join(datadir,'Net1.inp')
+    models = []
+    for multiplier in [0.5, 1.0, 1.5]:
+        wn = wntr.network.WaterNetworkModel(inp_file)
+        wn.options.hydraulic.demand_multiplier = multiplier
+        models.append(wn)
+
+    output = wntr.sim.run_parallel(models, processes=2)
+    assert_equal(len(output), 3)
+    for wn, data in zip(models, output):
+        sim = wntr.sim.EpanetSimulator(wn)
+        results = sim.run_sim(file_prefix=None, stepwise=True)
+        assert_true(np.allclose(results.node['pressure'].values,
+                                wntr.sim.epanet.stepwise_results(data).node['pressure'].values))
+    assert_greater(output[0]['pressure'].sum(), output[2]['pressure'].sum())
+
+    results = wntr.sim.run_parallel(models[0:1], processes=1, results=True)
+    assert_true(isinstance(results[0], wntr.sim.NetResults))
+
+
+def test_hydraulics_cache():
+    inp_file = join(datadir,'Net3.inp')
+    wn = wntr.network.WaterNetworkModel(inp_file)
+    wn.options.time.duration = 24*3600
+    cache_dir = tempfile.mkdtemp()
+    try:
+        sim = wntr.sim.EpanetSimulator(wn)
+        wn.options.quality.mode = 'AGE'
+        results1 = sim.run_sim(file_prefix=None, hyd_cache=cache_dir)
+        assert_equal(len(os.listdir(cache_dir)), 1)
+
+        # changing the water quality reuses the hydraulics
+        wn.options.quality.mode = 'CHEMICAL'
+        wn.add_pattern('NewPattern', [1])
+        wn.add_source('Source1', '121', 'SETPOINT', 100, 'NewPattern')
+        results2 = sim.run_sim(file_prefix=None, hyd_cache=cache_dir)
+        assert_equal(len(os.listdir(cache_dir)), 1)
+        results3 = sim.run_sim(file_prefix=None)
+        assert_true(np.allclose(results2.node['quality'].values, results3.node['quality'].values))
+        assert_true(np.allclose(results1.node['head'].values, results2.node['head'].values))
+
+        # changing the hydraulics creates a new hydraulics file
+        wn.options.hydraulic.demand_multiplier = 1.2
+        sim.run_sim(file_prefix=None, hyd_cache=cache_dir, stepwise=True)
+        assert_equal(len(os.listdir(cache_dir)), 2)
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+def test_hydraulics_cache_threads():
+    inp_file = join(datadir,'Net1.inp')
+    cache_dir = tempfile.mkdtemp()
+    output = []
+    def run():
+        wn = wntr.network.WaterNetworkModel(inp_file)
+        sim = wntr.sim.EpanetSimulator(wn)
+        output.append(sim.run_sim(file_prefix=None, hyd_cache=cache_dir))
+    try:
+        threads = [threading.Thread(target=run) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert_equal(len(output), 4)
+        # one cached hydraulics file and no leftover temporary files
+        assert_equal(len(os.listdir(cache_dir)), 1)
+        for results in output[1:]:
+            assert_true(np.allclose(results.node['pressure'].values, output[0].node['pressure'].values))
+    finally:
+        shutil.rmtree(cache_dir)
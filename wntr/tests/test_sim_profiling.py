@@ -0,0 +1,55 @@
+import unittest
+from os.path import abspath, dirname, join
+import wntr
+
+testdir = dirname(abspath(str(__file__)))
+test_datadir = join(testdir, 'networks_for_testing')
+ex_datadir = join(testdir, '..', '..', 'examples', 'networks')
+
+
+class TestPhaseProfiler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+        inp_file = join(ex_datadir, 'Net3.inp')
+        self.wn = wntr.network.WaterNetworkModel(inp_file)
+        self.wn.options.time.duration = 4 * 3600
+        sim = wntr.sim.WNTRSimulator(self.wn)
+        self.results = sim.run_sim(profile=True)
+        self.profiler = sim.profiler
+
+    @classmethod
+    def tearDownClass(self):
+        pass
+
+    def test_profiler_disabled_by_default(self):
+        wn = wntr.network.WaterNetworkModel(join(ex_datadir, 'Net1.inp'))
+        wn.options.time.duration = 0
+        sim = wntr.sim.WNTRSimulator(wn)
+        sim.run_sim()
+        self.assertIsNone(sim.profiler)
+        self.assertIsNone(sim._solver.profiler)
+
+    def test_summary(self):
+        summary = self.profiler.summary()
+        for phase in ['controls', 'internal_graph', 'network_inputs', 'jacobian_constants',
+                      'jacobian', 'linear_solve', 'save_results']:
+            self.assertIn(phase, summary.index)
+        self.assertListEqual(list(summary.columns), ['calls', 'total', 'mean', 'max'])
+        self.assertTrue((summary['total'] >= summary['max']).all())
+        # each Jacobian assembly is followed by one linear solve
+        self.assertEqual(summary.loc['linear_solve', 'calls'], summary.loc['jacobian', 'calls'])
+        self.assertEqual(summary.loc['jacobian_constants', 'calls'], summary.loc['network_inputs', 'calls'])
+
+    def test_chrome_trace(self):
+        trace = self.profiler.to_chrome_trace()
+        events = trace['traceEvents']
+        self.assertEqual(len(events), len(self.profiler.events))
+        self.assertTrue(all(e['ph'] == 'X' for e in events))
+        self.assertTrue(all(e['dur'] >= 0 for e in events))
+        sim_times = set(e['args']['sim_time'] for e in events if e['name'] == 'save_results')
+        self.assertTrue(set(self.results.time).issubset(sim_times))
+
+
+if __name__ == '__main__':
+    unittest.main()